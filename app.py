@@ -4,7 +4,7 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
-from core.full_pipeline import run_full_analysis
+from core.full_pipeline import stream_full_analysis
 
 # -----------------------------
 # Page config
@@ -42,6 +42,12 @@ years = st.sidebar.slider(
     step=1
 )
 
+force_refresh = st.sidebar.checkbox(
+    "Regenerate narrative",
+    value=False,
+    help="Ignore cached LLM responses for this run"
+)
+
 run_button = st.sidebar.button("Run Analysis")
 
 # -----------------------------
@@ -51,41 +57,56 @@ if run_button:
     if not ticker.strip():
         st.error("Please enter a valid stock ticker.")
     else:
-        with st.spinner("Running analysis… this may take 30–60 seconds"):
-            try:
-                result = run_full_analysis(
-                    ticker=ticker.strip().upper(),
-                    years=years
-                )
-
-                # -----------------------------
-                # Executive Summary
-                # -----------------------------
-                st.subheader("Executive Summary")
-                st.write(result.get("exec_summary", "No summary generated."))
-
-                # -----------------------------
-                # Final Investor Narrative
-                # -----------------------------
-                st.subheader("Detailed Analysis")
-                st.write(result.get("final_narrative", "No narrative generated."))
-
-                # -----------------------------
-                # Diagnostics (collapsible)
-                # -----------------------------
-                with st.expander("Technical Details (for transparency)"):
-                    st.json({
-                        "Ticker": result["ticker"],
-                        "Period": result["analysis_period"],
-                        "Dominant Trend": result["dominant_trend"],
-                        "Confidence": result["trend_confidence"],
-                        "Recent Trend": result["recent_trend"],
-                        "Trend Distribution": result["trend_distribution"]
-                    })
-
-            except Exception as e:
-                st.error("Analysis failed.")
-                st.exception(e)
+        try:
+            # -----------------------------
+            # Sections, filled in as tokens arrive
+            # -----------------------------
+            st.subheader("Executive Summary")
+            summary_box = st.empty()
+
+            st.subheader("Detailed Analysis")
+            narrative_box = st.empty()
+
+            status = st.status("Running analysis…")
+            boxes = {"exec_summary": summary_box, "final_narrative": narrative_box}
+            texts = {"exec_summary": "", "final_narrative": ""}
+            result = {}
+
+            for event in stream_full_analysis(
+                ticker=ticker.strip().upper(),
+                years=years,
+                force_refresh=force_refresh
+            ):
+                if event["type"] == "token" and event["node"] in boxes:
+                    texts[event["node"]] += event["delta"]
+                    boxes[event["node"]].markdown(texts[event["node"]] + "▌")
+
+                elif event["type"] == "node":
+                    status.update(label=f"Finished {event['node'].replace('_', ' ')}…")
+
+                elif event["type"] == "done":
+                    result = event["state"]
+
+            status.update(label="Analysis complete", state="complete")
+            summary_box.write(result.get("exec_summary") or "No summary generated.")
+            narrative_box.write(result.get("final_narrative") or "No narrative generated.")
+
+            # -----------------------------
+            # Diagnostics (collapsible)
+            # -----------------------------
+            with st.expander("Technical Details (for transparency)"):
+                st.json({
+                    "Ticker": result["ticker"],
+                    "Period": result["analysis_period"],
+                    "Dominant Trend": result["dominant_trend"],
+                    "Confidence": result["trend_confidence"],
+                    "Recent Trend": result["recent_trend"],
+                    "Trend Distribution": result["trend_distribution"]
+                })
+
+        except Exception as e:
+            st.error("Analysis failed.")
+            st.exception(e)
 
 # -----------------------------
 # Footer
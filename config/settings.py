@@ -0,0 +1,99 @@
+import os
+from pathlib import Path
+
+
+# -----------------------------
+# Local cache locations
+# -----------------------------
+CACHE_ROOT = Path(
+    os.getenv("STA_CACHE_DIR", Path.home() / ".cache" / "stock-trend-analyzer")
+)
+
+OHLCV_CACHE_DIR = CACHE_ROOT / "ohlcv"
+
+# Seconds before a cached ticker is topped up from the provider again.
+OHLCV_REFRESH_SECONDS = int(os.getenv("STA_OHLCV_REFRESH_SECONDS", "900"))
+
+
+# -----------------------------
+# Snapshot cache
+# -----------------------------
+SNAPSHOT_CACHE_TTL_SECONDS = int(os.getenv("STA_SNAPSHOT_TTL_SECONDS", str(24 * 3600)))
+
+SNAPSHOT_CACHE_MAX_BYTES = int(os.getenv("STA_SNAPSHOT_MAX_BYTES", str(256 * 1024 * 1024)))
+
+# Optional disk tier, off unless STA_SNAPSHOT_DISK_CACHE is set
+SNAPSHOT_CACHE_DIR = (
+    CACHE_ROOT / "snapshots" if os.getenv("STA_SNAPSHOT_DISK_CACHE") else None
+)
+
+
+# -----------------------------
+# Charts
+# -----------------------------
+# Points per snapshot chart; longer series are downsampled
+CHART_MAX_POINTS = int(os.getenv("STA_CHART_MAX_POINTS", "500"))
+
+
+# -----------------------------
+# LLM clients
+# -----------------------------
+# Shared per-provider HTTP pool (see llm.client.get_provider_clients)
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("STA_LLM_POOL_MAX_CONNECTIONS", "20"))
+
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("STA_LLM_POOL_MAX_KEEPALIVE", "10"))
+
+# Seconds an idle pooled connection is kept open
+LLM_KEEPALIVE_EXPIRY_SECONDS = float(os.getenv("STA_LLM_KEEPALIVE_EXPIRY_SECONDS", "60"))
+
+LLM_TIMEOUT_SECONDS = float(os.getenv("STA_LLM_TIMEOUT_SECONDS", "60"))
+
+# In-flight async LLM requests per event loop, across all narratives
+LLM_MAX_CONCURRENT_REQUESTS = int(os.getenv("STA_LLM_MAX_CONCURRENT_REQUESTS", "8"))
+
+
+# -----------------------------
+# LLM routing
+# -----------------------------
+# Consecutive errors before a model's circuit breaker opens
+LLM_BREAKER_FAILURES = int(os.getenv("STA_LLM_BREAKER_FAILURES", "3"))
+
+# Cool-down doubles on every re-open, up to the max
+LLM_BREAKER_BASE_COOLDOWN_SECONDS = float(os.getenv("STA_LLM_BREAKER_COOLDOWN_SECONDS", "30"))
+
+LLM_BREAKER_MAX_COOLDOWN_SECONDS = float(os.getenv("STA_LLM_BREAKER_MAX_COOLDOWN_SECONDS", "600"))
+
+# Retries inside the OpenAI SDK per request. Routing owns retries (the
+# next model is tried and the breaker counts the failure), so 0 by default
+LLM_SDK_MAX_RETRIES = int(os.getenv("STA_LLM_SDK_MAX_RETRIES", "0"))
+
+# Latency samples kept per model for p50 / p95
+LLM_LATENCY_WINDOW = int(os.getenv("STA_LLM_LATENCY_WINDOW", "50"))
+
+# Start a hedged request on the next model after this many seconds
+# without an answer; unset disables hedging
+LLM_HEDGE_AFTER_SECONDS = (
+    float(os.getenv("STA_LLM_HEDGE_AFTER_SECONDS"))
+    if os.getenv("STA_LLM_HEDGE_AFTER_SECONDS")
+    else None
+)
+
+
+# -----------------------------
+# LLM prompts
+# -----------------------------
+# Estimated-token budget for each agent's DATA block (llm.prompting)
+LLM_PROMPT_TOKEN_BUDGET = int(os.getenv("STA_LLM_PROMPT_TOKEN_BUDGET", "400"))
+
+
+# -----------------------------
+# LLM response cache
+# -----------------------------
+LLM_CACHE_TTL_SECONDS = int(os.getenv("STA_LLM_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("STA_LLM_CACHE_MAX_ENTRIES", "1024"))
+
+# Disk tier, on unless STA_LLM_DISK_CACHE=0
+LLM_CACHE_DIR = (
+    CACHE_ROOT / "llm_responses" if os.getenv("STA_LLM_DISK_CACHE", "1") != "0" else None
+)
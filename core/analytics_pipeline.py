@@ -1,94 +1,48 @@
+import logging
+from typing import Dict, List
+
 import pandas as pd
-import numpy as np
 
-from data.data_loader import load_daily_data
+from data.data_loader import benchmark_for, load_daily_data_batch, require_loaded
 from core.preprocess import prepare_price_data
+from core.metrics import PriceMetrics, compute_price_metrics
+from core.metrics_stream import (
+    IncrementalPriceMetrics,
+    IncrementalRelativePerformance,
+    IncrementalRollingMetrics,
+)
+from core.rolling_metrics import RollingMetrics, compute_rolling_metrics
+from core.performance_engine import RelativePerformance, compute_relative_performance
+from core.red_flags import (
+    RedFlagPanel,
+    describe_volatility,
+    detect_recent_red_flags,
+    detect_red_flags,
+)
+from core.charts import LazyCharts
+from config.settings import CHART_MAX_POINTS
 
-
-# -------------------------------------------------
-# Helpers
-# -------------------------------------------------
-def _calculate_drawdowns(prices: pd.Series) -> pd.Series:
-    running_max = prices.cummax()
-    return (prices / running_max - 1.0) * 100
-
-
-def _rolling_12m_returns(prices: pd.Series) -> pd.Series:
-    return prices.pct_change(252) * 100
-
-
-def _compute_metrics(close: pd.Series) -> dict:
-    start_price = close.iloc[0]
-    end_price = close.iloc[-1]
-
-    total_days = (close.index[-1] - close.index[0]).days
-    total_years = total_days / 365.25
-
-    cagr = (end_price / start_price) ** (1 / total_years) - 1
-    price_multiple = end_price / start_price
-    total_return_pct = (price_multiple - 1) * 100
-
-    daily_returns = close.pct_change().dropna()
-    annualized_volatility = daily_returns.std() * np.sqrt(252) * 100
-
-    drawdowns = _calculate_drawdowns(close)
-    max_drawdown = drawdowns.min()
-
-    return {
-        "cagr": round(cagr * 100, 2),
-        "price_multiple": round(price_multiple, 2),
-        "total_return_pct": round(total_return_pct, 2),
-        "annualized_volatility": round(float(annualized_volatility), 2),
-        "max_drawdown": round(float(max_drawdown), 2),
-        "years": round(total_years, 2),
-    }
+logger = logging.getLogger(__name__)
 
 
 # -------------------------------------------------
 # Main analytics pipeline
 # -------------------------------------------------
-def run_trend_analysis(ticker: str, years: int = 10) -> dict:
-    # -----------------------------
-    # Load stock data
-    # -----------------------------
-    stock_df = load_daily_data(ticker, years)
-    stock_prices = prepare_price_data(stock_df)
-    stock_close = stock_prices["close"]
-
-    stock_metrics = _compute_metrics(stock_close)
-
-    yearly = stock_close.resample("YE").last()
-    yearly_returns = yearly.pct_change().dropna()
-    positive_year_ratio = (yearly_returns > 0).mean()
-
-    rolling_12m = _rolling_12m_returns(stock_close)
-    worst_rolling_12m = rolling_12m.min()
-
-    # -----------------------------
-    # Select benchmark
-    # -----------------------------
-    if ticker.endswith(".NS"):
-        benchmark_ticker = "^NSEI"
-    else:
-        benchmark_ticker = "^GSPC"
-
-    bench_df = load_daily_data(benchmark_ticker, years)
-    bench_prices = prepare_price_data(bench_df)
-    bench_close = bench_prices["close"]
-
-    benchmark_metrics = _compute_metrics(bench_close)
-
-    # -----------------------------
-    # Charts (stock only for MVP)
-    # -----------------------------
-    price_df = stock_close.rename("price").reset_index()
-    price_df.columns = ["date", "price"]
-
-    drawdown_df = _calculate_drawdowns(stock_close).rename("drawdown").reset_index()
-    drawdown_df.columns = ["date", "drawdown"]
-
-    rolling_df = rolling_12m.rename("rolling_12m").reset_index()
-    rolling_df.columns = ["date", "rolling_12m"]
+def _assemble_snapshot(
+    ticker: str,
+    stock_close: pd.Series,
+    stock: PriceMetrics,
+    benchmark: PriceMetrics,
+    rolling: RollingMetrics,
+    relative: RelativePerformance,
+    red_flags: RedFlagPanel,
+    years: int,
+    benchmark_ticker: str,
+    chart_points: int | None,
+    include_charts: bool = True,
+) -> dict:
+    stock_metrics = stock.summary()
+    benchmark_metrics = benchmark.summary()
 
     # -----------------------------
     # Final snapshot
@@ -103,16 +57,26 @@ def run_trend_analysis(ticker: str, years: int = 10) -> dict:
             "cagr": stock_metrics["cagr"],
             "price_multiple": stock_metrics["price_multiple"],
             "total_return_pct": stock_metrics["total_return_pct"],
-            "positive_year_ratio": round(float(positive_year_ratio), 2),
+            "positive_year_ratio": round(stock.positive_year_ratio, 2),
         },
         "risk": {
             "max_drawdown": stock_metrics["max_drawdown"],
-            "worst_rolling_12m": round(float(worst_rolling_12m), 2),
+            "worst_rolling_12m": round(stock.worst_rolling_12m, 2),
         },
         "consistency": {
             "annualized_volatility": stock_metrics["annualized_volatility"],
         },
+        "rolling": rolling.summary(),
+        "volatility_summary": describe_volatility(
+            red_flags,
+            ticker,
+            stock.annualized_volatility,
+            benchmark.annualized_volatility,
+        ),
+        "red_flags": red_flags.messages(ticker),
+        "red_flag_checks": red_flags.checks(ticker),
         "benchmark": benchmark_metrics,
+        "relative": relative.summary(ticker),
         "summary_flags": {
             "outperformed_benchmark": stock_metrics["cagr"] > benchmark_metrics["cagr"],
             "higher_volatility_than_benchmark": (
@@ -120,11 +84,175 @@ def run_trend_analysis(ticker: str, years: int = 10) -> dict:
                 > benchmark_metrics["annualized_volatility"]
             ),
         },
-        "charts": {
-            "price": price_df,
-            "drawdown": drawdown_df,
-            "rolling_12m": rolling_df,
-        },
     }
 
+    # -----------------------------
+    # Charts (stock only for MVP), built on first access
+    # -----------------------------
+    if include_charts:
+        snapshot["charts"] = LazyCharts(
+            {
+                "price": stock_close,
+                "drawdown": stock.drawdowns,
+                "rolling_12m": stock.rolling_12m,
+                "rolling_volatility": rolling.volatility["1y"],
+                "rolling_beta": relative.rolling["beta"][ticker],
+            },
+            chart_points,
+        )
+
     return snapshot
+
+
+def build_snapshot(
+    ticker: str,
+    stock_df: pd.DataFrame,
+    bench_df: pd.DataFrame,
+    years: int = 10,
+    benchmark_ticker: str | None = None,
+    chart_points: int | None = CHART_MAX_POINTS,
+    include_charts: bool = True,
+) -> dict:
+    """
+    Build the analytics snapshot from already-loaded daily bars.
+
+    Separated from loading so batch callers can share one benchmark
+    frame across many tickers. Charts are built lazily and downsampled
+    to chart_points rows (None for full resolution); include_charts=False
+    leaves the section out altogether.
+    """
+
+    benchmark_ticker = benchmark_ticker or benchmark_for(ticker)
+
+    stock_prices = prepare_price_data(stock_df)
+    stock_close = stock_prices["close"]
+    bench_close = prepare_price_data(bench_df)["close"]
+
+    return _assemble_snapshot(
+        ticker,
+        stock_close,
+        compute_price_metrics(stock_close),
+        compute_price_metrics(bench_close),
+        compute_rolling_metrics(stock_close),
+        compute_relative_performance(
+            stock_close.rename(ticker), bench_close, benchmark_name=benchmark_ticker
+        ),
+        detect_red_flags(stock_prices, bench_close, ticker=ticker),
+        years,
+        benchmark_ticker,
+        chart_points,
+        include_charts,
+    )
+
+
+# -------------------------------------------------
+# Incremental refresh
+# -------------------------------------------------
+class IncrementalSnapshot:
+    """
+    Carried analytics state for one ticker and its benchmark.
+
+    update() takes the same frames build_snapshot would and returns the
+    same snapshot, but only processes the bars that are new since the
+    last update (see IncrementalPriceMetrics), so an end-of-day refresh
+    costs O(new bars) in metrics work instead of a full recompute.
+
+    The rolling and relative sections are carried the same way (see
+    IncrementalRollingMetrics and IncrementalRelativePerformance), and
+    red flags are evaluated on the trailing bars their detectors read
+    (see detect_recent_red_flags); only the summaries' worst / median
+    reductions and the chart copies still touch every carried bar.
+    """
+
+    def __init__(
+        self,
+        ticker: str,
+        years: int = 10,
+        benchmark_ticker: str | None = None,
+        chart_points: int | None = CHART_MAX_POINTS,
+    ):
+        self.ticker = ticker
+        self.years = years
+        self.benchmark_ticker = benchmark_ticker or benchmark_for(ticker)
+        self.chart_points = chart_points
+
+        self.stock = IncrementalPriceMetrics()
+        self.benchmark = IncrementalPriceMetrics()
+        self.rolling = IncrementalRollingMetrics()
+        self.relative = IncrementalRelativePerformance(ticker, self.benchmark_ticker)
+
+    def update(self, stock_df: pd.DataFrame, bench_df: pd.DataFrame) -> dict:
+        stock_prices = prepare_price_data(stock_df)
+        stock_close = stock_prices["close"]
+        bench_close = prepare_price_data(bench_df)["close"]
+
+        self.stock.update(stock_close)
+        self.benchmark.update(bench_close)
+        self.rolling.update(stock_close)
+        self.relative.update(stock_close, bench_close)
+
+        return _assemble_snapshot(
+            self.ticker,
+            self.stock.close(),
+            self.stock.metrics(),
+            self.benchmark.metrics(),
+            self.rolling.metrics(),
+            self.relative.metrics(),
+            detect_recent_red_flags(stock_prices, bench_close, ticker=self.ticker),
+            self.years,
+            self.benchmark_ticker,
+            self.chart_points,
+        )
+
+
+def refresh_snapshots(states: Dict[str, IncrementalSnapshot]) -> Dict[str, dict]:
+    """
+    End-of-day refresh for a watchlist of carried states.
+
+    Bars are loaded in one batch per analysis period, together with each
+    state's own benchmark_ticker, then each state is brought up to date
+    incrementally.
+    Tickers (or benchmarks) with no data are skipped and left out of
+    the result.
+    """
+
+    by_years: Dict[int, List[str]] = {}
+    for ticker, state in states.items():
+        by_years.setdefault(state.years, []).append(ticker)
+
+    snapshots = {}
+    for years, tickers in by_years.items():
+        benchmarks = [states[t].benchmark_ticker for t in tickers]
+        frames = load_daily_data_batch(tickers + benchmarks, years)
+        for ticker in tickers:
+            state = states[ticker]
+            if ticker not in frames or state.benchmark_ticker not in frames:
+                logger.warning(f"[REFRESH] Skipping {ticker}: no data returned")
+                continue
+            snapshots[ticker] = state.update(frames[ticker], frames[state.benchmark_ticker])
+
+    return snapshots
+
+
+def run_trend_analysis(
+    ticker: str,
+    years: int = 10,
+    chart_points: int | None = CHART_MAX_POINTS,
+    include_charts: bool = True,
+) -> dict:
+    # -----------------------------
+    # Load stock + benchmark data (one batch)
+    # -----------------------------
+    benchmark_ticker = benchmark_for(ticker)
+    frames = load_daily_data_batch([ticker], years, include_benchmarks=True)
+    require_loaded(frames, [ticker, benchmark_ticker])
+
+    return build_snapshot(
+        ticker,
+        frames[ticker],
+        frames[benchmark_ticker],
+        years,
+        benchmark_ticker,
+        chart_points,
+        include_charts,
+    )
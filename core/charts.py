@@ -0,0 +1,153 @@
+from collections.abc import Mapping
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
+# -----------------------------
+# Downsampling kernels
+# -----------------------------
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: positions of n_out points that keep
+    the visual shape of y(x). The first and last points are always kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # n_out - 2 buckets over the interior points
+    edges = np.linspace(1, n - 1, n_out - 1).astype(int)
+    edges = np.r_[edges, n]
+
+    out = np.empty(n_out, dtype=int)
+    out[0], out[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+
+        # Third vertex: the average of the next bucket
+        next_lo, next_hi = edges[i + 1], edges[i + 2]
+        avg_x = x[next_lo:next_hi].mean()
+        avg_y = y[next_lo:next_hi].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+
+    return out
+
+
+def minmax_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Positions of each bucket's minimum and maximum (in bar order), plus
+    the endpoints. Every trough survives, so the deepest drawdown drawn
+    is the true one.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 4:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, (n_out - 2) // 2 + 1).astype(int)
+
+    keep = [0, n - 1]
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        bucket = y[lo:hi]
+        keep += [lo + int(np.argmin(bucket)), lo + int(np.argmax(bucket))]
+
+    return np.unique(keep)
+
+
+# -----------------------------
+# Chart preparation
+# -----------------------------
+
+def _days(dates: pd.Series) -> np.ndarray:
+    values = dates.to_numpy("datetime64[ns]").astype(np.int64)
+    return (values - values[0]) / 86_400e9
+
+
+def _downsample(df: pd.DataFrame, column: str, max_points: int, method: str) -> pd.DataFrame:
+    # Warm-up NaNs (e.g. the first year of rolling returns) carry no shape
+    df = df[df[column].notna()]
+    if len(df) <= max_points:
+        return df.reset_index(drop=True)
+
+    y = df[column].to_numpy(dtype=float)
+    if method == "minmax":
+        keep = minmax_indices(y, max_points)
+    else:
+        keep = lttb_indices(_days(df["date"]), y, max_points)
+
+    return df.iloc[keep].reset_index(drop=True)
+
+
+# Chart name -> (value column, method)
+CHART_METHODS = {
+    "price": ("price", "lttb"),
+    "drawdown": ("drawdown", "minmax"),
+    "rolling_12m": ("rolling_12m", "lttb"),
+    "rolling_volatility": ("rolling_volatility", "lttb"),
+    "rolling_beta": ("rolling_beta", "lttb"),
+}
+
+
+def prepare_charts(
+    charts: Dict[str, pd.DataFrame],
+    max_points: int | None,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Downsample the snapshot's chart frames to at most max_points rows:
+    LTTB for line charts, bucket min/max for drawdowns so troughs are
+    never smoothed away. max_points=None keeps full resolution.
+    """
+    if max_points is None:
+        return charts
+
+    prepared = {}
+    for name, df in charts.items():
+        column, method = CHART_METHODS.get(name, (df.columns[-1], "lttb"))
+        prepared[name] = _downsample(df, column, max_points, method)
+
+    return prepared
+
+
+# -----------------------------
+# Lazy snapshot section
+# -----------------------------
+
+class LazyCharts(Mapping):
+    """
+    The snapshot's charts section, built on first access.
+
+    Holds the source series (date-indexed) and turns each into its
+    ["date", name] frame, downsampled by prepare_charts, only when read.
+    Headless callers that never touch the charts pay nothing for them.
+    Pickles carry just the sources.
+    """
+
+    def __init__(self, sources: Dict[str, pd.Series], max_points: int | None):
+        self.sources = sources
+        self.max_points = max_points
+        self._frames: Dict[str, pd.DataFrame] = {}
+
+    def __getitem__(self, name: str) -> pd.DataFrame:
+        if name not in self._frames:
+            df = self.sources[name].rename(name).reset_index()
+            df.columns = ["date", name]
+            self._frames[name] = prepare_charts({name: df}, self.max_points)[name]
+        return self._frames[name]
+
+    def __iter__(self):
+        return iter(self.sources)
+
+    def __len__(self) -> int:
+        return len(self.sources)
+
+    def __getstate__(self) -> dict:
+        return {"sources": self.sources, "max_points": self.max_points, "_frames": {}}
@@ -1,34 +1,118 @@
-from core.analytics_pipeline import run_trend_analysis
+import asyncio
+import logging
+from typing import Iterator
+
+from core.preprocess import prepare_price_data
+from core.snapshot_cache import cached_trend_analysis
+from core.trend_engine import compute_trend_windows, summarize_trend_windows
+from data.data_loader import load_daily_data
 from llm.adapters import build_llm_state
 from llm.graph import build_llm_graph
+from llm.prompting import collect_prompt_stats
+from llm.response_cache import bypass_cache
 
+logger = logging.getLogger(__name__)
+
+
+def _with_prompt_stats(final_state: dict, stats) -> dict:
+    report = stats.report()
+    logger.info(
+        f"[LLM] Prompt data: {report['full_tokens'] - report['saved_tokens']} tokens "
+        f"(saved {report['saved_tokens']}, {report['saved_pct']}%)"
+    )
+    return {**final_state, "prompt_stats": report}
 
-def run_full_analysis(ticker: str, years: int = 10) -> dict:
-    """
-    Orchestrates analytics + LLM narrative generation.
 
-    Fails fast if analytics cannot be computed.
+def _trend_inputs(ticker: str, years: int) -> dict:
     """
+    Dominant / recent trend, confidence and distribution from the trend
+    windows over weekly closes (the snapshot carries no trend section).
+    """
+    close = prepare_price_data(load_daily_data(ticker, years))["close"]
+    weekly = close.resample("W-FRI").last().dropna().to_frame("close")
+    return summarize_trend_windows(compute_trend_windows(weekly))
 
-    # -----------------------------
-    # Run deterministic analytics
-    # -----------------------------
-    analytics = run_trend_analysis(ticker, years)
+
+def _analyze(ticker: str, years: int) -> dict:
+    analytics = cached_trend_analysis(ticker, years)
 
     if analytics is None:
         raise RuntimeError(
             f"Trend analysis failed for ticker {ticker}"
         )
 
+    return build_llm_state(analytics, trend=_trend_inputs(ticker, years))
+
+
+def run_full_analysis(ticker: str, years: int = 10, force_refresh: bool = False) -> dict:
+    """
+    Orchestrates analytics + LLM narrative generation.
+
+    Fails fast if analytics cannot be computed. Repeat runs reuse cached
+    LLM responses for identical prompts; force_refresh=True regenerates
+    every narrative. The result carries a prompt_stats token report.
+    """
+
     # -----------------------------
-    # Build LLM state
+    # Run deterministic analytics, build LLM state
     # -----------------------------
-    llm_state = build_llm_state(analytics)
+    llm_state = _analyze(ticker, years)
 
     # -----------------------------
     # Run LangGraph
     # -----------------------------
     graph = build_llm_graph()
-    final_state = graph.invoke(llm_state)
+    with bypass_cache(force_refresh), collect_prompt_stats() as stats:
+        final_state = graph.invoke(llm_state)
+
+    return _with_prompt_stats(final_state, stats)
+
+
+def stream_full_analysis(ticker: str, years: int = 10, force_refresh: bool = False) -> Iterator[dict]:
+    """
+    run_full_analysis as a stream of events, for rendering while the
+    narrative is written:
+
+    {"type": "token", "node": ..., "delta": ...}
+        text as it arrives from the streamed agents (exec_summary,
+        final_narrative)
+    {"type": "node", "node": ..., "output": {...}}
+        an agent finished
+    {"type": "done", "state": {...}}
+        the final state, as run_full_analysis returns it
+    """
+
+    llm_state = _analyze(ticker, years)
+
+    graph = build_llm_graph()
+    final_state = llm_state
+    with bypass_cache(force_refresh), collect_prompt_stats() as stats:
+        for mode, data in graph.stream(llm_state, stream_mode=["custom", "updates", "values"]):
+            if mode == "custom":
+                yield {"type": "token", **data}
+            elif mode == "updates":
+                for node, output in data.items():
+                    yield {"type": "node", "node": node, "output": output}
+            else:
+                final_state = data
+
+    yield {"type": "done", "state": _with_prompt_stats(final_state, stats)}
+
+
+async def arun_full_analysis(ticker: str, years: int = 10, force_refresh: bool = False) -> dict:
+    """
+    Async run_full_analysis.
+
+    Analytics run in a worker thread; the agents await their LLM calls
+    on the running loop. Many narratives can be gathered on one loop:
+    in-flight LLM requests are capped across all of them (see
+    llm.client.request_slots).
+    """
+
+    llm_state = await asyncio.to_thread(_analyze, ticker, years)
+
+    graph = build_llm_graph(use_async=True)
+    with bypass_cache(force_refresh), collect_prompt_stats() as stats:
+        final_state = await graph.ainvoke(llm_state)
 
-    return final_state
+    return _with_prompt_stats(final_state, stats)
@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+from typing import Dict
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def _prefix(values: np.ndarray) -> np.ndarray:
+    """
+    Prefix sums along the bar axis with a leading zero row:
+    p[i] = sum(values[:i]).
+    """
+    values = np.asarray(values, dtype=float)
+    out = np.zeros((len(values) + 1,) + values.shape[1:])
+    np.cumsum(values, axis=0, out=out[1:])
+    return out
+
+
+def _std(values: np.ndarray, ddof: int = 1) -> np.ndarray:
+    """
+    Sample std over the last axis, same arithmetic as pandas Series.std().
+    """
+    count = values.shape[-1]
+    avg = values.sum(axis=-1) / count
+    sqr = (avg[..., None] - values) ** 2
+    return np.sqrt(sqr.sum(axis=-1) / (count - ddof))
+
+
+def _as_pandas(values: np.ndarray):
+    if values.ndim == 1:
+        return pd.Series(values)
+    return pd.DataFrame(values)
+
+
+# -----------------------------
+# Indicator layer
+# -----------------------------
+
+class SeriesIndicators:
+    """
+    Full-series indicators computed once per price series.
+
+    Trend windows read slices of these arrays instead of recomputing
+    rolling statistics per window. Prefix-sum arrays turn "how many
+    bars in this window satisfy X" into two lookups, so scoring every
+    window costs O(n) regardless of how much the windows overlap.
+
+    values:
+        1-D array of prices, or 2-D (bars x series) to share the work
+        across several series at once
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.values = np.asarray(values, dtype=float)
+        self.n = len(self.values)
+
+        prices = _as_pandas(self.values)
+        bar = np.arange(self.n, dtype=float).reshape((-1,) + (1,) * (self.values.ndim - 1))
+
+        # --- Regression sums ---
+        self.prefix_price = _prefix(self.values)
+        self.prefix_weighted_price = _prefix(bar * self.values)
+
+        # --- 3-bar highs / lows ---
+        self.high_3 = prices.rolling(3).max().to_numpy()
+        self.low_3 = prices.rolling(3).min().to_numpy()
+
+        self.prefix_higher_high = _prefix(self._rising(self.high_3))
+        self.prefix_higher_low = _prefix(self._rising(self.low_3))
+
+        # --- Moving averages ---
+        self.ma_50 = prices.rolling(50).mean().to_numpy()
+        self.ma_200 = prices.rolling(200).mean().to_numpy()
+
+        self.prefix_above_50 = _prefix(self.values > self.ma_50)
+        self.prefix_above_200 = _prefix(self.values > self.ma_200)
+
+        self.golden = self.ma_50 > self.ma_200
+        self.prefix_ma_flips = _prefix(self._changed(self.golden))
+
+        # --- Returns ---
+        self.returns = prices.pct_change().to_numpy()
+
+        self._window_extrema: Dict[int, Dict[str, np.ndarray]] = {}
+
+    @staticmethod
+    def _rising(values: np.ndarray) -> np.ndarray:
+        out = np.zeros(values.shape)
+        out[1:] = values[1:] > values[:-1]
+        return out
+
+    @staticmethod
+    def _changed(values: np.ndarray) -> np.ndarray:
+        out = np.zeros(values.shape)
+        out[1:] = values[1:] != values[:-1]
+        return out
+
+    # -----------------------------
+    # Window access
+    # -----------------------------
+    @staticmethod
+    def window_sum(
+        prefix: np.ndarray,
+        starts: np.ndarray,
+        offset: int,
+        window_size: int,
+    ) -> np.ndarray:
+        """
+        Sum of the underlying values at window positions
+        [offset, window_size) for every window start.
+        """
+        if offset >= window_size:
+            return np.zeros((len(starts),) + prefix.shape[1:])
+        return prefix[starts + window_size] - prefix[starts + offset]
+
+    def window_extrema(self, window_size: int) -> Dict[str, np.ndarray]:
+        """
+        Rolling high / low for one window length, indexed by the bar a
+        window ends on. Computed once per length and reused by every
+        window (and every step size) of that length.
+        """
+        if window_size not in self._window_extrema:
+            prices = _as_pandas(self.values)
+            self._window_extrema[window_size] = {
+                "high": prices.rolling(window_size).max().to_numpy(),
+                "low": prices.rolling(window_size).min().to_numpy(),
+            }
+
+        return self._window_extrema[window_size]
+
+    def window_dispersion(
+        self,
+        starts: np.ndarray,
+        window_size: int,
+    ) -> Dict[str, np.ndarray]:
+        """
+        Price std and return mean / std of the selected windows.
+
+        These use two-pass arithmetic on sliding-window views rather
+        than running sums, so each window matches Series.std() /
+        Series.mean() on the slice bit for bit (running sums leave
+        residue that flips comparisons on flat windows).
+        """
+        windows = sliding_window_view(self.values, window_size, axis=0)[starts]
+        returns = windows[..., 1:] / windows[..., :-1] - 1
+
+        return {
+            "price_std": _std(windows),
+            "return_mean": returns.sum(axis=-1) / returns.shape[-1],
+            "return_std": _std(returns),
+        }
@@ -0,0 +1,116 @@
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+
+TRADING_DAYS = 252
+
+
+# -----------------------------
+# Data contracts
+# -----------------------------
+
+@dataclass
+class PriceMetrics:
+    """
+    Scalars and reusable series for one close-price series.
+
+    The series are what the snapshot charts draw from, so the pipeline
+    never recomputes drawdowns or rolling returns after the metrics.
+    """
+
+    cagr: float
+    price_multiple: float
+    total_return_pct: float
+    annualized_volatility: float
+    max_drawdown: float
+    years: float
+    positive_year_ratio: float
+    worst_rolling_12m: float
+
+    returns: pd.Series
+    running_max: pd.Series
+    drawdowns: pd.Series
+    yearly_returns: pd.Series
+    rolling_12m: pd.Series
+
+    def summary(self) -> dict:
+        """
+        Rounded headline metrics (the snapshot's benchmark block format).
+        """
+        return {
+            "cagr": round(self.cagr * 100, 2),
+            "price_multiple": round(self.price_multiple, 2),
+            "total_return_pct": round(self.total_return_pct, 2),
+            "annualized_volatility": round(self.annualized_volatility, 2),
+            "max_drawdown": round(self.max_drawdown, 2),
+            "years": round(self.years, 2),
+        }
+
+
+# -----------------------------
+# Kernel
+# -----------------------------
+
+def compute_price_metrics(close: pd.Series) -> PriceMetrics:
+    """
+    Compute every price-derived metric in one pass over the array.
+
+    Returns, running max, drawdowns, yearly and rolling 12m returns are
+    each computed once with NumPy and shared by the scalars derived
+    from them. Arithmetic matches the pandas equivalents
+    (pct_change, std, cummax, resample("YE").last()).
+    """
+
+    index = close.index
+    values = close.to_numpy(dtype=float)
+
+    # --- Growth ---
+    start_price = values[0]
+    end_price = values[-1]
+
+    total_years = (index[-1] - index[0]).days / 365.25
+
+    price_multiple = end_price / start_price
+    cagr = price_multiple ** (1 / total_years) - 1
+
+    # --- Daily returns / volatility ---
+    returns = np.full(len(values), np.nan)
+    returns[1:] = values[1:] / values[:-1] - 1
+
+    annualized_volatility = np.std(returns[1:], ddof=1) * np.sqrt(TRADING_DAYS) * 100
+
+    # --- Drawdowns ---
+    running_max = np.maximum.accumulate(values)
+    drawdowns = (values / running_max - 1.0) * 100
+
+    # --- Rolling 12m returns ---
+    rolling_12m = np.full(len(values), np.nan)
+    rolling_12m[TRADING_DAYS:] = (values[TRADING_DAYS:] / values[:-TRADING_DAYS] - 1) * 100
+
+    # --- Calendar-year returns ---
+    years = index.year.to_numpy()
+    year_ends = np.flatnonzero(np.r_[years[1:] != years[:-1], True])
+    year_closes = values[year_ends]
+    yearly_returns = year_closes[1:] / year_closes[:-1] - 1
+
+    yearly_index = pd.DatetimeIndex(
+        [pd.Timestamp(year=int(y), month=12, day=31) for y in years[year_ends[1:]]]
+    )
+
+    return PriceMetrics(
+        cagr=float(cagr),
+        price_multiple=float(price_multiple),
+        total_return_pct=float((price_multiple - 1) * 100),
+        annualized_volatility=float(annualized_volatility),
+        max_drawdown=float(drawdowns.min()),
+        years=float(total_years),
+        positive_year_ratio=float((yearly_returns > 0).mean()) if len(yearly_returns) else float("nan"),
+        worst_rolling_12m=float(np.nanmin(rolling_12m)) if len(values) > TRADING_DAYS else float("nan"),
+        returns=pd.Series(returns, index=index, name="returns"),
+        running_max=pd.Series(running_max, index=index, name="running_max"),
+        drawdowns=pd.Series(drawdowns, index=index, name="drawdown"),
+        yearly_returns=pd.Series(yearly_returns, index=yearly_index, name="yearly_return"),
+        rolling_12m=pd.Series(rolling_12m, index=index, name="rolling_12m"),
+    )
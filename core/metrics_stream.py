@@ -0,0 +1,682 @@
+import math
+from collections import deque
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import TRADING_DAYS, PriceMetrics, compute_price_metrics
+from core.performance_engine import (
+    RELATIVE_FIELDS,
+    RelativePerformance,
+    _align,
+    _relative_fields,
+    _rolling_fields,
+    _terms,
+)
+from core.preprocess import values_on_dates
+from core.rolling_metrics import HORIZONS, RollingMetrics, _rolling_arrays, compute_rolling_metrics
+
+
+# Arrays carried per bar; everything else is O(1) or O(years) state
+_BAR_FIELDS = ("dates", "close", "returns", "running_max", "drawdowns", "rolling_12m")
+
+# RollingMetrics frames carried by IncrementalRollingMetrics
+_ROLLING_FRAMES = ("returns", "volatility", "max_drawdown")
+
+
+# -------------------------------------------------
+# Per-bar buffers
+# -------------------------------------------------
+class _BarBuffers:
+    """
+    Named per-bar arrays (rows are bars) in preallocated storage, so
+    appending or dropping k bars costs O(k) amortized. Positions are
+    relative to the first bar kept.
+    """
+
+    def __init__(self, **arrays: np.ndarray):
+        self._arrays = {name: np.array(values) for name, values in arrays.items()}
+        self._lo = 0
+        self._hi = len(next(iter(self._arrays.values())))
+
+    def __len__(self) -> int:
+        return self._hi - self._lo
+
+    def view(self, name: str) -> np.ndarray:
+        return self._arrays[name][self._lo:self._hi]
+
+    def drop(self, n: int) -> None:
+        self._lo += min(n, len(self))
+
+    def append(self, **arrays: np.ndarray) -> None:
+        k = len(next(iter(arrays.values())))
+        size = len(self)
+        capacity = len(next(iter(self._arrays.values())))
+
+        if self._hi + k > capacity:
+            # Compact in place when the front has freed enough room,
+            # otherwise grow geometrically
+            if size + k > capacity // 2:
+                capacity = max(2 * capacity, size + k)
+            for name, buffer in self._arrays.items():
+                resized = np.empty((capacity,) + buffer.shape[1:], dtype=buffer.dtype)
+                resized[:size] = buffer[self._lo:self._hi]
+                self._arrays[name] = resized
+            self._lo, self._hi = 0, size
+
+        for name, values in arrays.items():
+            self._arrays[name][self._hi:self._hi + k] = values
+        self._hi += k
+
+
+def _appended(series: pd.Series, last, last_value: float) -> int | None:
+    """
+    Position in series of the first bar after `last`, or None if the
+    series no longer holds `last` with the same value (history changed:
+    re-seed).
+    """
+    index = series.index
+    pos = index.searchsorted(last, side="right")
+    if pos == 0 or index[pos - 1] != last or series.iloc[pos - 1] != last_value:
+        return None
+    return int(pos)
+
+
+class IncrementalPriceMetrics:
+    """
+    Price metrics for one close series, updated as new daily bars arrive.
+
+    Seed it once with history, then call update() with the latest
+    series (e.g. a fresh load_daily_data frame): only bars after the
+    last one seen are processed, and bars that fell out of the analysis
+    period are dropped from the front. metrics() then equals
+    compute_price_metrics over the same bars; the series and growth,
+    drawdown, yearly and rolling-12m scalars are bit-identical, the
+    volatility comes from running moments and agrees to float rounding.
+
+    The per-bar series are kept in _BarBuffers, so an update costs
+    O(new bars). Dropping old bars is O(dropped bars), except when
+    the bars dropped held the running high or the worst drawdown /
+    rolling-12m value, which forces a rescan of the affected series.
+    """
+
+    def __init__(self):
+        self._bars: _BarBuffers | None = None
+
+        # Running moments of the daily returns (Welford)
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+
+        # Worst values and the last bar they occur on (positions relative
+        # to the first bar kept)
+        self._worst_drawdown = (math.nan, -1)
+        self._worst_rolling = (math.nan, -1)
+
+        # Calendar years covered and each year's last close
+        self._years: deque = deque()
+        self._year_closes: deque = deque()
+
+    def __len__(self) -> int:
+        return len(self._bars) if self._bars is not None else 0
+
+    def _view(self, name: str) -> np.ndarray:
+        return self._bars.view(name)
+
+    @property
+    def first_date(self) -> pd.Timestamp:
+        return pd.Timestamp(self._view("dates")[0])
+
+    @property
+    def last_date(self) -> pd.Timestamp:
+        return pd.Timestamp(self._view("dates")[-1])
+
+    @staticmethod
+    def _last_min(values: np.ndarray, offset: int) -> tuple:
+        """
+        (min, offset + position of its last occurrence); NaNs ignored.
+        """
+        valid = ~np.isnan(values)
+        if not valid.any():
+            return math.nan, -1
+        worst = np.min(values[valid])
+        return float(worst), offset + int(np.flatnonzero(values == worst)[-1])
+
+    def _resync_moments(self) -> None:
+        returns = self._view("returns")[1:]
+        self._count = len(returns)
+        self._mean = float(returns.mean()) if self._count else 0.0
+        self._m2 = float(((returns - self._mean) ** 2).sum()) if self._count else 0.0
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def seed(self, close: pd.Series) -> None:
+        """
+        Load history, replacing any existing state.
+        """
+        close = close.dropna()
+        m = compute_price_metrics(close)
+
+        self._bars = _BarBuffers(
+            dates=close.index.to_numpy(),
+            close=close.to_numpy(dtype=float),
+            returns=m.returns.to_numpy(),
+            running_max=m.running_max.to_numpy(),
+            drawdowns=m.drawdowns.to_numpy(),
+            rolling_12m=m.rolling_12m.to_numpy(),
+        )
+
+        self._resync_moments()
+        self._worst_drawdown = self._last_min(self._view("drawdowns"), 0)
+        self._worst_rolling = self._last_min(self._view("rolling_12m"), 0)
+
+        years = close.index.year.to_numpy()
+        year_ends = np.flatnonzero(np.r_[years[1:] != years[:-1], True])
+        self._years = deque(int(y) for y in years[year_ends])
+        self._year_closes = deque(float(c) for c in self._view("close")[year_ends])
+
+    def update(self, close: pd.Series) -> None:
+        """
+        Bring the state in line with close, the full series a fresh
+        recompute would use.
+
+        Bars after the last one seen are appended and bars before the
+        series' first valid bar are dropped. If the bar data changed
+        underneath (a split or dividend rescales auto-adjusted history,
+        or the series reaches further back than the state), the state
+        is re-seeded instead.
+        """
+        if not len(self):
+            self.seed(close)
+            return
+
+        pos = _appended(close, self.last_date, self._view("close")[-1])
+        first = close.first_valid_index()
+        if pos is None or first is None or first < self.first_date:
+            self.seed(close)
+            return
+
+        self.trim(first)
+        self.append(close.iloc[pos:].dropna())
+
+    def append(self, close: pd.Series) -> None:
+        """
+        Add bars dated after the last bar seen.
+        """
+        close = close.dropna()
+        if len(self):
+            close = close[close.index > self.last_date]
+        values = close.to_numpy(dtype=float)
+        k = len(values)
+        if k == 0:
+            return
+        if not len(self):
+            self.seed(close)
+            return
+
+        n = len(self)
+        previous = self._view("close")[-TRADING_DAYS:]
+
+        # --- Returns / moments ---
+        returns = values / np.r_[previous[-1], values[:-1]] - 1
+
+        for r in returns:
+            self._count += 1
+            delta = r - self._mean
+            self._mean += delta / self._count
+            self._m2 += delta * (r - self._mean)
+
+        # --- Drawdowns ---
+        running_max = np.maximum.accumulate(np.r_[self._view("running_max")[-1], values])[1:]
+        drawdowns = (values / running_max - 1.0) * 100
+
+        # --- Rolling 12m returns: each new bar against the close a year
+        #     of bars earlier, in the carried tail or the new bars ---
+        closes = np.r_[previous, values]
+        back = np.arange(k) + len(previous) - TRADING_DAYS
+        has_year = back >= 0
+        rolling = np.full(k, np.nan)
+        rolling[has_year] = (values[has_year] / closes[back[has_year]] - 1) * 100
+
+        self._bars.append(
+            dates=close.index.to_numpy(),
+            close=values,
+            returns=returns,
+            running_max=running_max,
+            drawdowns=drawdowns,
+            rolling_12m=rolling,
+        )
+
+        for worst_attr, new_values in (
+            ("_worst_drawdown", drawdowns),
+            ("_worst_rolling", rolling),
+        ):
+            worst, at = self._last_min(new_values, n)
+            current = getattr(self, worst_attr)[0]
+            if at >= 0 and (math.isnan(current) or worst <= current):
+                setattr(self, worst_attr, (worst, at))
+
+        # --- Calendar years ---
+        for year, value in zip(close.index.year, values):
+            if self._years and self._years[-1] == year:
+                self._year_closes[-1] = float(value)
+            else:
+                self._years.append(int(year))
+                self._year_closes.append(float(value))
+
+    def trim(self, start) -> None:
+        """
+        Drop bars dated before start.
+        """
+        start = pd.Timestamp(start)
+        dates = self._view("dates")
+
+        d = int(np.searchsorted(dates, start.to_datetime64()))
+        n = len(self)
+        if d == 0:
+            return
+        if d >= n:
+            self.__init__()     # nothing left: back to unseeded
+            return
+
+        returns = self._view("returns")
+
+        # --- Moments: the new first bar's return leaves the sample ---
+        for r in returns[1:d + 1]:
+            self._count -= 1
+            if self._count == 0:
+                self._mean, self._m2 = 0.0, 0.0
+                continue
+            delta = r - self._mean
+            self._mean -= delta / self._count
+            self._m2 -= delta * (r - self._mean)
+        returns[d] = np.nan
+
+        # --- Running max: differs only until the first bar that was
+        #     itself a running high ---
+        close, running_max = self._view("close"), self._view("running_max")
+        recover = d
+        chunk = 256
+        while recover < n:
+            stop = min(recover + chunk, n)
+            highs = np.flatnonzero(close[recover:stop] >= running_max[recover:stop])
+            if len(highs):
+                recover += int(highs[0])
+                break
+            recover, chunk = stop, chunk * 2
+
+        if recover > d:
+            running_max[d:recover] = np.maximum.accumulate(close[d:recover])
+            self._view("drawdowns")[d:recover] = (
+                close[d:recover] / running_max[d:recover] - 1.0
+            ) * 100
+
+        # --- Rolling 12m: the first year of the new period has no value ---
+        self._view("rolling_12m")[TRADING_DAYS:min(d + TRADING_DAYS, n)] = np.nan
+
+        first_year = pd.Timestamp(dates[d]).year
+        self._bars.drop(d)
+        recover -= d
+        self._worst_drawdown = (self._worst_drawdown[0], self._worst_drawdown[1] - d)
+        self._worst_rolling = (self._worst_rolling[0], self._worst_rolling[1] - d)
+
+        # Rescan a worst value only if its bar changed or was dropped;
+        # rescans are rare, so also use them to shed drift in the moments
+        rescan = False
+        if self._worst_drawdown[1] < recover:
+            self._worst_drawdown = self._last_min(self._view("drawdowns"), 0)
+            rescan = True
+        if self._worst_rolling[1] < TRADING_DAYS:
+            self._worst_rolling = self._last_min(self._view("rolling_12m"), 0)
+            rescan = True
+        if rescan:
+            self._resync_moments()
+
+        while self._years[0] < first_year:
+            self._years.popleft()
+            self._year_closes.popleft()
+
+    # -----------------------------
+    # Results
+    # -----------------------------
+    def close(self) -> pd.Series:
+        """
+        Copy of the close series currently covered.
+        """
+        return pd.Series(
+            self._view("close").copy(),
+            index=pd.DatetimeIndex(self._view("dates")),
+            name="close",
+        )
+
+    def metrics(self) -> PriceMetrics:
+        """
+        Current metrics, as compute_price_metrics would return them.
+        The series are copies, so later updates never alter them.
+        """
+        if not len(self):
+            raise ValueError("No bars loaded")
+
+        index = pd.DatetimeIndex(self._view("dates"))
+        close = self._view("close")
+
+        total_years = (index[-1] - index[0]).days / 365.25
+        price_multiple = close[-1] / close[0]
+        cagr = price_multiple ** (1 / total_years) - 1
+
+        if self._count > 1:
+            annualized_volatility = (
+                np.sqrt(self._m2 / (self._count - 1)) * np.sqrt(TRADING_DAYS) * 100
+            )
+        else:
+            annualized_volatility = math.nan
+
+        year_closes = np.array(self._year_closes)
+        yearly_returns = year_closes[1:] / year_closes[:-1] - 1
+        yearly_index = pd.DatetimeIndex(
+            [pd.Timestamp(year=y, month=12, day=31) for y in list(self._years)[1:]]
+        )
+
+        def series(name: str, label: str) -> pd.Series:
+            return pd.Series(self._view(name).copy(), index=index, name=label)
+
+        return PriceMetrics(
+            cagr=float(cagr),
+            price_multiple=float(price_multiple),
+            total_return_pct=float((price_multiple - 1) * 100),
+            annualized_volatility=float(annualized_volatility),
+            max_drawdown=self._worst_drawdown[0],
+            years=float(total_years),
+            positive_year_ratio=float((yearly_returns > 0).mean()) if len(yearly_returns) else float("nan"),
+            worst_rolling_12m=self._worst_rolling[0],
+            returns=series("returns", "returns"),
+            running_max=series("running_max", "running_max"),
+            drawdowns=series("drawdowns", "drawdown"),
+            yearly_returns=pd.Series(yearly_returns, index=yearly_index, name="yearly_return"),
+            rolling_12m=series("rolling_12m", "rolling_12m"),
+        )
+
+    # -----------------------------
+    # Checkpointing
+    # -----------------------------
+    def to_state(self) -> Dict:
+        return {
+            **{name: self._view(name).copy() for name in _BAR_FIELDS},
+            "moments": (self._count, self._mean, self._m2),
+            "worst_drawdown": self._worst_drawdown,
+            "worst_rolling": self._worst_rolling,
+            "years": list(self._years),
+            "year_closes": list(self._year_closes),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "IncrementalPriceMetrics":
+        metrics = cls()
+        metrics._bars = _BarBuffers(**{name: state[name] for name in _BAR_FIELDS})
+        metrics._count, metrics._mean, metrics._m2 = state["moments"]
+        metrics._worst_drawdown = tuple(state["worst_drawdown"])
+        metrics._worst_rolling = tuple(state["worst_rolling"])
+        metrics._years = deque(state["years"])
+        metrics._year_closes = deque(state["year_closes"])
+        return metrics
+
+
+class IncrementalRollingMetrics:
+    """
+    RollingMetrics (see compute_rolling_metrics) for one NaN-free close
+    series, updated as new daily bars arrive.
+
+    Only the windows ending on new bars are computed, from the trailing
+    longest-horizon bars. When bars drop off the front, windows that now
+    reach past the first bar are blanked, as a recompute over the
+    shorter series would leave them. Values agree with
+    compute_rolling_metrics to float rounding.
+    """
+
+    def __init__(self, horizons: Dict[str, int] | None = None):
+        self.horizons = HORIZONS if horizons is None else horizons
+        self._lengths = np.array(list(self.horizons.values()))
+        self._columns = pd.Index(list(self.horizons))
+        self._bars: _BarBuffers | None = None
+        self._last_close = math.nan
+
+    def __len__(self) -> int:
+        return len(self._bars) if self._bars is not None else 0
+
+    def seed(self, close: pd.Series) -> None:
+        rolling = compute_rolling_metrics(close, self.horizons)
+        self._bars = _BarBuffers(
+            dates=close.index.to_numpy(),
+            **{name: getattr(rolling, name).to_numpy() for name in _ROLLING_FRAMES},
+        )
+        self._last_close = float(close.iloc[-1])
+
+    def update(self, close: pd.Series) -> None:
+        """
+        Bring the state in line with close, the full series a fresh
+        recompute would use (see IncrementalPriceMetrics.update).
+        """
+        if not len(self):
+            self.seed(close)
+            return
+
+        dates = self._bars.view("dates")
+        pos = _appended(close, dates[-1], self._last_close)
+        if pos is None or close.index[0] < dates[0]:
+            self.seed(close)
+            return
+
+        self.trim(close.index[0])
+
+        k = len(close) - pos
+        if k == 0:
+            return
+
+        tail = close.to_numpy(dtype=float)[max(pos - int(self._lengths.max()), 0):]
+        rolling = _rolling_arrays(tail, self._lengths)
+        self._bars.append(
+            dates=close.index[-k:].to_numpy(),
+            **{name: values[-k:] for name, values in zip(_ROLLING_FRAMES, rolling)},
+        )
+        self._last_close = float(close.iloc[-1])
+
+    def trim(self, start) -> None:
+        """
+        Drop bars dated before start.
+        """
+        n = int(np.searchsorted(self._bars.view("dates"), pd.Timestamp(start).to_datetime64()))
+        if n == 0:
+            return
+        self._bars.drop(n)
+
+        # A window of h bars now needs h bars before it: blank the ones
+        # that were full before the drop and are not any more
+        for j, h in enumerate(self._lengths):
+            for name in _ROLLING_FRAMES:
+                self._bars.view(name)[max(h - n, 0):h, j] = np.nan
+
+    def metrics(self) -> RollingMetrics:
+        """
+        Current RollingMetrics; the frames are copies.
+        """
+        index = pd.DatetimeIndex(self._bars.view("dates"))
+
+        def frame(name: str) -> pd.DataFrame:
+            return pd.DataFrame(self._bars.view(name).copy(), index=index, columns=self._columns)
+
+        return RollingMetrics(**{name: frame(name) for name in _ROLLING_FRAMES})
+
+
+class IncrementalRelativePerformance:
+    """
+    RelativePerformance (see compute_relative_performance) of one
+    NaN-free stock close series against its benchmark, updated as new
+    daily bars arrive.
+
+    Rows are benchmark bars, as in compute_relative_performance. The
+    per-bar terms are carried with their full-period sums, so new bars
+    (and a stock bar filled in late) cost O(window + new bars): their
+    terms are added to the sums and only the rolling windows ending on
+    them are computed. Values agree with compute_relative_performance to
+    float rounding.
+    """
+
+    def __init__(
+        self,
+        ticker: str = "stock",
+        benchmark_name: str | None = None,
+        window: int = TRADING_DAYS,
+    ):
+        self.ticker = ticker
+        self.benchmark_name = benchmark_name
+        self.window = window
+        self._columns = pd.Index([ticker])
+
+        self._bars: _BarBuffers | None = None
+        self._sums: Dict[str, float] = {}
+
+        # (first date, last date, last close)
+        self._stock = (None, None, math.nan)
+        self._bench_last = math.nan
+
+    def __len__(self) -> int:
+        return len(self._bars) if self._bars is not None else 0
+
+    def seed(self, stock: pd.Series, benchmark: pd.Series) -> None:
+        index, stock_returns, bench_returns = _align(stock.to_frame(self.ticker), benchmark)
+        terms = _terms(stock_returns, bench_returns)
+        rolling = _rolling_fields(terms, self.window)
+
+        self._bars = _BarBuffers(
+            dates=index.to_numpy(),
+            **{name: values[:, 0] for name, values in terms.items()},
+            **{f"rolling_{name}": values[:, 0] for name, values in rolling.items()},
+        )
+        self._sums = {name: float(values.sum()) for name, values in terms.items()}
+        self._stock = (stock.index[0], stock.index[-1], float(stock.iloc[-1]))
+        self._bench_last = float(benchmark.iloc[-1])
+
+    def update(self, stock: pd.Series, benchmark: pd.Series) -> None:
+        """
+        Bring the state in line with the full stock and benchmark series
+        a fresh recompute would use (see IncrementalPriceMetrics.update).
+        """
+        if not len(self):
+            self.seed(stock, benchmark)
+            return
+
+        dates = self._bars.view("dates")
+        first, last, last_close = self._stock
+        bench_pos = _appended(benchmark, dates[-1], self._bench_last)
+        stock_pos = _appended(stock, last, last_close)
+        dropped = int(np.searchsorted(dates, benchmark.index[0].to_datetime64()))
+
+        if (
+            bench_pos is None
+            or stock_pos is None
+            or stock.index[0] < first
+            or len(dates) - dropped != bench_pos
+        ):
+            self.seed(stock, benchmark)
+            return
+
+        self.trim(benchmark.index[0], stock.index[0])
+
+        # Rows to (re)compute: new benchmark bars, and from the first new
+        # stock bar on (a stock bar can arrive after its benchmark bar)
+        start = len(self)
+        if stock_pos < len(stock):
+            late = stock.index[stock_pos].to_datetime64()
+            start = min(start, int(np.searchsorted(self._bars.view("dates"), late)))
+        start = max(start, 1)
+        end = len(benchmark)
+
+        if start < end:
+            self._recompute(start, stock, benchmark)
+
+        self._stock = (stock.index[0], stock.index[-1], float(stock.iloc[-1]))
+        self._bench_last = float(benchmark.iloc[-1])
+
+    def _recompute(self, start: int, stock: pd.Series, benchmark: pd.Series) -> None:
+        """
+        Terms and rolling windows of rows start.. (benchmark positions),
+        replacing carried rows and appending the rest.
+        """
+        n = len(self)
+        dates = benchmark.index[start - 1:]
+
+        closes = values_on_dates(stock, dates)
+        bench = benchmark.to_numpy(dtype=float)[start - 1:]
+
+        terms = _terms((closes[1:] / closes[:-1] - 1)[:, None], bench[1:] / bench[:-1] - 1)
+
+        for name, values in terms.items():
+            replaced = self._bars.view(name)[start:]
+            self._sums[name] += float(values.sum()) - float(replaced.sum())
+            replaced[:] = values[:n - start, 0]
+
+        added = len(dates) - 1 - (n - start)
+        if added:
+            self._bars.append(
+                dates=dates[-added:].to_numpy(),
+                **{name: values[-added:, 0] for name, values in terms.items()},
+                **{f"rolling_{name}": np.full(added, np.nan) for name in RELATIVE_FIELDS},
+            )
+
+        # Windows ending on the recomputed rows reach window - 1 rows back
+        lo = max(start - self.window + 1, 0)
+        window_terms = {name: self._bars.view(name)[lo:, None] for name in terms}
+        for name, values in _rolling_fields(window_terms, self.window).items():
+            self._bars.view(f"rolling_{name}")[start:] = values[start - lo:, 0]
+
+    def trim(self, bench_start, stock_start) -> None:
+        """
+        Drop benchmark bars dated before bench_start, and the stock's
+        bars before stock_start.
+        """
+        dates = self._bars.view("dates")
+        dropped = int(np.searchsorted(dates, pd.Timestamp(bench_start).to_datetime64()))
+        if dropped == 0 and stock_start == self._stock[0]:
+            return
+
+        for name in self._sums:
+            self._sums[name] -= float(self._bars.view(name)[:dropped].sum())
+        self._bars.drop(dropped)
+
+        # A row's return needs the stock and benchmark bars before it:
+        # the first row and rows whose previous bar predates the stock
+        # have none now
+        dates = self._bars.view("dates")
+        stock_start = pd.Timestamp(stock_start).to_datetime64()
+        invalid = min(int(np.searchsorted(dates, stock_start)) + 1, len(dates))
+        for name in self._sums:
+            values = self._bars.view(name)
+            self._sums[name] -= float(values[:invalid].sum())
+            values[:invalid] = 0.0
+
+        # ...and so does every window containing one of them
+        for name in RELATIVE_FIELDS:
+            self._bars.view(f"rolling_{name}")[:invalid + self.window - 1] = np.nan
+
+    def metrics(self) -> RelativePerformance:
+        """
+        Current RelativePerformance; the frames are copies.
+        """
+        index = pd.DatetimeIndex(self._bars.view("dates"))
+        full = _relative_fields({name: np.array([total]) for name, total in self._sums.items()})
+
+        return RelativePerformance(
+            benchmark=self.benchmark_name or "benchmark",
+            window=self.window,
+            full=pd.DataFrame({name: full[name] for name in RELATIVE_FIELDS}, index=self._columns),
+            rolling={
+                name: pd.DataFrame(
+                    self._bars.view(f"rolling_{name}").copy()[:, None],
+                    index=index,
+                    columns=self._columns,
+                )
+                for name in RELATIVE_FIELDS
+            },
+        )
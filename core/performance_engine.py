@@ -0,0 +1,219 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import _prefix
+from core.metrics import TRADING_DAYS
+
+
+RELATIVE_FIELDS = (
+    "beta",
+    "correlation",
+    "alpha",
+    "tracking_error",
+    "information_ratio",
+    "up_capture",
+    "down_capture",
+)
+
+# Keys of RelativePerformance.summary()
+SUMMARY_FIELDS = RELATIVE_FIELDS + ("rolling_beta_latest", "rolling_correlation_latest")
+
+
+# -----------------------------
+# Data contracts
+# -----------------------------
+
+@dataclass
+class RelativePerformance:
+    """
+    Stocks measured against one benchmark.
+
+    full:
+        tickers x RELATIVE_FIELDS over each stock's whole history
+    rolling:
+        field -> dates x tickers frame over trailing windows of
+        `window` bars (NaN until a full window of shared bars exists)
+
+    alpha and tracking_error are annualized percentages; captures are
+    percentages of the benchmark's average up / down day.
+    """
+
+    benchmark: str
+    window: int
+    full: pd.DataFrame
+    rolling: Dict[str, pd.DataFrame]
+
+    def summary(self, ticker: str) -> dict:
+        """
+        Rounded full-period fields plus the latest rolling beta and
+        correlation for one ticker.
+        """
+        row = self.full.loc[ticker]
+        out = {name: round(float(row[name]), 2) for name in RELATIVE_FIELDS}
+
+        for name in ("beta", "correlation"):
+            values = self.rolling[name][ticker].to_numpy()
+            values = values[~np.isnan(values)]
+            out[f"rolling_{name}_latest"] = round(float(values[-1]), 2) if len(values) else None
+
+        return out
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def _align(stocks: pd.DataFrame, benchmark: pd.Series) -> Tuple[pd.DatetimeIndex, np.ndarray, np.ndarray]:
+    """
+    Daily returns of every stock and the benchmark on the benchmark's
+    calendar, computed once. A stock's return is NaN on days it or the
+    benchmark has no bar (and on the day after).
+    """
+    benchmark = benchmark.dropna()
+    closes = stocks.reindex(benchmark.index).to_numpy(dtype=float)
+    bench = benchmark.to_numpy(dtype=float)
+
+    stock_returns = np.full(closes.shape, np.nan)
+    stock_returns[1:] = closes[1:] / closes[:-1] - 1
+
+    bench_returns = np.full(len(bench), np.nan)
+    bench_returns[1:] = bench[1:] / bench[:-1] - 1
+
+    return benchmark.index, stock_returns, bench_returns
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den != 0, num / den, np.nan)
+
+
+def _relative_fields(s: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Every field from windowed sums (full period or rolling alike).
+
+    s holds counts and sums: n, x, y, xx, yy, xy (x = stock, y = bench),
+    d, dd (d = x - y), and the up / down day sums x_up, y_up, x_down,
+    y_down.
+    """
+    n = s["n"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean_x, mean_y, mean_d = s["x"] / n, s["y"] / n, s["d"] / n
+
+        cov = (s["xy"] - s["x"] * s["y"] / n) / (n - 1)
+        var_x = np.maximum(s["xx"] - s["x"] ** 2 / n, 0.0) / (n - 1)
+        var_y = np.maximum(s["yy"] - s["y"] ** 2 / n, 0.0) / (n - 1)
+        var_d = np.maximum(s["dd"] - s["d"] ** 2 / n, 0.0) / (n - 1)
+
+    beta = _ratio(cov, var_y)
+    tracking = np.sqrt(var_d)
+
+    return {
+        "beta": beta,
+        "correlation": _ratio(cov, np.sqrt(var_x * var_y)),
+        "alpha": (mean_x - beta * mean_y) * TRADING_DAYS * 100,
+        "tracking_error": tracking * np.sqrt(TRADING_DAYS) * 100,
+        "information_ratio": _ratio(mean_d * np.sqrt(TRADING_DAYS), tracking),
+        "up_capture": _ratio(s["x_up"], s["y_up"]) * 100,
+        "down_capture": _ratio(s["x_down"], s["y_down"]) * 100,
+    }
+
+
+def _terms(stock_returns: np.ndarray, bench_returns: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Per-bar terms (bars x tickers), zeroed where the pair is not valid,
+    so window sums and prefix sums need no further masking.
+    """
+    y = np.broadcast_to(bench_returns[:, None], stock_returns.shape)
+    valid = ~(np.isnan(stock_returns) | np.isnan(y))
+
+    x = np.where(valid, stock_returns, 0.0)
+    y = np.where(valid, y, 0.0)
+    d = x - y
+    up, down = y > 0, y < 0
+
+    return {
+        "n": valid.astype(float),
+        "x": x,
+        "y": y,
+        "xx": x * x,
+        "yy": y * y,
+        "xy": x * y,
+        "d": d,
+        "dd": d * d,
+        "x_up": np.where(up, x, 0.0),
+        "y_up": np.where(up, y, 0.0),
+        "x_down": np.where(down, x, 0.0),
+        "y_down": np.where(down, y, 0.0),
+    }
+
+
+def _rolling_fields(terms: Dict[str, np.ndarray], window: int) -> Dict[str, np.ndarray]:
+    """
+    Every field over the trailing `window` bars ending on each bar, from
+    prefix sums of the per-bar terms (NaN unless all `window` bars hold
+    a valid pair).
+    """
+    sums = {}
+    for name, values in terms.items():
+        prefix = _prefix(values)
+        windowed = np.full(values.shape, np.nan)
+        if len(values) >= window:
+            windowed[window - 1:] = prefix[window:] - prefix[:-window]
+        sums[name] = windowed
+
+    full_windows = sums["n"] == window
+    return {
+        name: np.where(full_windows, values, np.nan)
+        for name, values in _relative_fields(sums).items()
+    }
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def compute_relative_performance(
+    stocks: pd.DataFrame | pd.Series,
+    benchmark: pd.Series,
+    window: int = TRADING_DAYS,
+    benchmark_name: str | None = None,
+) -> RelativePerformance:
+    """
+    Full-period and rolling relative metrics of one or many stocks
+    against a single benchmark.
+
+    stocks:
+        close prices, a Series for one stock or a dates x tickers frame
+        for a universe (NaN-padded histories are fine)
+
+    Returns are aligned once. Every field is a function of a few sums
+    (see _relative_fields), so the full period is one masked reduction
+    and every rolling window is two prefix-sum lookups, for all tickers
+    at once.
+    """
+
+    if isinstance(stocks, pd.Series):
+        stocks = stocks.to_frame(stocks.name or "stock")
+    tickers: List[str] = list(stocks.columns)
+
+    index, stock_returns, bench_returns = _align(stocks, benchmark)
+    terms = _terms(stock_returns, bench_returns)
+
+    # --- Full period: one masked reduction ---
+    full = _relative_fields({name: values.sum(axis=0) for name, values in terms.items()})
+
+    # --- Rolling: every window from prefix sums ---
+    rolling = {
+        name: pd.DataFrame(values, index=index, columns=tickers)
+        for name, values in _rolling_fields(terms, window).items()
+    }
+
+    return RelativePerformance(
+        benchmark=benchmark_name or str(benchmark.name),
+        window=window,
+        full=pd.DataFrame({name: full[name] for name in RELATIVE_FIELDS}, index=tickers),
+        rolling=rolling,
+    )
@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 
 
@@ -14,8 +15,28 @@ def prepare_price_data(daily_df: pd.DataFrame) -> pd.DataFrame:
         df.index = pd.to_datetime(df.index)
 
     required_cols = ["open", "high", "low", "close"]
-    df = df[required_cols]
+    # Volume is optional (liquidity checks use it when present)
+    df = df[required_cols + [c for c in ["volume"] if c in df.columns]]
+
+    # Batched loads share a calendar; drop days this ticker did not trade
+    if df["close"].isna().any():
+        df = df.dropna(subset=["close"])
 
     df = df.sort_index()
 
     return df
+
+
+def values_on_dates(series: pd.Series, dates: pd.DatetimeIndex) -> np.ndarray:
+    """
+    series' values on the given dates, NaN where it has no bar.
+
+    A binary search per date, so looking up a few recent dates in a
+    long history does not pay for a full reindex.
+    """
+    if not len(series):
+        return np.full(len(dates), np.nan)
+    index = series.index.to_numpy()
+    dates = dates.to_numpy().astype(index.dtype)
+    at = np.minimum(np.searchsorted(index, dates), len(index) - 1)
+    return np.where(index[at] == dates, series.to_numpy(dtype=float)[at], np.nan)
@@ -0,0 +1,408 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import TRADING_DAYS
+from core.preprocess import values_on_dates
+
+
+# -----------------------------
+# Rules
+# -----------------------------
+
+@dataclass(frozen=True)
+class RedFlagRules:
+    """
+    Thresholds for every detector. Percentages are in percent, windows
+    in trading days. Every detector only looks at recent bars (its
+    lookback or window), so an old episode does not flag a stock for
+    the rest of its history.
+    """
+
+    drawdown_pct: float = -20.0
+    drawdown_min_days: int = 126
+    drawdown_lookback_days: int = TRADING_DAYS
+
+    vol_short_days: int = 21
+    vol_long_days: int = TRADING_DAYS
+    vol_spike_ratio: float = 2.0
+
+    gap_down_pct: float = -5.0
+    gap_lookback_days: int = TRADING_DAYS
+
+    underperformance_block_days: int = 21
+    underperformance_min_blocks: int = 6
+
+    volume_short_days: int = 21
+    volume_long_days: int = TRADING_DAYS
+    volume_dry_up_ratio: float = 0.3
+
+    def lookback(self) -> int:
+        """
+        Trailing bars every detector reads, except that a benchmark
+        underperformance streak can run further back.
+        """
+        return max(
+            self.drawdown_lookback_days,
+            self.vol_long_days + 1,
+            self.vol_short_days + 1,
+            self.gap_lookback_days + 1,
+            self.underperformance_block_days * self.underperformance_min_blocks + 1,
+            self.volume_long_days,
+            self.volume_short_days,
+        )
+
+
+DETECTORS = (
+    "prolonged_drawdown",
+    "volatility_spike",
+    "gap_down",
+    "benchmark_underperformance",
+    "liquidity_dry_up",
+)
+
+
+# -----------------------------
+# Data contracts
+# -----------------------------
+
+@dataclass
+class RedFlagPanel:
+    """
+    Detector results for many tickers.
+
+    flags:
+        detector -> bool array (one per ticker)
+    measures:
+        measure name -> float array (one per ticker), NaN when the
+        history is too short to evaluate
+    """
+
+    tickers: List[str]
+    rules: RedFlagRules
+    flags: Dict[str, np.ndarray]
+    measures: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        One row per ticker: a bool column per detector, then measures.
+        """
+        return pd.DataFrame({**self.flags, **self.measures}, index=self.tickers)
+
+    def checks(self, ticker: str) -> Dict[str, bool]:
+        i = self.tickers.index(ticker)
+        return {name: bool(self.flags[name][i]) for name in DETECTORS}
+
+    def messages(self, ticker: str) -> List[str]:
+        """
+        Human-readable red flags for one ticker (empty if none fired).
+        """
+        i = self.tickers.index(ticker)
+        m = {name: values[i] for name, values in self.measures.items()}
+        r = self.rules
+
+        text = {
+            "prolonged_drawdown": (
+                f"Prolonged drawdown: {int(m['drawdown_days'])} consecutive trading days "
+                f"more than {abs(r.drawdown_pct):g}% below the prior peak "
+                f"(last {r.drawdown_lookback_days} trading days)"
+            ),
+            "volatility_spike": (
+                f"Volatility spike: 1-month volatility is {m['vol_ratio']:.1f}x "
+                f"its 1-year level"
+            ),
+            "gap_down": (
+                f"{int(m['gap_downs'])} gap-down(s) of {abs(r.gap_down_pct):g}%+ at the open "
+                f"in the last {r.gap_lookback_days} trading days (worst {m['worst_gap_pct']:.1f}%)"
+            ),
+            "benchmark_underperformance": (
+                f"Underperformed the benchmark for {int(m['underperformance_months'])} "
+                f"consecutive months"
+            ),
+            "liquidity_dry_up": (
+                f"Liquidity dry-up: 1-month average volume is {m['volume_ratio'] * 100:.0f}% "
+                f"of its 1-year average"
+            ),
+        }
+
+        return [text[name] for name in DETECTORS if self.flags[name][i]]
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def _right_align(values: np.ndarray, missing: np.ndarray) -> np.ndarray:
+    """
+    Move each column's NaN rows to the top, keeping bar order, so every
+    ticker's latest bar is the last row and consecutive rows are
+    consecutive trading days for that ticker.
+    """
+    order = np.argsort(~missing, axis=0, kind="stable")
+    return np.take_along_axis(values, order, axis=0)
+
+
+def _tail(values: np.ndarray, window: int) -> np.ndarray:
+    """
+    Last `window` rows (all NaN when there are fewer rows).
+    """
+    if len(values) < window:
+        return np.full((window,) + values.shape[1:], np.nan)
+    return values[-window:]
+
+
+def _longest_run(mask: np.ndarray) -> np.ndarray:
+    """
+    Longest run of consecutive True rows per column.
+    """
+    counts = np.cumsum(mask, axis=0)
+    resets = np.maximum.accumulate(np.where(mask, 0, counts), axis=0)
+    runs = counts - resets
+    return runs.max(axis=0) if len(runs) else np.zeros(mask.shape[1:])
+
+
+# -----------------------------
+# Detectors (bars x tickers, right-aligned)
+# -----------------------------
+
+def _drawdown_days(close: np.ndarray, rules: RedFlagRules) -> np.ndarray:
+    # Drawdowns from peaks within the lookback; shorter histories use
+    # what they have (NaN padding never counts)
+    close = close[-rules.drawdown_lookback_days:]
+    running_max = np.fmax.accumulate(close, axis=0)
+    drawdowns = (close / running_max - 1.0) * 100
+    return _longest_run(drawdowns <= rules.drawdown_pct)
+
+
+def _volatility(close: np.ndarray, rules: RedFlagRules) -> Tuple[np.ndarray, np.ndarray]:
+    returns = close[1:] / close[:-1] - 1
+    scale = np.sqrt(TRADING_DAYS) * 100
+    short = np.std(_tail(returns, rules.vol_short_days), axis=0, ddof=1) * scale
+    long = np.std(_tail(returns, rules.vol_long_days), axis=0, ddof=1) * scale
+    return short, long
+
+
+def _gap_downs(open_: np.ndarray, close: np.ndarray, rules: RedFlagRules) -> Tuple[np.ndarray, np.ndarray]:
+    # Opens of the last gap_lookback_days bars against the prior close
+    n = rules.gap_lookback_days + 1
+    open_, close = open_[-n:], close[-n:]
+    gaps = (open_[1:] / close[:-1] - 1) * 100
+    hit = gaps <= rules.gap_down_pct
+    worst = np.where(hit.any(axis=0), np.min(np.where(hit, gaps, np.inf), axis=0), np.nan)
+    return hit.sum(axis=0).astype(float), worst
+
+
+def _underperformance_months(close: np.ndarray, bench: np.ndarray, rules: RedFlagRules) -> np.ndarray:
+    # Consecutive blocks (counted back from the latest bar) in which the
+    # stock returned less than its benchmark
+    block = rules.underperformance_block_days
+    n_blocks = (len(close) - 1) // block
+    if n_blocks == 0:
+        return np.zeros(close.shape[1])
+
+    ends = len(close) - 1 - block * np.arange(n_blocks)
+    stock_ret = close[ends] / close[ends - block]
+    bench_ret = bench[ends] / bench[ends - block]
+
+    # NaN (history too short) compares False and ends the streak
+    behind = stock_ret < bench_ret
+    return np.where(behind.all(axis=0), n_blocks, np.argmin(behind, axis=0)).astype(float)
+
+
+def _volume_ratio(volume: np.ndarray, rules: RedFlagRules) -> np.ndarray:
+    short = _tail(volume, rules.volume_short_days).mean(axis=0)
+    long = _tail(volume, rules.volume_long_days).mean(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return short / long
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def detect_red_flags_panel(
+    closes: pd.DataFrame,
+    opens: pd.DataFrame | None = None,
+    volumes: pd.DataFrame | None = None,
+    benchmark_closes: pd.DataFrame | None = None,
+    rules: RedFlagRules | None = None,
+) -> RedFlagPanel:
+    """
+    Run every detector over a panel of tickers in one pass.
+
+    All inputs are dates x tickers frames on a shared calendar (NaN on
+    days a ticker did not trade); benchmark_closes holds each ticker's
+    own benchmark in its column. Optional inputs left out simply leave
+    their detectors unflagged.
+    """
+
+    rules = rules or RedFlagRules()
+    tickers = list(closes.columns)
+    close = closes.to_numpy(dtype=float)
+    missing = np.isnan(close)
+
+    def aligned(frame: pd.DataFrame | None) -> np.ndarray | None:
+        if frame is None:
+            return None
+        values = frame.reindex(index=closes.index, columns=tickers).to_numpy(dtype=float)
+        return _right_align(values, missing)
+
+    return _evaluate(
+        _right_align(close, missing),
+        aligned(opens),
+        aligned(volumes),
+        aligned(benchmark_closes.ffill() if benchmark_closes is not None else None),
+        tickers,
+        rules,
+    )
+
+
+def _evaluate(
+    close: np.ndarray,
+    open_: np.ndarray | None,
+    volume: np.ndarray | None,
+    bench: np.ndarray | None,
+    tickers: List[str],
+    rules: RedFlagRules,
+) -> RedFlagPanel:
+    """
+    Every detector over right-aligned bars x tickers arrays.
+    """
+    nan = np.full(len(tickers), np.nan)
+
+    drawdown_days = _drawdown_days(close, rules)
+    short_vol, long_vol = _volatility(close, rules)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        vol_ratio = short_vol / long_vol
+
+    gap_downs, worst_gap = _gap_downs(open_, close, rules) if open_ is not None else (nan, nan)
+    underperformance = (
+        _underperformance_months(close, bench, rules) if bench is not None else nan
+    )
+    volume_ratio = _volume_ratio(volume, rules) if volume is not None else nan
+
+    flags = {
+        "prolonged_drawdown": drawdown_days >= rules.drawdown_min_days,
+        "volatility_spike": vol_ratio >= rules.vol_spike_ratio,
+        "gap_down": gap_downs > 0,
+        "benchmark_underperformance": underperformance >= rules.underperformance_min_blocks,
+        "liquidity_dry_up": volume_ratio <= rules.volume_dry_up_ratio,
+    }
+
+    measures = {
+        "drawdown_days": drawdown_days.astype(float),
+        "short_volatility": short_vol,
+        "long_volatility": long_vol,
+        "vol_ratio": vol_ratio,
+        "gap_downs": gap_downs,
+        "worst_gap_pct": worst_gap,
+        "underperformance_months": underperformance,
+        "volume_ratio": volume_ratio,
+    }
+
+    return RedFlagPanel(tickers=tickers, rules=rules, flags=flags, measures=measures)
+
+
+def detect_red_flags(
+    prices: pd.DataFrame,
+    benchmark_close: pd.Series | None = None,
+    rules: RedFlagRules | None = None,
+    ticker: str = "ticker",
+) -> RedFlagPanel:
+    """
+    Single-ticker wrapper: prices holds close plus optional open and
+    volume columns.
+    """
+
+    def column(name: str):
+        if name not in prices.columns:
+            return None
+        return prices[[name]].set_axis([ticker], axis=1)
+
+    bench = None
+    if benchmark_close is not None:
+        bench = benchmark_close.reindex(prices.index).to_frame(ticker)
+
+    return detect_red_flags_panel(
+        column("close"),
+        opens=column("open"),
+        volumes=column("volume"),
+        benchmark_closes=bench,
+        rules=rules,
+    )
+
+
+def detect_recent_red_flags(
+    prices: pd.DataFrame,
+    benchmark_close: pd.Series | None = None,
+    rules: RedFlagRules | None = None,
+    ticker: str = "ticker",
+) -> RedFlagPanel:
+    """
+    detect_red_flags over only the trailing bars the detectors read
+    (rules.lookback()), for callers refreshing a long history. prices
+    must have no missing closes (as prepare_price_data leaves them).
+
+    If the underperformance streak reaches the oldest block of the
+    slice it may continue further back, so the slice is doubled until
+    the streak ends inside it or the whole history is covered. Results
+    equal detect_red_flags on the full frames.
+    """
+
+    rules = rules or RedFlagRules()
+    block = rules.underperformance_block_days
+    columns = {
+        name: prices[name].to_numpy(dtype=float)
+        for name in ("close", "open", "volume")
+        if name in prices.columns
+    }
+
+    bars = rules.lookback()
+    while True:
+        recent = {name: values[-bars:, None] for name, values in columns.items()}
+
+        # Benchmark closes on the slice's dates, forward-filled
+        bench = None
+        if benchmark_close is not None:
+            bench = pd.Series(values_on_dates(benchmark_close, prices.index[-bars:])).ffill()
+            bench = bench.to_numpy()[:, None]
+
+        panel = _evaluate(
+            recent["close"], recent.get("open"), recent.get("volume"), bench, [ticker], rules
+        )
+
+        # A streak through the oldest block may run further back (that
+        # block also reads the slice's first bar, whose benchmark close a
+        # full run could have forward-filled); NaN means no benchmark
+        n = len(recent["close"])
+        streak = panel.measures["underperformance_months"][0]
+        if n == len(prices) or not streak >= (n - 1) // block - 1:
+            return panel
+        bars *= 2
+
+
+def describe_volatility(
+    panel: RedFlagPanel,
+    ticker: str,
+    annualized_volatility: float,
+    benchmark_volatility: float | None = None,
+) -> str:
+    """
+    One-sentence volatility summary for narratives.
+    """
+    i = panel.tickers.index(ticker)
+    text = f"Annualized volatility of {annualized_volatility:.1f}%"
+    if benchmark_volatility is not None:
+        text += f" vs {benchmark_volatility:.1f}% for the benchmark"
+
+    ratio = panel.measures["vol_ratio"][i]
+    if np.isfinite(ratio):
+        level = "above" if ratio > 1.2 else "below" if ratio < 0.8 else "in line with"
+        text += (
+            f"; recent 1-month volatility of {panel.measures['short_volatility'][i]:.1f}% "
+            f"is {level} its 1-year level"
+        )
+
+    return text + "."
@@ -0,0 +1,219 @@
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.metrics import TRADING_DAYS
+
+
+# Horizon name -> window length in trading days
+HORIZONS: Dict[str, int] = {
+    "1y": TRADING_DAYS,
+    "3y": 3 * TRADING_DAYS,
+    "5y": 5 * TRADING_DAYS,
+}
+
+
+def summary_fields(horizons: Dict[str, int] | None = None) -> List[str]:
+    """
+    Every key RollingMetrics.summary() can return, in order.
+    """
+    out = []
+    for horizon in HORIZONS if horizons is None else horizons:
+        out += [
+            f"return_{horizon}_latest",
+            f"return_{horizon}_worst",
+            f"return_{horizon}_median",
+            f"volatility_{horizon}_latest",
+            f"max_drawdown_{horizon}_worst",
+        ]
+    return out
+
+
+# -----------------------------
+# Data contracts
+# -----------------------------
+
+@dataclass
+class RollingMetrics:
+    """
+    Trailing-window metrics for every horizon, indexed by the bar each
+    window ends on (NaN until a full window exists). All in percent.
+
+    returns / volatility / max_drawdown:
+        dates x horizons frames (columns are HORIZONS keys)
+    """
+
+    returns: pd.DataFrame
+    volatility: pd.DataFrame
+    max_drawdown: pd.DataFrame
+
+    def summary(self) -> dict:
+        """
+        Latest and worst value per horizon as flat, rounded scalars
+        (NaN-free: horizons longer than the history are left out).
+        """
+        out = {}
+        all_returns = self.returns.to_numpy()
+        volatility = self.volatility.to_numpy()
+        max_drawdown = self.max_drawdown.to_numpy()
+
+        for j, horizon in enumerate(self.returns.columns):
+            returns = all_returns[:, j]
+            returns = returns[~np.isnan(returns)]
+            if not len(returns):
+                continue
+
+            out[f"return_{horizon}_latest"] = round(float(returns[-1]), 2)
+            out[f"return_{horizon}_worst"] = round(float(returns.min()), 2)
+            out[f"return_{horizon}_median"] = round(float(np.median(returns)), 2)
+            out[f"volatility_{horizon}_latest"] = round(float(volatility[-1, j]), 2)
+            out[f"max_drawdown_{horizon}_worst"] = round(float(np.nanmin(max_drawdown[:, j])), 2)
+
+        return out
+
+
+# -----------------------------
+# Kernels
+# -----------------------------
+
+def _segment_levels(values: np.ndarray, longest: int) -> List[Tuple[np.ndarray, ...]]:
+    """
+    Doubling table: level k holds (max, min, max drawdown) of the
+    segment of 2**k bars starting at every bar.
+    """
+    levels = [(values, values, np.zeros(len(values)))]
+
+    size = 1
+    while 2 * size <= longest:
+        high, low, worst = levels[-1]
+        m = len(high) - size
+        levels.append((
+            np.maximum(high[:m], high[size:]),
+            np.minimum(low[:m], low[size:]),
+            _merge_drawdown(high[:m], worst[:m], low[size:], worst[size:]),
+        ))
+        size *= 2
+
+    return levels
+
+
+def _merge_drawdown(left_high, left_worst, right_low, right_worst) -> np.ndarray:
+    # A bar in the right segment is measured against the higher of its
+    # own running max and the left segment's max
+    return np.minimum(np.minimum(left_worst, right_worst), right_low / left_high - 1.0)
+
+
+def _window_drawdowns(values: np.ndarray, lengths: np.ndarray) -> np.ndarray:
+    """
+    Max drawdown of every trailing window of each length.
+
+    (max, min, max drawdown) of adjacent segments combine exactly, so a
+    window of h bars is the ordered merge of the power-of-two segments
+    in h's binary expansion. The doubling table is built once for the
+    longest window and shared by every horizon; each horizon then costs
+    O(log h) vectorized merges rather than a pass over h bars per window.
+    """
+    n = len(values)
+    out = np.full((n, len(lengths)), np.nan)
+
+    levels = _segment_levels(values, min(int(lengths.max()), n))
+
+    for j, h in enumerate(lengths):
+        n_windows = n - h + 1
+        if n_windows <= 0:
+            continue
+
+        offset = 0
+        high = worst = None
+        for k in reversed(range(len(levels))):
+            if not h >> k & 1:
+                continue
+            seg_high, seg_low, seg_worst = (a[offset:offset + n_windows] for a in levels[k])
+            if high is None:
+                high, worst = seg_high, seg_worst
+            else:
+                worst = _merge_drawdown(high, worst, seg_low, seg_worst)
+                high = np.maximum(high, seg_high)
+            offset += 1 << k
+
+        out[h - 1:, j] = worst * 100
+
+    return out
+
+
+def _rolling_arrays(values: np.ndarray, lengths: np.ndarray) -> Tuple[np.ndarray, ...]:
+    """
+    (returns, volatility, max_drawdown) as bars x horizons arrays for a
+    NaN-free close array.
+    """
+    n = len(values)
+
+    # --- Log-return prefix sums (centered, which keeps the sum of
+    #     squares well conditioned) ---
+    log_returns = np.diff(np.log(values))
+    center = log_returns.mean() if len(log_returns) else 0.0
+    centered = log_returns - center
+
+    prefix = np.zeros(n)
+    np.cumsum(log_returns, out=prefix[1:])
+    prefix_sq = np.zeros(n)
+    np.cumsum(centered ** 2, out=prefix_sq[1:])
+    prefix_c = np.zeros(n)
+    np.cumsum(centered, out=prefix_c[1:])
+
+    # bars x horizons: the bar each window starts on (clipped, masked below)
+    ends = np.arange(n)[:, None]
+    starts = ends - lengths[None, :]
+    valid = starts >= 0
+    starts = np.clip(starts, 0, None)
+
+    # --- Returns ---
+    log_growth = prefix[ends] - prefix[starts]
+    returns = np.where(valid, np.expm1(log_growth) * 100, np.nan)
+
+    # --- Volatility (sample std of the window's log returns) ---
+    s1 = prefix_c[ends] - prefix_c[starts]
+    s2 = prefix_sq[ends] - prefix_sq[starts]
+    variance = np.maximum(s2 - s1 ** 2 / lengths, 0.0) / (lengths - 1)
+    volatility = np.where(valid, np.sqrt(variance * TRADING_DAYS) * 100, np.nan)
+
+    # --- Max drawdown (same h + 1 bars the return spans) ---
+    max_drawdown = (
+        _window_drawdowns(values, lengths + 1)
+        if n
+        else np.empty((0, len(lengths)))
+    )
+
+    return returns, volatility, max_drawdown
+
+
+def compute_rolling_metrics(
+    close: pd.Series,
+    horizons: Dict[str, int] | None = None,
+) -> RollingMetrics:
+    """
+    Rolling returns, volatility and max drawdown for several horizons.
+
+    Returns and volatility come from one set of log-return prefix sums
+    (sum and sum of squares), so each extra horizon costs one vectorized
+    lookup. Max drawdown shares one doubling table across horizons (see
+    _window_drawdowns).
+    """
+
+    horizons = HORIZONS if horizons is None else horizons
+    names = list(horizons)
+    lengths = np.array([horizons[name] for name in names])
+
+    close = close.dropna()
+    returns, volatility, max_drawdown = _rolling_arrays(close.to_numpy(dtype=float), lengths)
+
+    def frame(data: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(data, index=close.index, columns=names)
+
+    return RollingMetrics(
+        returns=frame(returns),
+        volatility=frame(volatility),
+        max_drawdown=frame(max_drawdown),
+    )
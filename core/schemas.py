@@ -0,0 +1,311 @@
+from dataclasses import asdict, dataclass, fields
+from typing import Dict, List
+
+import msgpack
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from core.charts import LazyCharts
+from core.metrics import PriceMetrics
+from core.trend_engine import TREND_LABELS, WINDOW_FIELDS, TrendWindows
+
+
+# Bumped whenever an encoded layout changes; decoders reject other versions
+SCHEMA_VERSION = 1
+
+
+# -----------------------------
+# Snapshot sections
+# -----------------------------
+
+@dataclass
+class SnapshotMeta:
+    ticker: str
+    benchmark: str
+    analysis_period: str
+
+
+@dataclass
+class GrowthSection:
+    cagr: float
+    price_multiple: float
+    total_return_pct: float
+    positive_year_ratio: float
+
+
+@dataclass
+class RiskSection:
+    max_drawdown: float
+    worst_rolling_12m: float
+
+
+@dataclass
+class ConsistencySection:
+    annualized_volatility: float
+
+
+@dataclass
+class BenchmarkSection:
+    cagr: float
+    price_multiple: float
+    total_return_pct: float
+    annualized_volatility: float
+    max_drawdown: float
+    years: float
+
+
+@dataclass
+class SummaryFlags:
+    outperformed_benchmark: bool
+    higher_volatility_than_benchmark: bool
+
+
+_SECTIONS = ("meta", "growth", "risk", "consistency", "benchmark", "summary_flags")
+
+
+def _section(cls, values: dict):
+    # NumPy scalars -> the declared Python types
+    return cls(**{f.name: f.type(values[f.name]) for f in fields(cls)})
+
+
+def _plain(values: dict) -> dict:
+    return {
+        key: value.item() if isinstance(value, np.generic) else value
+        for key, value in values.items()
+    }
+
+
+@dataclass
+class Snapshot:
+    """
+    Typed analytics snapshot.
+
+    Mirrors the dict build_snapshot returns. Charts are kept as their
+    full-resolution source series (date-indexed) plus the point budget,
+    so to_dict() can rebuild the same lazy charts section;
+    chart_series is None when the snapshot was built without charts.
+    """
+
+    meta: SnapshotMeta
+    growth: GrowthSection
+    risk: RiskSection
+    consistency: ConsistencySection
+    benchmark: BenchmarkSection
+    summary_flags: SummaryFlags
+    rolling: Dict[str, float]
+    relative: Dict[str, float | None]
+    volatility_summary: str
+    red_flags: List[str]
+    red_flag_checks: Dict[str, bool]
+    chart_series: Dict[str, pd.Series] | None = None
+    chart_points: int | None = None
+
+    @classmethod
+    def from_dict(cls, snapshot: dict) -> "Snapshot":
+        charts = snapshot.get("charts")
+        if isinstance(charts, LazyCharts):
+            chart_series, chart_points = dict(charts.sources), charts.max_points
+        elif charts is not None:
+            # Already-built frames: ["date", name]
+            chart_series = {
+                name: df.set_index("date")[name] for name, df in charts.items()
+            }
+            chart_points = None
+        else:
+            chart_series, chart_points = None, None
+
+        return cls(
+            meta=_section(SnapshotMeta, snapshot["meta"]),
+            growth=_section(GrowthSection, snapshot["growth"]),
+            risk=_section(RiskSection, snapshot["risk"]),
+            consistency=_section(ConsistencySection, snapshot["consistency"]),
+            benchmark=_section(BenchmarkSection, snapshot["benchmark"]),
+            summary_flags=_section(SummaryFlags, snapshot["summary_flags"]),
+            rolling=_plain(snapshot["rolling"]),
+            relative=_plain(snapshot["relative"]),
+            volatility_summary=snapshot["volatility_summary"],
+            red_flags=list(snapshot["red_flags"]),
+            red_flag_checks=_plain(snapshot["red_flag_checks"]),
+            chart_series=chart_series,
+            chart_points=chart_points,
+        )
+
+    def scalars(self) -> dict:
+        """
+        Everything but the chart series, as plain Python values.
+        """
+        out = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if f.name in _SECTIONS:
+                out[f.name] = asdict(value)
+            elif f.name != "chart_series":
+                out[f.name] = value
+        return out
+
+    def to_dict(self) -> dict:
+        snapshot = self.scalars()
+        chart_points = snapshot.pop("chart_points")
+        if self.chart_series is not None:
+            snapshot["charts"] = LazyCharts(dict(self.chart_series), chart_points)
+        return snapshot
+
+
+# -----------------------------
+# Arrow IPC (series and columns)
+# -----------------------------
+
+def _to_ipc(table: pa.Table) -> bytes:
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _from_ipc(data: bytes) -> pa.Table:
+    return pa.ipc.open_stream(pa.py_buffer(data)).read_all()
+
+
+def _column(table: pa.Table, name: str) -> pa.Array:
+    column = table.column(name)
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def _numpy(array: pa.Array) -> np.ndarray:
+    # Zero-copy for null-free numeric and timestamp columns
+    return array.to_numpy(zero_copy_only=False)
+
+
+def _series_to_ipc(series: pd.Series) -> bytes:
+    return _to_ipc(pa.table({
+        "date": pa.array(series.index.to_numpy()),
+        "value": pa.array(series.to_numpy(dtype=float)),
+    }))
+
+
+def _series_from_ipc(data: bytes, name: str) -> pd.Series:
+    table = _from_ipc(data)
+    return pd.Series(
+        _numpy(_column(table, "value")),
+        index=pd.DatetimeIndex(_numpy(_column(table, "date"))),
+        name=name,
+        copy=False,
+    )
+
+
+def _pack(kind: str, body: dict) -> bytes:
+    return msgpack.packb({"v": SCHEMA_VERSION, "kind": kind, **body}, use_bin_type=True)
+
+
+def _unpack(data: bytes, kind: str) -> dict:
+    payload = msgpack.unpackb(data, raw=False)
+    if payload.get("v") != SCHEMA_VERSION or payload.get("kind") != kind:
+        raise ValueError(
+            f"Expected {kind} v{SCHEMA_VERSION}, got {payload.get('kind')} v{payload.get('v')}"
+        )
+    return payload
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def encode_snapshot(snapshot: dict | Snapshot) -> bytes:
+    """
+    Compact binary snapshot: msgpack for the scalars, one Arrow IPC
+    stream per chart series. Lazy charts are encoded from their sources,
+    never built.
+    """
+    if not isinstance(snapshot, Snapshot):
+        snapshot = Snapshot.from_dict(snapshot)
+
+    series = None
+    if snapshot.chart_series is not None:
+        series = {name: _series_to_ipc(s) for name, s in snapshot.chart_series.items()}
+
+    return _pack("snapshot", {"scalars": snapshot.scalars(), "series": series})
+
+
+def decode_snapshot(data: bytes, as_dict: bool = True) -> dict | Snapshot:
+    """
+    Inverse of encode_snapshot. Returns the snapshot dict (the shape
+    build_snapshot returns) or, with as_dict=False, the typed Snapshot.
+    """
+    payload = _unpack(data, "snapshot")
+    scalars = payload["scalars"]
+
+    snapshot = Snapshot(
+        meta=SnapshotMeta(**scalars["meta"]),
+        growth=GrowthSection(**scalars["growth"]),
+        risk=RiskSection(**scalars["risk"]),
+        consistency=ConsistencySection(**scalars["consistency"]),
+        benchmark=BenchmarkSection(**scalars["benchmark"]),
+        summary_flags=SummaryFlags(**scalars["summary_flags"]),
+        rolling=scalars["rolling"],
+        relative=scalars["relative"],
+        volatility_summary=scalars["volatility_summary"],
+        red_flags=scalars["red_flags"],
+        red_flag_checks=scalars["red_flag_checks"],
+        chart_series=(
+            {name: _series_from_ipc(raw, name) for name, raw in payload["series"].items()}
+            if payload["series"] is not None
+            else None
+        ),
+        chart_points=scalars["chart_points"],
+    )
+
+    return snapshot.to_dict() if as_dict else snapshot
+
+
+# PriceMetrics attribute -> series name
+_METRIC_SERIES = {
+    "returns": "returns",
+    "running_max": "running_max",
+    "drawdowns": "drawdown",
+    "yearly_returns": "yearly_return",
+    "rolling_12m": "rolling_12m",
+}
+
+
+def encode_price_metrics(metrics: PriceMetrics) -> bytes:
+    scalars = {
+        f.name: float(getattr(metrics, f.name))
+        for f in fields(metrics)
+        if f.name not in _METRIC_SERIES
+    }
+    series = {name: _series_to_ipc(getattr(metrics, name)) for name in _METRIC_SERIES}
+    return _pack("price_metrics", {"scalars": scalars, "series": series})
+
+
+def decode_price_metrics(data: bytes) -> PriceMetrics:
+    payload = _unpack(data, "price_metrics")
+    series = {
+        attr: _series_from_ipc(payload["series"][attr], name)
+        for attr, name in _METRIC_SERIES.items()
+    }
+    return PriceMetrics(**payload["scalars"], **series)
+
+
+def encode_trend_windows(windows: TrendWindows) -> bytes:
+    """
+    TrendWindows as a single Arrow IPC stream (labels dictionary-encoded).
+    """
+    return _pack("trend_windows", {"table": _to_ipc(windows.to_arrow())})
+
+
+def decode_trend_windows(data: bytes) -> TrendWindows:
+    table = _from_ipc(_unpack(data, "trend_windows")["table"])
+
+    columns = {}
+    for name in WINDOW_FIELDS:
+        array = _column(table, name)
+        if name == "trend_label":
+            # Dictionary is always TREND_LABELS, so the indices are the codes
+            if array.dictionary.to_pylist() != list(TREND_LABELS):
+                raise ValueError("Unexpected trend label dictionary")
+            columns[name] = _numpy(array.indices).astype(np.int8, copy=False)
+        else:
+            columns[name] = _numpy(array)
+
+    return TrendWindows(columns)
@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import fields, is_dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+import pandas as pd
+
+from core.analytics_pipeline import build_snapshot
+from core.performance_engine import SUMMARY_FIELDS as RELATIVE_SUMMARY_FIELDS
+from core.red_flags import DETECTORS
+from core.rolling_metrics import summary_fields as rolling_summary_fields
+from core.schemas import Snapshot
+from data.data_loader import benchmark_for, load_daily_data, load_daily_data_batch
+
+logger = logging.getLogger(__name__)
+
+
+# -------------------------------------------------
+# Result rows
+# -------------------------------------------------
+def flatten_snapshot(snapshot: dict) -> dict:
+    """
+    One flat row per ticker: every scalar in the snapshot's dict
+    sections as "section.key" (charts are dropped).
+    """
+    row = {}
+    for section, values in snapshot.items():
+        if section == "charts" or not isinstance(values, dict):
+            continue
+        for key, value in values.items():
+            if isinstance(value, (str, int, float, bool)) or value is None:
+                row[f"{section}.{key}"] = value
+    return row
+
+
+def result_columns() -> Dict[str, type]:
+    """
+    Every column a screen row can have -> its Python type (str, float
+    or bool), in a stable order: row identity first, then each
+    snapshot section's scalars.
+    """
+    columns = {"ticker": str, "status": str, "error": str}
+
+    for f in fields(Snapshot):
+        if is_dataclass(f.type):
+            for field in fields(f.type):
+                columns[f"{f.name}.{field.name}"] = field.type
+
+    columns.update({f"rolling.{key}": float for key in rolling_summary_fields()})
+    columns.update({f"relative.{key}": float for key in RELATIVE_SUMMARY_FIELDS})
+    columns.update({f"red_flag_checks.{name}": bool for name in DETECTORS})
+    return columns
+
+
+# -------------------------------------------------
+# Worker side
+# -------------------------------------------------
+# Each worker process keeps the benchmarks it has loaded, so a benchmark
+# is read once per worker rather than once per ticker.
+_worker_benchmarks: Dict[str, pd.DataFrame] = {}
+
+
+def _screen_one(ticker: str, years: int) -> dict:
+    try:
+        benchmark_ticker = benchmark_for(ticker)
+        if benchmark_ticker not in _worker_benchmarks:
+            _worker_benchmarks[benchmark_ticker] = load_daily_data(benchmark_ticker, years)
+
+        snapshot = build_snapshot(
+            ticker,
+            load_daily_data(ticker, years),
+            _worker_benchmarks[benchmark_ticker],
+            years,
+            benchmark_ticker,
+            include_charts=False,
+        )
+        return {"ticker": ticker, "status": "ok", "error": None, **flatten_snapshot(snapshot)}
+
+    except Exception as e:
+        # One bad ticker must not take down the screen
+        return {"ticker": ticker, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+
+# -------------------------------------------------
+# Sinks
+# -------------------------------------------------
+class JsonlSink:
+    """
+    Appends one JSON line per result and flushes as results arrive.
+    """
+
+    def __init__(self, path: Path | str):
+        self.file = open(path, "w")
+
+    def write(self, row: dict) -> None:
+        self.file.write(json.dumps(row, default=str) + "\n")
+        self.file.flush()
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class ParquetSink:
+    """
+    Writes results as Parquet row groups of batch_size rows.
+
+    The schema is declared up front from result_columns(), so every
+    batch, whichever rows it holds, writes the same columns; error rows
+    and metrics a short history lacks are nulls.
+    """
+
+    def __init__(self, path: Path | str, batch_size: int = 100):
+        self.path = path
+        self.batch_size = batch_size
+        self.rows: List[dict] = []
+        self.writer = None
+
+    def write(self, row: dict) -> None:
+        self.rows.append(row)
+        if len(self.rows) >= self.batch_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        if not self.rows:
+            return
+
+        if self.writer is None:
+            types = {str: pa.string(), float: pa.float64(), bool: pa.bool_()}
+            schema = pa.schema(
+                [(name, types[kind]) for name, kind in result_columns().items()]
+            )
+            self.writer = pq.ParquetWriter(self.path, schema)
+
+        self.writer.write_table(pa.Table.from_pylist(self.rows, schema=self.writer.schema))
+        self.rows = []
+
+    def close(self) -> None:
+        self._flush()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_sink(path: Path | str):
+    if str(path).endswith(".parquet"):
+        return ParquetSink(path)
+    return JsonlSink(path)
+
+
+# -------------------------------------------------
+# Public API
+# -------------------------------------------------
+def iter_screen(
+    tickers: Iterable[str],
+    years: int = 10,
+    max_workers: int | None = None,
+    max_pending: int | None = None,
+) -> Iterator[dict]:
+    """
+    Run the analytics pipeline over a universe on a process pool.
+
+    Yields one flat row per ticker as soon as it finishes (completion
+    order, not input order). Failures come back as rows with
+    status="error" instead of aborting the screen. At most max_pending
+    tickers are in flight, which bounds memory on large universes.
+    """
+
+    tickers = list(dict.fromkeys(tickers))
+    max_workers = max_workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * max_workers
+
+    # Warm the on-disk cache for the shared benchmarks in one grouped
+    # download, so workers never race to fetch the same index
+    benchmarks = sorted({benchmark_for(t) for t in tickers})
+    try:
+        load_daily_data_batch(benchmarks, years, align=False)
+    except Exception as e:
+        logger.warning(f"[SCREEN] Benchmark prefetch failed: {e}")
+
+    remaining = iter(tickers)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        pending = {}
+
+        def submit_next() -> bool:
+            ticker = next(remaining, None)
+            if ticker is None:
+                return False
+            pending[pool.submit(_screen_one, ticker, years)] = ticker
+            return True
+
+        while len(pending) < max_pending and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                ticker = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as e:
+                    # Worker process died (e.g. OOM); isolate to this ticker
+                    yield {"ticker": ticker, "status": "error", "error": f"{type(e).__name__}: {e}"}
+
+                submit_next()
+
+
+def screen_universe(
+    tickers: Iterable[str],
+    years: int = 10,
+    output: Path | str | None = None,
+    max_workers: int | None = None,
+    max_pending: int | None = None,
+) -> List[dict]:
+    """
+    Screen a universe and return all rows.
+
+    When output is given (".parquet" or ".jsonl"), rows are also
+    streamed to it as they finish, so a crash midway keeps the work
+    already done.
+    """
+
+    sink = open_sink(output) if output else None
+    rows = []
+
+    try:
+        for row in iter_screen(tickers, years, max_workers, max_pending):
+            rows.append(row)
+            if sink is not None:
+                sink.write(row)
+
+            if row["status"] == "error":
+                logger.warning(f"[SCREEN] {row['ticker']} failed: {row['error']}")
+    finally:
+        if sink is not None:
+            sink.close()
+
+    return rows
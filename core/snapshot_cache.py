@@ -0,0 +1,237 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+from config.settings import (
+    CHART_MAX_POINTS,
+    OHLCV_REFRESH_SECONDS,
+    SNAPSHOT_CACHE_DIR,
+    SNAPSHOT_CACHE_MAX_BYTES,
+    SNAPSHOT_CACHE_TTL_SECONDS,
+)
+from core.analytics_pipeline import build_snapshot
+from core.charts import LazyCharts
+from core.schemas import decode_snapshot, encode_snapshot
+from data.data_loader import benchmark_for, load_daily_data_batch, require_loaded
+
+
+# (ticker, years, benchmark, last bars tag, chart points)
+SnapshotKey = Tuple[str, int, str, str, int | None]
+
+
+def _estimate_bytes(obj) -> int:
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        return int(np.sum(obj.memory_usage(index=True, deep=True)))
+    if isinstance(obj, LazyCharts):
+        # Count what is held, without building the frames
+        return sys.getsizeof(obj) + _estimate_bytes(obj.sources)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(
+            _estimate_bytes(k) + _estimate_bytes(v) for k, v in obj.items()
+        )
+    return sys.getsizeof(obj)
+
+
+class SnapshotCache:
+    """
+    LRU + TTL cache of analytics snapshots with a memory budget.
+
+    Keys carry the last available bars (date and prices), so a snapshot
+    is only superseded when new market data lands, including a partial
+    bar replaced intraday; stale keys simply age out.
+    An optional disk tier keeps snapshots across process restarts, in
+    the core.schemas binary encoding.
+
+    Cached snapshots are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = SNAPSHOT_CACHE_MAX_BYTES,
+        ttl_seconds: float = SNAPSHOT_CACHE_TTL_SECONDS,
+        disk_dir: Path | str | None = SNAPSHOT_CACHE_DIR,
+    ):
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+
+        # key -> (snapshot, size, stored_at)
+        self._entries: "OrderedDict[SnapshotKey, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    # -----------------------------
+    # Memory tier
+    # -----------------------------
+    def _evict(self) -> None:
+        while self._entries and self._bytes > self.max_bytes:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+
+    def get(self, key: SnapshotKey) -> dict | None:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                snapshot, size, stored_at = entry
+                if time.time() - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return snapshot
+
+                del self._entries[key]
+                self._bytes -= size
+
+        snapshot = self._disk_get(key)
+        if snapshot is not None:
+            self.put(key, snapshot, to_disk=False)
+            with self._lock:
+                self.hits += 1
+            return snapshot
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def put(self, key: SnapshotKey, snapshot: dict, to_disk: bool = True) -> None:
+        size = _estimate_bytes(snapshot)
+
+        with self._lock:
+            if key in self._entries:
+                self._bytes -= self._entries.pop(key)[1]
+
+            # Larger than the whole budget: don't flush everything for it
+            if size <= self.max_bytes:
+                self._entries[key] = (snapshot, size, time.time())
+                self._bytes += size
+                self._evict()
+
+        if to_disk:
+            self._disk_put(key, snapshot)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        return self._bytes
+
+    # -----------------------------
+    # Disk tier
+    # -----------------------------
+    def _disk_path(self, key: SnapshotKey) -> Path:
+        digest = hashlib.sha256(repr(key).encode()).hexdigest()
+        return self.disk_dir / f"{digest}.snap"
+
+    def _disk_get(self, key: SnapshotKey) -> dict | None:
+        if self.disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            if time.time() - path.stat().st_mtime >= self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return decode_snapshot(path.read_bytes())
+        except (OSError, ValueError, KeyError):
+            # Missing, truncated or written by another schema version
+            return None
+
+    def _disk_put(self, key: SnapshotKey, snapshot: dict) -> None:
+        if self.disk_dir is None:
+            return
+
+        self.disk_dir.mkdir(parents=True, exist_ok=True)
+        path = self._disk_path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+
+        tmp.write_bytes(encode_snapshot(snapshot))
+        os.replace(tmp, path)
+
+
+# -------------------------------------------------
+# Cached pipeline entry point
+# -------------------------------------------------
+_default_cache = SnapshotCache()
+
+# (ticker, years, chart points) -> (key, validated_at): lets repeat requests skip the
+# data layer entirely until the bar data could have changed
+_validated: dict = {}
+
+
+def _last_bars(*frames: pd.DataFrame) -> str:
+    """
+    Date of the latest bar plus a digest of each frame's last row: the
+    loader replaces a partial bar in place during market hours, which
+    leaves the date unchanged.
+    """
+    rows = [df.loc[df["close"].last_valid_index()] for df in frames]
+    last = max(row.name for row in rows)
+    digest = hashlib.sha256(
+        np.concatenate([row.to_numpy(dtype=float) for row in rows]).tobytes()
+    ).hexdigest()[:16]
+    return f"{last:%Y-%m-%d}:{digest}"
+
+
+def cached_trend_analysis(
+    ticker: str,
+    years: int = 10,
+    cache: SnapshotCache | None = None,
+    chart_points: int | None = CHART_MAX_POINTS,
+) -> dict:
+    """
+    run_trend_analysis behind a SnapshotCache.
+
+    Within the OHLCV refresh interval a repeat request is a dictionary
+    lookup. After it, the data layer is consulted (a local read plus a
+    top-up) and the snapshot is rebuilt only if a new bar has landed or
+    the last one changed.
+    """
+
+    if cache is None:
+        cache = _default_cache
+
+    seen = _validated.get((ticker, years, chart_points))
+    if seen is not None and time.time() - seen[1] < OHLCV_REFRESH_SECONDS:
+        snapshot = cache.get(seen[0])
+        if snapshot is not None:
+            return snapshot
+
+    benchmark_ticker = benchmark_for(ticker)
+    frames = load_daily_data_batch([ticker], years, include_benchmarks=True)
+    require_loaded(frames, [ticker, benchmark_ticker])
+
+    last_bars = _last_bars(frames[ticker], frames[benchmark_ticker])
+    key = (ticker, years, benchmark_ticker, last_bars, chart_points)
+
+    snapshot = cache.get(key)
+    if snapshot is None:
+        snapshot = build_snapshot(
+            ticker,
+            frames[ticker],
+            frames[benchmark_ticker],
+            years,
+            benchmark_ticker,
+            chart_points,
+        )
+        cache.put(key, snapshot)
+
+    _validated[(ticker, years, chart_points)] = (key, time.time())
+
+    return snapshot
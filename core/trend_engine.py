@@ -2,7 +2,8 @@ import pandas as pd
 import numpy as np
 from typing import List, Dict
 from dataclasses import dataclass
-from sklearn.linear_model import LinearRegression
+
+from core.indicators import SeriesIndicators
 
 
 # -----------------------------
@@ -21,177 +22,417 @@ class TrendWindowResult:
     volatility_score: float
 
 
-# -----------------------------
-# Scoring helpers
-# -----------------------------
+# trend_label is stored as an int8 code into this tuple
+TREND_LABELS = ("DOWNTREND", "SIDEWAYS", "UPTREND")
+
+WINDOW_FIELDS = (
+    "start_date",
+    "end_date",
+    "trend_score",
+    "trend_label",
+    "confidence",
+    "direction_score",
+    "structure_score",
+    "volatility_score",
+)
+
 
-def _direction_score(prices: pd.Series) -> float:
+class TrendWindows:
     """
-    Direction score based on normalized linear regression slope.
-    Returns score in range [0, 40]
+    Columnar trend window results.
+
+    One NumPy array per field instead of one dict per window. Iterating
+    or indexing by position still yields the familiar window dicts, so
+    callers written against the old list-of-dicts return keep working;
+    bulk consumers should read columns (windows["trend_score"]) or
+    export with to_pandas() / to_arrow(), which reuse the arrays.
     """
-    y = prices.values.reshape(-1, 1)
-    x = np.arange(len(y)).reshape(-1, 1)
 
-    model = LinearRegression().fit(x, y)
-    slope = model.coef_[0][0]
+    __slots__ = ("columns",)
+
+    def __init__(self, columns: Dict[str, np.ndarray]):
+        self.columns = columns
+
+    @classmethod
+    def empty(cls) -> "TrendWindows":
+        columns = {name: np.zeros(0) for name in WINDOW_FIELDS}
+        columns["start_date"] = np.zeros(0, dtype="datetime64[ns]")
+        columns["end_date"] = np.zeros(0, dtype="datetime64[ns]")
+        columns["trend_label"] = np.zeros(0, dtype=np.int8)
+        return cls(columns)
+
+    @classmethod
+    def concat(cls, parts: List["TrendWindows"]) -> "TrendWindows":
+        if not parts:
+            return cls.empty()
+        return cls({
+            name: np.concatenate([p.columns[name] for p in parts])
+            for name in WINDOW_FIELDS
+        })
 
-    price_range = prices.max() - prices.min()
-    if price_range == 0:
-        return 20.0  # neutral
+    # -----------------------------
+    # Sequence protocol
+    # -----------------------------
+    def __len__(self) -> int:
+        return len(self.columns["trend_score"])
+
+    def __iter__(self):
+        return iter(self.to_dicts())
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key == "trend_label":
+                return np.array(TREND_LABELS)[self.columns[key]]
+            return self.columns[key]
+
+        if isinstance(key, slice):
+            return TrendWindows({k: v[key] for k, v in self.columns.items()})
+
+        return self._record(range(len(self))[key])
+
+    def __repr__(self) -> str:
+        return f"TrendWindows(n={len(self)})"
+
+    # -----------------------------
+    # Conversion
+    # -----------------------------
+    def _record(self, i: int) -> Dict:
+        c = self.columns
+        return {
+            "start_date": pd.Timestamp(c["start_date"][i]),
+            "end_date": pd.Timestamp(c["end_date"][i]),
+            "trend_score": float(c["trend_score"][i]),
+            "trend_label": TREND_LABELS[c["trend_label"][i]],
+            "confidence": float(c["confidence"][i]),
+            "direction_score": float(c["direction_score"][i]),
+            "structure_score": float(c["structure_score"][i]),
+            "volatility_score": float(c["volatility_score"][i]),
+        }
+
+    def to_dicts(self) -> List[Dict]:
+        c = self.columns
+        labels = [TREND_LABELS[code] for code in c["trend_label"].tolist()]
+
+        return [
+            dict(zip(WINDOW_FIELDS, row))
+            for row in zip(
+                pd.DatetimeIndex(c["start_date"]),
+                pd.DatetimeIndex(c["end_date"]),
+                c["trend_score"].tolist(),
+                labels,
+                c["confidence"].tolist(),
+                c["direction_score"].tolist(),
+                c["structure_score"].tolist(),
+                c["volatility_score"].tolist(),
+            )
+        ]
+
+    def to_results(self) -> List[TrendWindowResult]:
+        return [TrendWindowResult(**record) for record in self.to_dicts()]
+
+    def to_pandas(self) -> pd.DataFrame:
+        """
+        DataFrame view over the column arrays (labels as a categorical).
+        """
+        data = dict(self.columns)
+        data["trend_label"] = pd.Categorical.from_codes(
+            self.columns["trend_label"], categories=list(TREND_LABELS)
+        )
+        return pd.DataFrame(data, columns=list(WINDOW_FIELDS), copy=False)
+
+    def to_arrow(self):
+        """
+        pyarrow Table over the column arrays (labels dictionary-encoded).
+        """
+        import pyarrow as pa
+
+        arrays = {
+            name: pa.array(self.columns[name])
+            for name in WINDOW_FIELDS
+            if name != "trend_label"
+        }
+        arrays["trend_label"] = pa.DictionaryArray.from_arrays(
+            pa.array(self.columns["trend_label"]), pa.array(TREND_LABELS)
+        )
+        return pa.table({name: arrays[name] for name in WINDOW_FIELDS})
 
-    normalized_slope = slope / price_range
 
-    if normalized_slope > 0.15:
-        return 40.0
-    elif normalized_slope > 0.05:
-        return 30.0
-    elif normalized_slope > -0.05:
-        return 20.0
-    elif normalized_slope > -0.15:
-        return 10.0
-    else:
-        return 0.0
+# -----------------------------
+# Scoring helpers
+# -----------------------------
+#
+# Every window is scored at once from a SeriesIndicators built over the
+# whole series. In "window" MA mode each score reproduces the
+# per-window definition exactly, including the NaN warm-up of the
+# moving averages inside a window. "full_history" mode reads MAs
+# warmed up on the bars before the window instead.
+
+MA_MODES = ("window", "full_history")
 
 
-def _structure_score(prices: pd.Series) -> float:
+def _direction_scores(
+    ind: SeriesIndicators,
+    starts: np.ndarray,
+    window_size: int,
+) -> np.ndarray:
+    """
+    Direction score based on normalized linear regression slope.
+    Returns scores in range [0, 40]
+    """
+    # Closed-form OLS slope of price on bar number 0..w-1
+    sum_y = ind.window_sum(ind.prefix_price, starts, 0, window_size)
+    sum_iy = ind.window_sum(ind.prefix_weighted_price, starts, 0, window_size)
+
+    # Bar numbers are global; shift each window back to 0..w-1
+    offset = starts.reshape((-1,) + (1,) * (sum_y.ndim - 1))
+
+    x_mean = (window_size - 1) / 2
+    sxy = (sum_iy - offset * sum_y) - x_mean * sum_y
+    sxx = window_size * (window_size ** 2 - 1) / 12
+    slope = sxy / sxx
+
+    extrema = ind.window_extrema(window_size)
+    ends = starts + window_size - 1
+    price_range = extrema["high"][ends] - extrema["low"][ends]
+    flat = price_range == 0
+
+    normalized_slope = slope / np.where(flat, 1.0, price_range)
+
+    scores = np.select(
+        [
+            normalized_slope > 0.15,
+            normalized_slope > 0.05,
+            normalized_slope > -0.05,
+            normalized_slope > -0.15,
+        ],
+        [40.0, 30.0, 20.0, 10.0],
+        default=0.0,
+    )
+
+    # Flat window is neutral
+    return np.where(flat, 20.0, scores)
+
+
+def _structure_scores(
+    ind: SeriesIndicators,
+    starts: np.ndarray,
+    window_size: int,
+    ma_mode: str = "window",
+) -> np.ndarray:
     """
     Structure score based on HH/HL behavior and MA stability.
-    Returns score in range [0, 40]
+    Returns scores in range [0, 40]
     """
-    score = 0.0
-
     # --- Higher highs / higher lows ---
-    highs = prices.rolling(3).max()
-    lows = prices.rolling(3).min()
-
-    hh = (highs.diff() > 0).mean()
-    hl = (lows.diff() > 0).mean()
-    structure_ratio = np.nanmean([hh, hl])
-
-    if structure_ratio > 0.7:
-        score += 13
-    elif structure_ratio > 0.5:
-        score += 8
-    else:
-        score += 3
+    # 3-bar extrema are only valid from window position 2, so their
+    # diff counts from position 3
+    hh = ind.window_sum(ind.prefix_higher_high, starts, 3, window_size) / window_size
+    hl = ind.window_sum(ind.prefix_higher_low, starts, 3, window_size) / window_size
+    structure_ratio = (hh + hl) / 2
+
+    score = np.select(
+        [structure_ratio > 0.7, structure_ratio > 0.5],
+        [13.0, 8.0],
+        default=3.0,
+    )
 
     # --- Moving averages ---
-    ma_50 = prices.rolling(50).mean()
-    ma_200 = prices.rolling(200).mean()
+    if ma_mode == "window":
+        # A window's own MA is NaN for its first period-1 bars
+        first_50, first_200 = 49, 199
+    else:
+        first_50, first_200 = 0, 0
 
-    above_50 = (prices > ma_50).mean()
-    above_200 = (prices > ma_200).mean()
+    above_50 = ind.window_sum(ind.prefix_above_50, starts, first_50, window_size) / window_size
+    above_200 = ind.window_sum(ind.prefix_above_200, starts, first_200, window_size) / window_size
 
-    if above_50 > 0.7 and above_200 > 0.7:
-        score += 13
-    elif above_50 > 0.7:
-        score += 8
-    else:
-        score += 3
+    score += np.select(
+        [(above_50 > 0.7) & (above_200 > 0.7), above_50 > 0.7],
+        [13.0, 8.0],
+        default=3.0,
+    )
 
     # --- MA stability ---
-    crossovers = ((ma_50 > ma_200).astype(int).diff().abs() == 1).sum()
-
-    if crossovers <= 1:
-        score += 13
-    elif crossovers <= 3:
-        score += 8
+    if ma_mode == "window":
+        # Inside a window the MA50 > MA200 flag is 0 until position
+        # 199, so the flag switching on there counts as a crossover
+        crossovers = ind.window_sum(ind.prefix_ma_flips, starts, 200, window_size)
+        if window_size > 199:
+            crossovers = crossovers + ind.golden[starts + 199]
     else:
-        score += 3
+        crossovers = ind.window_sum(ind.prefix_ma_flips, starts, 1, window_size)
 
-    return float(score)
+    score += np.select(
+        [crossovers <= 1, crossovers <= 3],
+        [13.0, 8.0],
+        default=3.0,
+    )
 
+    return score
 
-def _volatility_score(prices: pd.Series) -> float:
+
+def _volatility_scores(
+    ind: SeriesIndicators,
+    starts: np.ndarray,
+    window_size: int,
+) -> np.ndarray:
     """
     Volatility context score.
-    Returns score in range [0, 20]
+    Returns scores in range [0, 20]
     """
-    returns = prices.pct_change().dropna()
-    vol = returns.std()
+    stats = ind.window_dispersion(starts, window_size)
+    ends = starts + window_size - 1
 
-    price_change = prices.iloc[-1] - prices.iloc[0]
+    vol = stats["return_std"]
+    mean_return = stats["return_mean"]
 
-    if price_change > 0 and vol < returns.mean() * 2:
-        return 20.0
-    elif price_change > 0:
-        return 15.0
-    elif abs(price_change) < prices.std():
-        return 8.0
-    else:
-        return 0.0
+    price_change = ind.values[ends] - ind.values[starts]
 
+    return np.select(
+        [
+            (price_change > 0) & (vol < mean_return * 2),
+            price_change > 0,
+            np.abs(price_change) < stats["price_std"],
+        ],
+        [20.0, 15.0, 8.0],
+        default=0.0,
+    )
 
-def _trend_label(score: float) -> str:
-    if score >= 70:
-        return "UPTREND"
-    elif score >= 40:
-        return "SIDEWAYS"
-    else:
-        return "DOWNTREND"
+
+def _trend_labels(scores: np.ndarray) -> np.ndarray:
+    """
+    Label codes into TREND_LABELS.
+    """
+    return np.select(
+        [scores >= 70, scores >= 40],
+        [TREND_LABELS.index("UPTREND"), TREND_LABELS.index("SIDEWAYS")],
+        default=TREND_LABELS.index("DOWNTREND"),
+    ).astype(np.int8)
 
 
-def _confidence(score: float) -> float:
+def _confidences(scores: np.ndarray) -> np.ndarray:
     """
     Simple confidence proxy based on distance from regime boundaries.
     """
-    if score >= 70:
-        return min(100.0, 60 + (score - 70))
-    elif score >= 40:
-        return 50.0
-    else:
-        return max(20.0, score)
+    return np.select(
+        [scores >= 70, scores >= 40],
+        [np.minimum(100.0, 60 + (scores - 70)), 50.0],
+        default=np.maximum(20.0, scores),
+    )
+
+
+def _score_windows(
+    ind: SeriesIndicators,
+    starts: np.ndarray,
+    window_size: int,
+    ma_mode: str = "window",
+) -> Dict[str, np.ndarray]:
+    d_scores = _direction_scores(ind, starts, window_size)
+    s_scores = _structure_scores(ind, starts, window_size, ma_mode)
+    v_scores = _volatility_scores(ind, starts, window_size)
+
+    total_scores = d_scores + s_scores + v_scores
+
+    return {
+        "trend_score": total_scores,
+        "trend_label": _trend_labels(total_scores),
+        "confidence": _confidences(total_scores),
+        "direction_score": d_scores,
+        "structure_score": s_scores,
+        "volatility_score": v_scores,
+    }
+
+
+def _window_results(
+    dates: pd.Index,
+    starts: np.ndarray,
+    window_size: int,
+    scores: Dict[str, np.ndarray],
+) -> TrendWindows:
+    columns = {
+        "start_date": pd.DatetimeIndex(dates[starts]).to_numpy("datetime64[ns]"),
+        "end_date": pd.DatetimeIndex(dates[starts + window_size - 1]).to_numpy("datetime64[ns]"),
+    }
+    for name in WINDOW_FIELDS[2:]:
+        values = scores[name]
+        columns[name] = values if name == "trend_label" else np.round(values, 2)
+
+    return TrendWindows(columns)
+
+
+def _check_ma_mode(ma_mode: str) -> None:
+    if ma_mode not in MA_MODES:
+        raise ValueError(f"ma_mode must be one of {MA_MODES}, got {ma_mode!r}")
 
 
 # -----------------------------
 # Public API
 # -----------------------------
 
+WEEKS_PER_MONTH = 4
+
+
 def compute_trend_windows(
     weekly_df: pd.DataFrame,
     price_col: str = "close",
     window_months: int = 12,
-    step_months: int = 3
-) -> List[Dict]:
+    step_months: int = 3,
+    ma_mode: str = "window",
+) -> TrendWindows:
     """
     Compute rolling trend regimes from weekly price data.
 
+    Returns a columnar TrendWindows; iterate it (or call to_dicts())
+    for one dict per window.
+
     weekly_df:
         DateTimeIndex
         must contain `price_col`
+
+    ma_mode:
+        "window" computes MA50/MA200 inside each window (a 48-week
+        window never warms up its MA200); "full_history" uses MAs over
+        the whole series, which is cheaper and more meaningful
     """
 
-    results = []
+    _check_ma_mode(ma_mode)
 
-    weeks_per_month = 4
-    window_size = window_months * weeks_per_month
-    step_size = step_months * weeks_per_month
+    window_size = window_months * WEEKS_PER_MONTH
+    step_size = step_months * WEEKS_PER_MONTH
 
     prices = weekly_df[price_col].dropna()
 
-    for start in range(0, len(prices) - window_size, step_size):
-        window_prices = prices.iloc[start:start + window_size]
-        if len(window_prices) < window_size:
-            continue
-
-        d_score = _direction_score(window_prices)
-        s_score = _structure_score(window_prices)
-        v_score = _volatility_score(window_prices)
-
-        total_score = d_score + s_score + v_score
-        label = _trend_label(total_score)
-        confidence = _confidence(total_score)
-
-        results.append({
-            "start_date": window_prices.index[0],
-            "end_date": window_prices.index[-1],
-            "trend_score": round(total_score, 2),
-            "trend_label": label,
-            "confidence": round(confidence, 2),
-            "direction_score": round(d_score, 2),
-            "structure_score": round(s_score, 2),
-            "volatility_score": round(v_score, 2),
-        })
+    starts = np.arange(0, len(prices) - window_size, step_size)
+    if len(starts) == 0:
+        return TrendWindows.empty()
+
+    ind = SeriesIndicators(prices.to_numpy(dtype=float))
+    scores = _score_windows(ind, starts, window_size, ma_mode)
+
+    return _window_results(prices.index, starts, window_size, scores)
+
+
+def summarize_trend_windows(windows: TrendWindows) -> Dict:
+    """
+    Headline trend inputs for the narrative: the most common label,
+    its mean confidence, each label's share of the windows and the
+    latest window's label. Empty if there are no windows.
+    """
 
-    return results
+    if not len(windows):
+        return {}
+
+    codes = windows.columns["trend_label"]
+    counts = np.bincount(codes, minlength=len(TREND_LABELS))
+    dominant = int(np.argmax(counts))
+
+    return {
+        "dominant_trend": TREND_LABELS[dominant],
+        "trend_confidence": round(float(windows.columns["confidence"][codes == dominant].mean()), 1),
+        "trend_distribution": {
+            label: round(count / len(codes), 2)
+            for label, count in zip(TREND_LABELS, counts.tolist())
+            if count
+        },
+        "recent_trend": TREND_LABELS[codes[-1]],
+    }
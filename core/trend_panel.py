@@ -0,0 +1,194 @@
+from dataclasses import dataclass
+from typing import List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import SeriesIndicators
+from core.trend_engine import (
+    TREND_LABELS,
+    WEEKS_PER_MONTH,
+    WINDOW_FIELDS,
+    TrendWindows,
+    _check_ma_mode,
+    _score_windows,
+)
+
+
+# -----------------------------
+# Data contracts
+# -----------------------------
+
+# Same fields as TrendWindows, minus the dates (held separately);
+# trend_label is stored as a code into TREND_LABELS
+PANEL_FIELDS = WINDOW_FIELDS[2:]
+
+
+@dataclass
+class TrendPanel:
+    """
+    Trend windows for many tickers as one dense array.
+
+    values:
+        ticker x window x field (PANEL_FIELDS), NaN past a ticker's
+        last window
+    start_dates / end_dates:
+        ticker x window, NaT past a ticker's last window
+    window_counts:
+        number of valid windows per ticker
+    """
+
+    tickers: List[str]
+    fields: Tuple[str, ...]
+    values: np.ndarray
+    start_dates: np.ndarray
+    end_dates: np.ndarray
+    window_counts: np.ndarray
+
+    def field(self, name: str) -> np.ndarray:
+        """
+        ticker x window array for one field.
+        """
+        return self.values[:, :, self.fields.index(name)]
+
+    def labels(self) -> np.ndarray:
+        """
+        ticker x window array of label strings ("" for padding).
+        """
+        codes = self.field("trend_label")
+        names = np.array(TREND_LABELS + ("",))
+        return names[np.where(np.isnan(codes), len(TREND_LABELS), codes).astype(int)]
+
+    def for_ticker(self, ticker: str) -> TrendWindows:
+        """
+        One ticker's windows, as compute_trend_windows would return them.
+        """
+        i = self.tickers.index(ticker)
+        count = self.window_counts[i]
+
+        columns = {
+            "start_date": self.start_dates[i, :count],
+            "end_date": self.end_dates[i, :count],
+        }
+        for j, name in enumerate(self.fields):
+            values = self.values[i, :count, j]
+            columns[name] = values.astype(np.int8) if name == "trend_label" else values
+
+        return TrendWindows(columns)
+
+
+# -----------------------------
+# Helpers
+# -----------------------------
+
+def _pack(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Move each column's NaNs to the bottom, keeping bar order.
+
+    A dropna() per column, done for all columns at once: every ticker's
+    history then starts at row 0 and windows line up by position.
+    Returns packed values, the source row of every packed cell, and the
+    number of valid bars per column.
+    """
+    missing = np.isnan(values)
+    order = np.argsort(missing, axis=0, kind="stable")
+    packed = np.take_along_axis(values, order, axis=0)
+    lengths = (~missing).sum(axis=0)
+    return packed, order, lengths
+
+
+def _score_block(
+    values: np.ndarray,
+    window_size: int,
+    step_size: int,
+    ma_mode: str,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    packed, order, lengths = _pack(values)
+
+    starts = np.arange(0, packed.shape[0] - window_size, step_size)
+    if len(starts) == 0:
+        n_tickers = values.shape[1]
+        no_rows = np.zeros((n_tickers, 0), dtype=int)
+        return (
+            np.zeros((n_tickers, 0, len(PANEL_FIELDS))),
+            no_rows,
+            no_rows,
+            np.zeros(n_tickers, dtype=int),
+        )
+
+    scores = _score_windows(SeriesIndicators(packed), starts, window_size, ma_mode)
+
+    # Same rule as compute_trend_windows, per ticker length
+    valid = starts[:, None] < (lengths - window_size)[None, :]
+
+    stacked = np.stack(
+        [
+            scores[name] if name == "trend_label" else np.round(scores[name], 2)
+            for name in PANEL_FIELDS
+        ],
+        axis=-1,
+    ).astype(float)
+    stacked[~valid] = np.nan
+
+    # window x ticker -> ticker x window
+    return (
+        stacked.transpose(1, 0, 2),
+        np.where(valid, order[starts], -1).T,
+        np.where(valid, order[starts + window_size - 1], -1).T,
+        valid.sum(axis=0),
+    )
+
+
+def _to_dates(index: pd.DatetimeIndex, rows: np.ndarray) -> np.ndarray:
+    dates = index.to_numpy("datetime64[ns]")[np.clip(rows, 0, None)]
+    dates[rows < 0] = np.datetime64("NaT")
+    return dates
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def compute_trend_panel(
+    closes: pd.DataFrame,
+    window_months: int = 12,
+    step_months: int = 3,
+    ma_mode: str = "window",
+    chunk_size: int = 512,
+) -> TrendPanel:
+    """
+    Compute rolling trend regimes for many tickers in batched array ops.
+
+    closes:
+        dates x tickers weekly closes; histories may be NaN-padded to
+        uneven lengths. Each ticker is scored exactly as
+        compute_trend_windows would score its dropna() series.
+
+    chunk_size bounds how many tickers share one set of window arrays,
+    which caps peak memory on very wide panels.
+    """
+
+    _check_ma_mode(ma_mode)
+
+    window_size = window_months * WEEKS_PER_MONTH
+    step_size = step_months * WEEKS_PER_MONTH
+
+    values = closes.to_numpy(dtype=float)
+    index = pd.DatetimeIndex(closes.index)
+
+    blocks = [
+        _score_block(values[:, i:i + chunk_size], window_size, step_size, ma_mode)
+        for i in range(0, values.shape[1], chunk_size)
+    ]
+
+    if not blocks:
+        blocks = [_score_block(values, window_size, step_size, ma_mode)]
+
+    return TrendPanel(
+        tickers=list(closes.columns),
+        fields=PANEL_FIELDS,
+        values=np.concatenate([b[0] for b in blocks], axis=0),
+        start_dates=_to_dates(index, np.concatenate([b[1] for b in blocks], axis=0)),
+        end_dates=_to_dates(index, np.concatenate([b[2] for b in blocks], axis=0)),
+        window_counts=np.concatenate([b[3] for b in blocks]),
+    )
@@ -0,0 +1,167 @@
+from collections import deque
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import SeriesIndicators
+from core.trend_engine import (
+    WEEKS_PER_MONTH,
+    _check_ma_mode,
+    _score_windows,
+    TrendWindows,
+    _window_results,
+)
+
+
+class IncrementalTrendEngine:
+    """
+    Stateful trend engine that updates on new weekly bars.
+
+    Seed it once from history, then feed new bars with append(). Only
+    the last few windows' worth of bars is kept, so an update costs the
+    same whether the ticker has 5 or 50 years of history. Emitted
+    windows are identical to compute_trend_windows over the full series.
+
+    State is plain JSON-serializable data (see to_state / from_state) so
+    it can be checkpointed between nightly runs.
+    """
+
+    def __init__(
+        self,
+        window_months: int = 12,
+        step_months: int = 3,
+        ma_mode: str = "window",
+    ):
+        _check_ma_mode(ma_mode)
+
+        self.window_months = window_months
+        self.step_months = step_months
+        self.ma_mode = ma_mode
+
+        self.window_size = window_months * WEEKS_PER_MONTH
+        self.step_size = step_months * WEEKS_PER_MONTH
+
+        # The newest completed window starts one bar before the trailing
+        # window; full-history MAs also need the 199 bars before it
+        buffer_size = self.window_size + 1
+        if ma_mode == "full_history":
+            buffer_size += 199
+
+        self.dates: deque = deque(maxlen=buffer_size)
+        self.values: deque = deque(maxlen=buffer_size)
+
+        # Bars seen so far and the next window start (both global)
+        self.n_bars = 0
+        self.next_start = 0
+
+    # -----------------------------
+    # Scoring
+    # -----------------------------
+    def _score(self, starts: List[int]) -> TrendWindows:
+        if not starts:
+            return TrendWindows.empty()
+
+        offset = self.n_bars - len(self.values)
+        local_starts = np.asarray(starts) - offset
+
+        ind = SeriesIndicators(np.fromiter(self.values, dtype=float))
+        scores = _score_windows(ind, local_starts, self.window_size, self.ma_mode)
+
+        return _window_results(
+            pd.DatetimeIndex(list(self.dates)),
+            local_starts,
+            self.window_size,
+            scores,
+        )
+
+    def _completed_starts(self) -> List[int]:
+        # Same rule as compute_trend_windows: start < n_bars - window_size
+        starts = []
+        while self.next_start < self.n_bars - self.window_size:
+            starts.append(self.next_start)
+            self.next_start += self.step_size
+        return starts
+
+    def trailing_window(self) -> Optional[Dict]:
+        """
+        Window ending on the latest bar (None until enough bars exist).
+        """
+        if self.n_bars < self.window_size:
+            return None
+        return self._score([self.n_bars - self.window_size])[0]
+
+    # -----------------------------
+    # Updates
+    # -----------------------------
+    def seed(self, weekly_df: pd.DataFrame, price_col: str = "close") -> TrendWindows:
+        """
+        Load history and return every window it completes.
+        """
+        if self.n_bars:
+            raise ValueError("Engine is already seeded; use append() for new bars")
+
+        prices = weekly_df[price_col].dropna()
+        values = prices.to_numpy(dtype=float)
+
+        self.dates.extend(prices.index)
+        self.values.extend(values)
+        self.n_bars = len(values)
+
+        # Score the backlog in one vectorized pass over the full history
+        starts = self._completed_starts()
+        if not starts:
+            return TrendWindows.empty()
+
+        starts = np.asarray(starts)
+        scores = _score_windows(SeriesIndicators(values), starts, self.window_size, self.ma_mode)
+
+        return _window_results(prices.index, starts, self.window_size, scores)
+
+    def append(self, date, close: float) -> Dict:
+        """
+        Add one weekly bar.
+
+        Returns:
+            completed: windows completed by this bar (usually none; one
+                every step_months)
+            trailing: the window ending on this bar
+        """
+        if pd.isna(close):
+            return {"completed": TrendWindows.empty(), "trailing": self.trailing_window()}
+
+        self.dates.append(pd.Timestamp(date))
+        self.values.append(float(close))
+        self.n_bars += 1
+
+        return {
+            "completed": self._score(self._completed_starts()),
+            "trailing": self.trailing_window(),
+        }
+
+    # -----------------------------
+    # Checkpointing
+    # -----------------------------
+    def to_state(self) -> Dict:
+        return {
+            "window_months": self.window_months,
+            "step_months": self.step_months,
+            "ma_mode": self.ma_mode,
+            "n_bars": self.n_bars,
+            "next_start": self.next_start,
+            "dates": [d.isoformat() for d in self.dates],
+            "values": list(self.values),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> "IncrementalTrendEngine":
+        engine = cls(
+            window_months=state["window_months"],
+            step_months=state["step_months"],
+            ma_mode=state["ma_mode"],
+        )
+        engine.n_bars = state["n_bars"]
+        engine.next_start = state["next_start"]
+        engine.dates.extend(pd.Timestamp(d) for d in state["dates"])
+        engine.values.extend(float(v) for v in state["values"])
+        return engine
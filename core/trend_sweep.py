@@ -0,0 +1,85 @@
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+import pandas as pd
+
+from core.indicators import SeriesIndicators
+from core.trend_engine import (
+    WEEKS_PER_MONTH,
+    TrendWindows,
+    _check_ma_mode,
+    _score_windows,
+    _window_results,
+)
+
+
+def sweep_trend_windows(
+    weekly_df: pd.DataFrame,
+    window_months: Iterable[int] = (6, 9, 12, 18, 24),
+    step_months: Iterable[int] = (1, 2, 3, 6),
+    price_col: str = "close",
+    ma_mode: str = "window",
+) -> Dict[Tuple[int, int], TrendWindows]:
+    """
+    Evaluate compute_trend_windows over a grid of window / step sizes.
+
+    The indicator layer is built once for the series. For each window
+    length, every start needed by any step size is scored in one
+    vectorized call and each step size then takes its slice, so adding
+    step sizes is nearly free and adding window lengths costs one
+    scoring pass each.
+
+    Returns {(window_months, step_months): TrendWindows}, each identical
+    to the corresponding compute_trend_windows call.
+    """
+
+    _check_ma_mode(ma_mode)
+
+    prices = weekly_df[price_col].dropna()
+    n = len(prices)
+
+    ind = SeriesIndicators(prices.to_numpy(dtype=float))
+    step_months = sorted(set(step_months))
+
+    results = {}
+    for months in sorted(set(window_months)):
+        window_size = months * WEEKS_PER_MONTH
+
+        grids = {
+            step: np.arange(0, n - window_size, step * WEEKS_PER_MONTH)
+            for step in step_months
+        }
+        starts = np.unique(np.concatenate([np.zeros(0, dtype=int), *grids.values()]))
+
+        if len(starts) == 0:
+            for step in step_months:
+                results[(months, step)] = TrendWindows.empty()
+            continue
+
+        scores = _score_windows(ind, starts, window_size, ma_mode)
+
+        for step, grid in grids.items():
+            pick = np.searchsorted(starts, grid)
+            results[(months, step)] = _window_results(
+                prices.index,
+                grid,
+                window_size,
+                {name: values[pick] for name, values in scores.items()},
+            )
+
+    return results
+
+
+def sweep_frame(sweep: Dict[Tuple[int, int], TrendWindows]) -> pd.DataFrame:
+    """
+    Tidy long frame of a sweep: one row per (configuration, window).
+    """
+
+    frames = []
+    for (months, step), windows in sweep.items():
+        frame = windows.to_pandas()
+        frame.insert(0, "step_months", step)
+        frame.insert(0, "window_months", months)
+        frames.append(frame)
+
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
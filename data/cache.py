@@ -0,0 +1,74 @@
+import json
+import os
+import re
+from pathlib import Path
+
+import pandas as pd
+
+from config.settings import OHLCV_CACHE_DIR
+
+
+class OHLCVCache:
+    """
+    On-disk daily bar cache, one Parquet file per ticker.
+
+    Each ticker also gets a small JSON sidecar recording the earliest
+    date already requested from the provider and when the ticker was
+    last topped up, so history that does not exist (e.g. before an IPO)
+    is only asked for once.
+    """
+
+    def __init__(self, root: Path | str | None = None):
+        self.root = Path(root) if root is not None else OHLCV_CACHE_DIR
+
+    # -----------------------------
+    # Paths
+    # -----------------------------
+    def _key(self, ticker: str) -> str:
+        return re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+
+    def _data_path(self, ticker: str) -> Path:
+        return self.root / f"{self._key(ticker)}.parquet"
+
+    def _meta_path(self, ticker: str) -> Path:
+        return self.root / f"{self._key(ticker)}.json"
+
+    # -----------------------------
+    # Read / write
+    # -----------------------------
+    def read(self, ticker: str) -> tuple[pd.DataFrame | None, dict]:
+        data_path = self._data_path(ticker)
+        meta_path = self._meta_path(ticker)
+
+        if not data_path.exists() or not meta_path.exists():
+            return None, {}
+
+        try:
+            df = pd.read_parquet(data_path)
+            meta = json.loads(meta_path.read_text())
+        except (OSError, ValueError):
+            # Corrupt or half-written entry: treat as a miss
+            return None, {}
+
+        return df, meta
+
+    def write(self, ticker: str, df: pd.DataFrame, meta: dict) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        data_path = self._data_path(ticker)
+        meta_path = self._meta_path(ticker)
+
+        # Write to per-process temp files first so readers (and other
+        # screening workers) never see partial files
+        tmp_data = data_path.with_suffix(f".parquet.{os.getpid()}.tmp")
+        tmp_meta = meta_path.with_suffix(f".json.{os.getpid()}.tmp")
+
+        df.to_parquet(tmp_data)
+        tmp_meta.write_text(json.dumps(meta))
+
+        os.replace(tmp_data, data_path)
+        os.replace(tmp_meta, meta_path)
+
+    def clear(self, ticker: str) -> None:
+        for path in (self._data_path(ticker), self._meta_path(ticker)):
+            path.unlink(missing_ok=True)
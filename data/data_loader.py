@@ -1,32 +1,32 @@
+import logging
+import time
+from typing import Dict, Iterable, List
+
+import numpy as np
 import yfinance as yf
 import pandas as pd
 
+from config.settings import OHLCV_REFRESH_SECONDS
+from data.cache import OHLCVCache
 
-def load_daily_data(ticker: str, years: int) -> pd.DataFrame:
-    """
-    Load daily price data using yfinance.
 
-    - Uses auto_adjust=True to ensure prices are split-adjusted
-    - Returns Open, High, Low, Close (all adjusted)
-    """
+logger = logging.getLogger(__name__)
 
-    period = f"{years}y"
+_cache = OHLCVCache()
 
-    df = yf.download(
-        ticker,
-        period=period,
-        auto_adjust=True,
-        progress=False,
-    )
 
-    if df.empty:
-        raise ValueError(f"No data returned for ticker {ticker}")
+# -------------------------------------------------
+# Helpers
+# -------------------------------------------------
+def _period_start(years: int) -> pd.Timestamp:
+    return pd.Timestamp.today().normalize() - pd.DateOffset(years=years)
+
 
-    # Flatten MultiIndex if present
-    if isinstance(df.columns, pd.MultiIndex):
-        df.columns = df.columns.get_level_values(0)
+def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+    # Grouped downloads pad every ticker onto the union calendar
+    df = df.dropna(how="all")
 
-    df = df.rename(columns={
+    return df.rename(columns={
         "Open": "open",
         "High": "high",
         "Low": "low",
@@ -34,4 +34,264 @@ def load_daily_data(ticker: str, years: int) -> pd.DataFrame:
         "Volume": "volume",
     })
 
-    return df
+
+def _download(tickers: List[str], **kwargs) -> Dict[str, pd.DataFrame]:
+    """
+    One grouped yfinance call for several tickers.
+
+    Returns a normalized frame per ticker; tickers the provider has no
+    bars for in the requested range get an empty frame.
+    """
+
+    df = yf.download(
+        tickers,
+        group_by="ticker",
+        auto_adjust=True,
+        progress=False,
+        **kwargs,
+    )
+
+    frames = {}
+    for ticker in tickers:
+        if df is None or df.empty:
+            sub = pd.DataFrame()
+        elif not isinstance(df.columns, pd.MultiIndex):
+            sub = df if len(tickers) == 1 else pd.DataFrame()
+        elif ticker in df.columns.get_level_values(0):
+            sub = df[ticker]
+        elif ticker in df.columns.get_level_values(1):
+            sub = df.xs(ticker, axis=1, level=1)
+        else:
+            sub = pd.DataFrame()
+
+        frames[ticker] = _normalize(sub) if not sub.empty else pd.DataFrame()
+
+    return frames
+
+
+def _download_grouped(requests: Dict[str, dict]) -> Dict[str, pd.DataFrame]:
+    """
+    Issue one download per distinct set of range arguments.
+
+    requests maps ticker -> yfinance range kwargs (start/end/period).
+    Warm tickers usually share the same range, so a universe top-up
+    collapses into a handful of calls.
+    """
+
+    groups: Dict[tuple, List[str]] = {}
+    for ticker, kwargs in requests.items():
+        groups.setdefault(tuple(sorted(kwargs.items())), []).append(ticker)
+
+    frames = {}
+    for key, tickers in groups.items():
+        frames.update(_download(tickers, **dict(key)))
+
+    return frames
+
+
+def _merge_bars(cached: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    # Newer download wins on overlapping dates (e.g. a partial last bar)
+    df = pd.concat([cached, new])
+    df = df[~df.index.duplicated(keep="last")]
+    return df.sort_index()
+
+
+def _adjustment_changed(cached: pd.DataFrame, new: pd.DataFrame) -> bool:
+    """
+    Prices are auto-adjusted, so a split or dividend after the last
+    cached bar rescales the whole history. Detect it on the overlap.
+
+    The last cached bar is left out: fetched during market hours it was
+    partial, and its close is expected to move. Only completed bars
+    are compared (the top-up starts one bar earlier to keep one).
+    """
+
+    overlap = cached.index[:-1].intersection(new.index)
+    if overlap.empty:
+        return False
+
+    return not np.allclose(
+        cached.loc[overlap, "close"].to_numpy(dtype=float),
+        new.loc[overlap, "close"].to_numpy(dtype=float),
+        rtol=1e-6,
+    )
+
+
+def _align(frames: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    if not frames:
+        return frames
+
+    calendar = frames[next(iter(frames))].index
+    for df in frames.values():
+        calendar = calendar.union(df.index)
+
+    return {ticker: df.reindex(calendar) for ticker, df in frames.items()}
+
+
+def _load_cached(tickers: List[str], years: int) -> Dict[str, pd.DataFrame]:
+    start = _period_start(years)
+    now = time.time()
+
+    frames: Dict[str, pd.DataFrame] = {}
+    metas: Dict[str, dict] = {}
+    dirty = set()
+
+    for ticker in tickers:
+        frames[ticker], metas[ticker] = _cache.read(ticker)
+
+    # -----------------------------
+    # Cold tickers: full history
+    # -----------------------------
+    cold = [t for t in tickers if frames[t] is None or frames[t].empty]
+    fetched = _download_grouped({t: {"period": f"{years}y"} for t in cold})
+
+    missing = []
+    for ticker in cold:
+        if fetched[ticker].empty:
+            # Reported (by omission) once the rest of the batch is cached
+            missing.append(ticker)
+            continue
+
+        frames[ticker] = fetched[ticker]
+        metas[ticker] = {
+            "covered_from": start.strftime("%Y-%m-%d"),
+            "checked_at": now,
+        }
+        dirty.add(ticker)
+
+    warm = [t for t in tickers if t not in cold]
+    cold = [t for t in cold if t not in missing]
+
+    # -----------------------------
+    # Backfill years before the cached range (once)
+    # -----------------------------
+    backfill = {
+        t: {"start": start, "end": pd.Timestamp(metas[t]["covered_from"])}
+        for t in warm
+        if start < pd.Timestamp(metas[t]["covered_from"])
+    }
+    fetched = _download_grouped(backfill)
+
+    for ticker in backfill:
+        if not fetched[ticker].empty:
+            frames[ticker] = _merge_bars(fetched[ticker], frames[ticker])
+        metas[ticker]["covered_from"] = start.strftime("%Y-%m-%d")
+        dirty.add(ticker)
+
+    # -----------------------------
+    # Top up bars after the last completed cached bar
+    # -----------------------------
+    topup = {
+        t: {"start": frames[t].index[max(len(frames[t]) - 2, 0)]}
+        for t in warm
+        if now - metas[t].get("checked_at", 0) >= OHLCV_REFRESH_SECONDS
+    }
+    fetched = _download_grouped(topup)
+
+    adjusted = {}
+    for ticker in topup:
+        newer = fetched[ticker]
+        if newer.empty:
+            pass
+        elif _adjustment_changed(frames[ticker], newer):
+            adjusted[ticker] = {"start": pd.Timestamp(metas[ticker]["covered_from"])}
+        else:
+            frames[ticker] = _merge_bars(frames[ticker], newer)
+
+        metas[ticker]["checked_at"] = now
+        dirty.add(ticker)
+
+    fetched = _download_grouped(adjusted)
+    for ticker in adjusted:
+        if not fetched[ticker].empty:
+            frames[ticker] = fetched[ticker]
+
+    for ticker in dirty:
+        _cache.write(ticker, frames[ticker], metas[ticker])
+
+    if missing:
+        logger.warning(f"[DATA] No data returned for {missing}")
+
+    return {t: frames[t][frames[t].index >= start] for t in tickers if t not in missing}
+
+
+# -------------------------------------------------
+# Public API
+# -------------------------------------------------
+def benchmark_for(ticker: str) -> str:
+    """
+    Market index used as the benchmark for a ticker.
+    """
+    if ticker.endswith(".NS"):
+        return "^NSEI"
+    return "^GSPC"
+
+
+def require_loaded(frames: Dict[str, pd.DataFrame], tickers: Iterable[str]) -> None:
+    """
+    Raise for the first of tickers a batch load returned no data for.
+    """
+    for ticker in tickers:
+        if ticker not in frames:
+            raise ValueError(f"No data returned for ticker {ticker}")
+
+
+def load_daily_data_batch(
+    tickers: List[str],
+    years: int,
+    include_benchmarks: bool = False,
+    use_cache: bool = True,
+    align: bool = True,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Load daily price data for several tickers at once.
+
+    - Each distinct symbol is downloaded once, so a benchmark shared by
+      the whole batch is fetched a single time
+    - include_benchmarks adds every ticker's benchmark to the batch
+    - Cold tickers share one grouped download; warm tickers are topped
+      up from the on-disk cache (see load_daily_data)
+    - With align=True all frames are reindexed to the union calendar;
+      days a ticker did not trade are NaN rows
+    - Symbols the provider returns no data for (e.g. delisted) are left
+      out of the result rather than failing the batch; everything else
+      is still cached and returned (see require_loaded)
+    """
+
+    symbols = list(tickers)
+    if include_benchmarks:
+        symbols += [benchmark_for(t) for t in tickers]
+    symbols = list(dict.fromkeys(symbols))
+
+    if not symbols:
+        return {}
+
+    if use_cache:
+        frames = _load_cached(symbols, years)
+    else:
+        frames = _download(symbols, period=f"{years}y")
+        missing = [ticker for ticker, df in frames.items() if df.empty]
+        if missing:
+            logger.warning(f"[DATA] No data returned for {missing}")
+        frames = {ticker: df for ticker, df in frames.items() if not df.empty}
+
+    if align:
+        frames = _align(frames)
+
+    return frames
+
+
+def load_daily_data(ticker: str, years: int, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Load daily price data using yfinance.
+
+    - Uses auto_adjust=True to ensure prices are split-adjusted
+    - Returns Open, High, Low, Close (all adjusted)
+    - Bars are cached on disk per ticker; warm tickers only fetch bars
+      after the last stored date, and missing early years are
+      backfilled once
+    """
+
+    frames = load_daily_data_batch([ticker], years, use_cache=use_cache)
+    require_loaded(frames, [ticker])
+    return frames[ticker]
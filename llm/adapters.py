@@ -1,31 +1,62 @@
 from llm.state import AnalysisState
 
 
+NOT_EVALUATED = "Not evaluated"
+
+
+def _benchmark_comparison(snapshot: dict) -> dict:
+    benchmark = snapshot["meta"]["benchmark"]
+    outperformed = snapshot["summary_flags"]["outperformed_benchmark"]
+
+    vs_index = (
+        f"{'Outperformed' if outperformed else 'Underperformed'} {benchmark}: "
+        f"CAGR {snapshot['growth']['cagr']}% vs {snapshot['benchmark']['cagr']}%"
+    )
+
+    return {
+        "vs_index": vs_index,
+        "vs_sector": NOT_EVALUATED,
+        **snapshot["relative"],
+    }
+
+
 def build_llm_state(
-    analytics_result: dict,
-    benchmark_result: dict | None = None
+    snapshot: dict,
+    benchmark_result: dict | None = None,
+    trend: dict | None = None,
 ) -> AnalysisState:
+    """
+    LangGraph input state from an analytics snapshot (build_snapshot /
+    cached_trend_analysis).
+
+    The snapshot carries no trend classification; pass trend (keys
+    dominant_trend, trend_confidence, trend_distribution, recent_trend,
+    best_year, worst_year) to fill those fields, otherwise they read
+    "Not evaluated". benchmark_result replaces the comparison derived
+    from the snapshot's benchmark and relative sections.
+    """
+    meta = snapshot["meta"]
+    growth = snapshot["growth"]
+    trend = trend or {}
+
     return {
-        "ticker": analytics_result["ticker"],
-        "analysis_period": analytics_result["period"],
-
-        "dominant_trend": analytics_result["dominant_trend"],
-        "trend_confidence": analytics_result["confidence"],
-        "trend_distribution": analytics_result["trend_distribution"],
-        "recent_trend": analytics_result["recent_trend"],
-
-        "cagr": analytics_result["cagr"],
-        "price_multiple": analytics_result["price_multiple"],
-
-        "best_year": analytics_result.get("best_year"),
-        "worst_year": analytics_result.get("worst_year"),
-        "volatility_summary": analytics_result["volatility_summary"],
-        "red_flags": analytics_result["red_flags"],
-
-        "benchmark_comparison": benchmark_result or {
-            "vs_index": "Not evaluated",
-            "vs_sector": "Not evaluated",
-        },
+        "ticker": meta["ticker"],
+        "analysis_period": meta["analysis_period"],
+
+        "dominant_trend": trend.get("dominant_trend", NOT_EVALUATED),
+        "trend_confidence": trend.get("trend_confidence"),
+        "trend_distribution": trend.get("trend_distribution", {}),
+        "recent_trend": trend.get("recent_trend", NOT_EVALUATED),
+
+        "cagr": growth["cagr"],
+        "price_multiple": growth["price_multiple"],
+
+        "best_year": trend.get("best_year"),
+        "worst_year": trend.get("worst_year"),
+        "volatility_summary": snapshot["volatility_summary"],
+        "red_flags": snapshot["red_flags"],
+
+        "benchmark_comparison": benchmark_result or _benchmark_comparison(snapshot),
 
         "exec_summary": None,
         "trend_explanation": None,
@@ -1,30 +1,40 @@
+from typing import Tuple
+
 from llm.client import LLMClient
+from llm.prompting import AGENT_FIELDS, project_state
 from llm.state import AnalysisState
 
 
-def benchmark_agent(state: AnalysisState) -> dict:
-    #llm = LLMClient(model="openai/gpt-4o-mini")
-    llm = LLMClient(
-    models=[
-        "meta-llama/llama-3.3-70b-instruct:free",
-        "deepseek/deepseek-r1-0528:free",
-        "gpt-4o-mini",
-    ]
-    )
+# State keys this agent reads / writes (the graph derives its edges from them)
+READS = AGENT_FIELDS["benchmark"]
+WRITES = ("benchmark_analysis",)
+
 
+MODELS = [
+    "meta-llama/llama-3.3-70b-instruct:free",
+    "deepseek/deepseek-r1-0528:free",
+    "gpt-4o-mini",
+]
 
+
+def _prompts(state: AnalysisState) -> Tuple[str, str]:
     user_prompt = f"""
 Explain how the stock performed relative to its benchmark and sector.
 Focus strictly on historical comparison.
 Avoid judgement or advice.
 
 DATA:
-{state}
+{project_state(state, "benchmark")}
 """
 
-    output = llm.generate(
-        system_prompt="You compare historical performance neutrally.",
-        user_prompt=user_prompt
-    )
+    return "You compare historical performance neutrally.", user_prompt
+
+
+def benchmark_agent(state: AnalysisState) -> dict:
+    output = LLMClient(models=MODELS).generate(*_prompts(state))
+    return {"benchmark_analysis": output}
+
 
+async def abenchmark_agent(state: AnalysisState) -> dict:
+    output = await LLMClient(models=MODELS).agenerate(*_prompts(state))
     return {"benchmark_analysis": output}
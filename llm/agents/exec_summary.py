@@ -1,18 +1,24 @@
+from typing import Tuple
+
 from llm.client import LLMClient
+from llm.prompting import AGENT_FIELDS, project_state
 from llm.state import AnalysisState
+from llm.streaming import astream_generate, stream_generate
 
 
-def exec_summary_agent(state: AnalysisState) -> dict:
-    #llm = LLMClient(model="openai/gpt-4o-mini")
-    llm = LLMClient(
-    models=[
-        "meta-llama/llama-3.3-70b-instruct:free",
-        "deepseek/deepseek-r1-0528:free",
-        "gpt-4o-mini",
-    ]
-    )
+# State keys this agent reads / writes (the graph derives its edges from them)
+READS = AGENT_FIELDS["exec_summary"]
+WRITES = ("exec_summary",)
+
+
+MODELS = [
+    "meta-llama/llama-3.3-70b-instruct:free",
+    "deepseek/deepseek-r1-0528:free",
+    "gpt-4o-mini",
+]
 
 
+def _prompts(state: AnalysisState) -> Tuple[str, str]:
     system_prompt = (
         "You are a financial analytics assistant. "
         "Explain historical stock performance only. "
@@ -25,9 +31,18 @@ State the dominant trend and confidence level.
 Mention recent trend if different from long-term trend.
 
 DATA:
-{state}
+{project_state(state, "exec_summary")}
 """
 
-    output = llm.generate(system_prompt, user_prompt)
+    return system_prompt, user_prompt
+
+
+# Streamed: the UI renders this section token by token
+def exec_summary_agent(state: AnalysisState) -> dict:
+    output = stream_generate(LLMClient(models=MODELS), "exec_summary", *_prompts(state))
+    return {"exec_summary": output}
+
 
+async def aexec_summary_agent(state: AnalysisState) -> dict:
+    output = await astream_generate(LLMClient(models=MODELS), "exec_summary", *_prompts(state))
     return {"exec_summary": output}
@@ -1,18 +1,23 @@
+from typing import Tuple
+
 from llm.client import LLMClient
 from llm.state import AnalysisState
+from llm.streaming import astream_generate, stream_generate
 
 
-def final_narrative_agent(state: AnalysisState) -> dict:
-    #llm = LLMClient(model="openai/gpt-4o-mini")
-    llm = LLMClient(
-    models=[
-        "meta-llama/llama-3.3-70b-instruct:free",
-        "deepseek/deepseek-r1-0528:free",
-        "gpt-4o-mini",
-    ]
-    )
+# State keys this agent reads / writes (the graph derives its edges from them)
+READS = ("exec_summary", "trend_explanation", "risk_analysis", "benchmark_analysis")
+WRITES = ("final_narrative",)
+
 
+MODELS = [
+    "meta-llama/llama-3.3-70b-instruct:free",
+    "deepseek/deepseek-r1-0528:free",
+    "gpt-4o-mini",
+]
 
+
+def _prompts(state: AnalysisState) -> Tuple[str, str]:
     user_prompt = f"""
 Combine the following sections into a single investor-friendly narrative.
 Ensure consistency in tone and confidence.
@@ -31,9 +36,15 @@ BENCHMARK COMPARISON:
 {state['benchmark_analysis']}
 """
 
-    output = llm.generate(
-        system_prompt="You generate neutral, investor-facing summaries.",
-        user_prompt=user_prompt
-    )
+    return "You generate neutral, investor-facing summaries.", user_prompt
+
+
+# Streamed: the UI renders this section token by token
+def final_narrative_agent(state: AnalysisState) -> dict:
+    output = stream_generate(LLMClient(models=MODELS), "final_narrative", *_prompts(state))
+    return {"final_narrative": output}
+
 
+async def afinal_narrative_agent(state: AnalysisState) -> dict:
+    output = await astream_generate(LLMClient(models=MODELS), "final_narrative", *_prompts(state))
     return {"final_narrative": output}
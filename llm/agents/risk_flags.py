@@ -1,29 +1,39 @@
+from typing import Tuple
+
 from llm.client import LLMClient
+from llm.prompting import AGENT_FIELDS, project_state
 from llm.state import AnalysisState
 
 
-def risk_flags_agent(state: AnalysisState) -> dict:
-    #llm = LLMClient(model="meta-llama/llama-3-8b-instruct")
-    llm = LLMClient(
-    models=[
-        "meta-llama/llama-3.3-70b-instruct:free",
-        "deepseek/deepseek-r1-0528:free",
-    ]
-    )
+# State keys this agent reads / writes (the graph derives its edges from them)
+READS = AGENT_FIELDS["risk_flags"]
+WRITES = ("risk_analysis",)
+
 
+MODELS = [
+    "meta-llama/llama-3.3-70b-instruct:free",
+    "deepseek/deepseek-r1-0528:free",
+]
 
+
+def _prompts(state: AnalysisState) -> Tuple[str, str]:
     user_prompt = f"""
 Summarize the key historical risks and red flags.
 Explain why they matter historically.
 Do not exaggerate risk or predict losses.
 
 DATA:
-{state}
+{project_state(state, "risk_flags")}
 """
 
-    output = llm.generate(
-        system_prompt="You explain historical risks conservatively.",
-        user_prompt=user_prompt
-    )
+    return "You explain historical risks conservatively.", user_prompt
+
+
+def risk_flags_agent(state: AnalysisState) -> dict:
+    output = LLMClient(models=MODELS).generate(*_prompts(state))
+    return {"risk_analysis": output}
+
 
+async def arisk_flags_agent(state: AnalysisState) -> dict:
+    output = await LLMClient(models=MODELS).agenerate(*_prompts(state))
     return {"risk_analysis": output}
@@ -1,24 +1,28 @@
+from typing import Tuple
+
 from llm.client import LLMClient
+from llm.prompting import AGENT_FIELDS, project_state
 from llm.state import AnalysisState
 
 
-def trend_explanation_agent(state: AnalysisState) -> dict:
-    llm = LLMClient(
-        models=[
-            "meta-llama/llama-3.3-70b-instruct:free",
-            "deepseek/deepseek-r1-0528:free",
-            "gpt-4o-mini",
-        ]
-    )
+# State keys this agent reads / writes (the graph derives its edges from them)
+READS = AGENT_FIELDS["trend_explanation"]
+WRITES = ("trend_explanation",)
+
+
+MODELS = [
+    "meta-llama/llama-3.3-70b-instruct:free",
+    "deepseek/deepseek-r1-0528:free",
+    "gpt-4o-mini",
+]
+
 
+def _prompts(state: AnalysisState) -> Tuple[str, str]:
     user_prompt = f"""
-Explain why the stock is classified as {state['dominant_trend']}.
+Explain why the stock is classified with its dominant_trend.
 
-Use the following evidence:
-- CAGR over the analysis period: {state['cagr']}%
-- Price multiple over the period: {state['price_multiple']}x
-- Trend distribution: {state['trend_distribution']}
-- Recent trend behavior: {state['recent_trend']}
+Use the evidence in DATA: the CAGR (%) and price multiple over the
+analysis period, the trend distribution and the recent trend behavior.
 
 If the stock shows strong long-term returns despite consolidation phases,
 explicitly explain this nuance.
@@ -26,12 +30,17 @@ explicitly explain this nuance.
 Avoid speculation or future-oriented language.
 
 DATA:
-{state}
+{project_state(state, "trend_explanation")}
 """
 
-    output = llm.generate(
-        system_prompt="You explain historical trend behavior using evidence only.",
-        user_prompt=user_prompt,
-    )
+    return "You explain historical trend behavior using evidence only.", user_prompt
+
+
+def trend_explanation_agent(state: AnalysisState) -> dict:
+    output = LLMClient(models=MODELS).generate(*_prompts(state))
+    return {"trend_explanation": output}
+
 
+async def atrend_explanation_agent(state: AnalysisState) -> dict:
+    output = await LLMClient(models=MODELS).agenerate(*_prompts(state))
     return {"trend_explanation": output}
@@ -1,50 +1,206 @@
+import asyncio
 import os
 import logging
-from typing import List
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import AsyncIterator, Dict, Iterator, List, Tuple
 
-from openai import OpenAI
+import httpx
+from openai import AsyncOpenAI, OpenAI, RateLimitError
+
+from config.settings import (
+    LLM_HEDGE_AFTER_SECONDS,
+    LLM_KEEPALIVE_EXPIRY_SECONDS,
+    LLM_MAX_CONCURRENT_REQUESTS,
+    LLM_POOL_MAX_CONNECTIONS,
+    LLM_POOL_MAX_KEEPALIVE,
+    LLM_SDK_MAX_RETRIES,
+    LLM_TIMEOUT_SECONDS,
+)
+from llm.response_cache import ResponseCache, bypassed, default_cache, response_key
+from llm.routing import ModelRouter, default_router
 
 logger = logging.getLogger(__name__)
 
 
+# -----------------------------
+# Provider client registry
+# -----------------------------
+# Provider -> (API key env var, base URL), in fallback order
+PROVIDERS: Dict[str, Tuple[str, str | None]] = {
+    "openai": ("OPENAI_API_KEY", None),
+    "openrouter": ("OPENROUTER_API_KEY", "https://openrouter.ai/api/v1"),
+}
+
+# (provider, api key) -> shared client
+_clients: Dict[Tuple[str, str], OpenAI] = {}
+_clients_lock = threading.Lock()
+
+# Async pools and semaphores are bound to the event loop that uses them:
+# event loop -> {(provider, api key) -> shared async client}
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = (
+    weakref.WeakKeyDictionary()
+)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=LLM_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=LLM_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+def _build_client(provider: str, api_key: str) -> OpenAI:
+    http_client = httpx.Client(limits=_limits(), timeout=LLM_TIMEOUT_SECONDS)
+    logger.info(f"[LLM] Creating pooled {provider} client")
+    return OpenAI(
+        api_key=api_key,
+        base_url=PROVIDERS[provider][1],
+        http_client=http_client,
+        max_retries=LLM_SDK_MAX_RETRIES,
+    )
+
+
+def _build_async_client(provider: str, api_key: str) -> AsyncOpenAI:
+    http_client = httpx.AsyncClient(limits=_limits(), timeout=LLM_TIMEOUT_SECONDS)
+    logger.info(f"[LLM] Creating pooled async {provider} client")
+    return AsyncOpenAI(
+        api_key=api_key,
+        base_url=PROVIDERS[provider][1],
+        http_client=http_client,
+        max_retries=LLM_SDK_MAX_RETRIES,
+    )
+
+
+def _configured_providers() -> List[Tuple[str, str]]:
+    # (provider, api key) for every provider with a key set, in fallback order
+    out = []
+    for provider, (env_var, _) in PROVIDERS.items():
+        api_key = os.getenv(env_var)
+        if api_key:
+            out.append((provider, api_key))
+    return out
+
+
+def get_provider_clients() -> List[Tuple[str, OpenAI]]:
+    """
+    Process-wide OpenAI clients for every provider with an API key set,
+    in fallback order.
+
+    Each provider's client (and its keep-alive connection pool) is built
+    once and shared by every LLMClient, agent and request; a changed API
+    key gets a fresh client.
+    """
+    out = []
+    with _clients_lock:
+        for key in _configured_providers():
+            if key not in _clients:
+                _clients[key] = _build_client(*key)
+            out.append((key[0], _clients[key]))
+    return out
+
+
+def get_async_provider_clients() -> List[Tuple[str, AsyncOpenAI]]:
+    """
+    get_provider_clients for async code: AsyncOpenAI clients shared by
+    every coroutine on the running event loop.
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    out = []
+    for key in _configured_providers():
+        if key not in clients:
+            clients[key] = _build_async_client(*key)
+        out.append((key[0], clients[key]))
+    return out
+
+
+def request_slots() -> asyncio.Semaphore:
+    """
+    The running loop's limit on in-flight LLM requests
+    (LLM_MAX_CONCURRENT_REQUESTS), shared by every narrative on it.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _semaphores:
+        _semaphores[loop] = asyncio.Semaphore(LLM_MAX_CONCURRENT_REQUESTS)
+    return _semaphores[loop]
+
+
+def close_clients() -> None:
+    """
+    Close every pooled client (e.g. at shutdown or between tests).
+    """
+    with _clients_lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
+
+
+async def aclose_clients() -> None:
+    """
+    Close the running loop's async clients.
+    """
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
+
+
+# Threads for sync hedged calls (a losing call runs to completion)
+_hedge_executor: ThreadPoolExecutor | None = None
+
+
+def _hedge_pool() -> ThreadPoolExecutor:
+    global _hedge_executor
+    with _clients_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(
+                max_workers=LLM_POOL_MAX_CONNECTIONS, thread_name_prefix="llm-hedge"
+            )
+        return _hedge_executor
+
+
 class LLMClient:
     """
     Lightweight LLM client with provider fallback.
 
+    Holds no connections of its own: provider clients come from the
+    process-wide registry, so agents can create one per call.
+
     Priority:
     1. OpenAI (if OPENAI_API_KEY is set)
     2. OpenRouter free models (if OPENROUTER_API_KEY is set)
+
+    Within that list the shared ModelRouter skips models whose circuit
+    breaker is open and tries the fastest healthy model first. With
+    hedge_after set, a call still unanswered after that many seconds
+    is raced against the next candidate and the first answer wins.
     """
 
-    def __init__(self, models: List[str] | None = None):
+    def __init__(
+        self,
+        models: List[str] | None = None,
+        temperature: float = 0.4,
+        cache: ResponseCache | None = None,
+        router: ModelRouter | None = None,
+        hedge_after: float | None = LLM_HEDGE_AFTER_SECONDS,
+    ):
         # Default model priority list
         self.models = models or [
             "gpt-4o-mini",
             "meta-llama/llama-3.3-70b-instruct:free",
         ]
+        self.temperature = temperature
+        self.cache = default_cache if cache is None else cache
+        self.router = default_router if router is None else router
+        self.hedge_after = hedge_after
 
-        self.clients = []
-
-        # OpenAI client
-        if os.getenv("OPENAI_API_KEY"):
-            self.clients.append(
-                (
-                    "openai",
-                    OpenAI(api_key=os.getenv("OPENAI_API_KEY")),
-                )
-            )
-
-        # OpenRouter client
-        if os.getenv("OPENROUTER_API_KEY"):
-            self.clients.append(
-                (
-                    "openrouter",
-                    OpenAI(
-                        api_key=os.getenv("OPENROUTER_API_KEY"),
-                        base_url="https://openrouter.ai/api/v1",
-                    ),
-                )
-            )
+        # Shared, pooled provider clients (cheap to construct per call)
+        self.clients = get_provider_clients()
 
         if not self.clients:
             raise RuntimeError(
@@ -52,30 +208,323 @@ class LLMClient:
                 "Set OPENAI_API_KEY or OPENROUTER_API_KEY."
             )
 
-    def generate(self, system_prompt: str, user_prompt: str) -> str:
+    def _candidates(self, clients, system_prompt: str, user_prompt: str):
+        for provider, client in clients:
+            for model in self.models:
+                key = response_key(provider, model, system_prompt, user_prompt, self.temperature)
+                yield provider, client, model, key
+
+    def _cached(self, candidates, force_refresh: bool) -> str | None:
+        # Any candidate's cached answer, in priority order
+        if force_refresh or bypassed():
+            return None
+        found = self.cache.get_first([c[3] for c in candidates])
+        if found is None:
+            return None
+        key, cached = found
+        provider, _, model, _ = next(c for c in candidates if c[3] == key)
+        logger.info(f"[LLM] Cache hit for {provider} model: {model}")
+        return cached
+
+    def _routed(self, candidates) -> List[tuple]:
+        # candidates are (provider, client, model, key)
+        by_route = {(c[0], c[2]): c for c in candidates}
+        return [by_route[route] for route in self.router.order(list(by_route))]
+
+    def _groups(self, candidates):
+        # One candidate per attempt, or a (primary, backup) pair when hedging
+        step = 2 if self.hedge_after is not None else 1
+        for i in range(0, len(candidates), step):
+            yield candidates[i:i + step]
+
+    @staticmethod
+    def _messages(system_prompt: str, user_prompt: str) -> List[dict]:
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+    def _record(self, candidate, text: str, started: float) -> str:
+        provider, _, model, key = candidate
+        self.router.record_success((provider, model), time.perf_counter() - started)
+        self.cache.put(key, text, provider=provider, model=model)
+        return text
+
+    def _failed(self, candidate, error: Exception) -> None:
+        provider, _, model, _ = candidate
+        logger.warning(f"[LLM] {provider} model {model} failed: {error}")
+        self.router.record_failure((provider, model), trip=isinstance(error, RateLimitError))
+
+    # -----------------------------
+    # Sync
+    # -----------------------------
+    def _complete(self, candidate, messages: List[dict]) -> str:
+        provider, client, model, _ = candidate
+        logger.info(f"[LLM] Trying {provider} model: {model}")
+
+        started = time.perf_counter()
+        try:
+            response = client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=self.temperature,
+            )
+            text = response.choices[0].message.content.strip()
+        except Exception as e:
+            self._failed(candidate, e)
+            raise
+
+        return self._record(candidate, text, started)
+
+    def _hedged(self, group, messages: List[dict]) -> str:
+        pool = _hedge_pool()
+        pending = {pool.submit(self._complete, group[0], messages)}
+        done, pending = wait(pending, timeout=self.hedge_after)
+
+        if not done or next(iter(done)).exception() is not None:
+            if not done:
+                logger.info(f"[LLM] Hedging {group[0][2]} with {group[1][2]}")
+            pending.add(pool.submit(self._complete, group[1], messages))
+
         last_error = None
+        for future in as_completed(done | pending):
+            if future.exception() is None:
+                return future.result()
+            last_error = future.exception()
+        raise last_error
 
-        for provider, client in self.clients:
-            for model in self.models:
-                try:
-                    logger.info(f"[LLM] Trying {provider} model: {model}")
+    def generate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        force_refresh: bool = False,
+    ) -> str:
+        """
+        Completion from the first provider / model that answers.
 
-                    response = client.chat.completions.create(
-                        model=model,
-                        messages=[
-                            {"role": "system", "content": system_prompt},
-                            {"role": "user", "content": user_prompt},
-                        ],
-                        temperature=0.4,
-                    )
+        Identical requests are served from the response cache; any
+        candidate's cached answer is used before a provider is called.
+        force_refresh (or an active llm.response_cache.bypass_cache
+        block) skips the lookup, and the fresh answer replaces the
+        cached one.
+        """
+        candidates = list(self._candidates(self.clients, system_prompt, user_prompt))
 
-                    return response.choices[0].message.content.strip()
+        cached = self._cached(candidates, force_refresh)
+        if cached is not None:
+            return cached
 
-                except Exception as e:
-                    logger.warning(
-                        f"[LLM] {provider} model {model} failed: {e}"
+        messages = self._messages(system_prompt, user_prompt)
+        last_error = None
+
+        for group in self._groups(self._routed(candidates)):
+            try:
+                if len(group) == 1:
+                    return self._complete(group[0], messages)
+                return self._hedged(group, messages)
+            except Exception as e:
+                last_error = e
+
+        raise RuntimeError(
+            f"All LLM models failed. Last error: {last_error}"
+        )
+
+    # -----------------------------
+    # Async
+    # -----------------------------
+    async def _acomplete(self, candidate, messages: List[dict]) -> str:
+        provider, client, model, _ = candidate
+        logger.info(f"[LLM] Trying {provider} model: {model}")
+
+        async with request_slots():
+            started = time.perf_counter()
+            try:
+                response = await client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=self.temperature,
+                )
+                text = response.choices[0].message.content.strip()
+            except Exception as e:
+                self._failed(candidate, e)
+                raise
+
+        return self._record(candidate, text, started)
+
+    async def _ahedged(self, group, messages: List[dict]) -> str:
+        tasks = {asyncio.ensure_future(self._acomplete(group[0], messages))}
+        done, _ = await asyncio.wait(tasks, timeout=self.hedge_after)
+
+        if not done or next(iter(done)).exception() is not None:
+            if not done:
+                logger.info(f"[LLM] Hedging {group[0][2]} with {group[1][2]}")
+            tasks.add(asyncio.ensure_future(self._acomplete(group[1], messages)))
+
+        last_error = None
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+            raise last_error
+        finally:
+            # The losing request is no longer needed
+            for task in tasks:
+                task.cancel()
+
+    async def agenerate(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        force_refresh: bool = False,
+    ) -> str:
+        """
+        Async generate: same routing, hedging and cache, over the loop's
+        shared async clients. Each provider call holds one of the loop's
+        request_slots(), so any number of concurrent narratives keep at
+        most LLM_MAX_CONCURRENT_REQUESTS requests in flight.
+        """
+        candidates = list(
+            self._candidates(get_async_provider_clients(), system_prompt, user_prompt)
+        )
+
+        cached = self._cached(candidates, force_refresh)
+        if cached is not None:
+            return cached
+
+        messages = self._messages(system_prompt, user_prompt)
+        last_error = None
+
+        for group in self._groups(self._routed(candidates)):
+            try:
+                if len(group) == 1:
+                    return await self._acomplete(group[0], messages)
+                return await self._ahedged(group, messages)
+            except Exception as e:
+                last_error = e
+
+        raise RuntimeError(
+            f"All LLM models failed. Last error: {last_error}"
+        )
+
+    # -----------------------------
+    # Streaming
+    # -----------------------------
+    @staticmethod
+    def _delta(chunk, started: bool) -> str:
+        # Text of one stream chunk; leading whitespace of the answer dropped
+        if not chunk.choices:
+            return ""
+        text = chunk.choices[0].delta.content or ""
+        return text if started else text.lstrip()
+
+    def stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        force_refresh: bool = False,
+    ) -> Iterator[str]:
+        """
+        generate as a stream of text deltas.
+
+        Same cache and routing (a cached answer arrives as one delta);
+        no hedging. A model that fails before its first delta falls back
+        to the next candidate; once text has been yielded, an error is
+        raised instead. The complete answer is cached.
+        """
+        candidates = list(self._candidates(self.clients, system_prompt, user_prompt))
+
+        cached = self._cached(candidates, force_refresh)
+        if cached is not None:
+            yield cached
+            return
+
+        messages = self._messages(system_prompt, user_prompt)
+        last_error = None
+
+        for candidate in self._routed(candidates):
+            provider, client, model, _ = candidate
+            logger.info(f"[LLM] Streaming {provider} model: {model}")
+
+            started = time.perf_counter()
+            parts = []
+            try:
+                chunks = client.chat.completions.create(
+                    model=model,
+                    messages=messages,
+                    temperature=self.temperature,
+                    stream=True,
+                )
+                for chunk in chunks:
+                    delta = self._delta(chunk, bool(parts))
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+            except Exception as e:
+                self._failed(candidate, e)
+                if parts:
+                    raise
+                last_error = e
+                continue
+
+            self._record(candidate, "".join(parts).strip(), started)
+            return
+
+        raise RuntimeError(
+            f"All LLM models failed. Last error: {last_error}"
+        )
+
+    async def astream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        force_refresh: bool = False,
+    ) -> AsyncIterator[str]:
+        """
+        Async stream; holds one request slot while the answer streams.
+        """
+        candidates = list(
+            self._candidates(get_async_provider_clients(), system_prompt, user_prompt)
+        )
+
+        cached = self._cached(candidates, force_refresh)
+        if cached is not None:
+            yield cached
+            return
+
+        messages = self._messages(system_prompt, user_prompt)
+        last_error = None
+
+        for candidate in self._routed(candidates):
+            provider, client, model, _ = candidate
+            logger.info(f"[LLM] Streaming {provider} model: {model}")
+
+            parts = []
+            async with request_slots():
+                started = time.perf_counter()
+                try:
+                    chunks = await client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        temperature=self.temperature,
+                        stream=True,
                     )
+                    async for chunk in chunks:
+                        delta = self._delta(chunk, bool(parts))
+                        if delta:
+                            parts.append(delta)
+                            yield delta
+                except Exception as e:
+                    self._failed(candidate, e)
+                    if parts:
+                        raise
                     last_error = e
+                    continue
+
+            self._record(candidate, "".join(parts).strip(), started)
+            return
 
         raise RuntimeError(
             f"All LLM models failed. Last error: {last_error}"
@@ -1,77 +1,161 @@
-from langgraph.graph import StateGraph, END
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Mapping, Set, Tuple
+
+from langgraph.graph import StateGraph, START, END
 
 from llm.state import AnalysisState
 
 # Agent implementations
-from llm.agents.exec_summary import exec_summary_agent
-from llm.agents.trend_explanation import trend_explanation_agent
-from llm.agents.risk_flags import risk_flags_agent
-from llm.agents.benchmark import benchmark_agent
-from llm.agents.final_narrative import final_narrative_agent
+from llm.agents import benchmark, exec_summary, final_narrative, risk_flags, trend_explanation
 
 # Optional lightweight observability wrapper
 from llm.observability import log_node_execution
 
 
-def build_llm_graph():
+# -----------------------------
+# Agent declarations
+# -----------------------------
+
+@dataclass(frozen=True)
+class AgentNode:
+    """
+    One graph node: its sync and async agent and the state keys it
+    reads and writes.
+    """
+
+    run: Callable
+    arun: Callable
+    reads: Tuple[str, ...]
+    writes: Tuple[str, ...]
+
+
+AGENTS: Dict[str, AgentNode] = {
+    "exec_summary": AgentNode(
+        exec_summary.exec_summary_agent,
+        exec_summary.aexec_summary_agent,
+        exec_summary.READS,
+        exec_summary.WRITES,
+    ),
+    "trend_explanation": AgentNode(
+        trend_explanation.trend_explanation_agent,
+        trend_explanation.atrend_explanation_agent,
+        trend_explanation.READS,
+        trend_explanation.WRITES,
+    ),
+    "risk_flags": AgentNode(
+        risk_flags.risk_flags_agent,
+        risk_flags.arisk_flags_agent,
+        risk_flags.READS,
+        risk_flags.WRITES,
+    ),
+    "benchmark": AgentNode(
+        benchmark.benchmark_agent,
+        benchmark.abenchmark_agent,
+        benchmark.READS,
+        benchmark.WRITES,
+    ),
+    "final_narrative": AgentNode(
+        final_narrative.final_narrative_agent,
+        final_narrative.afinal_narrative_agent,
+        final_narrative.READS,
+        final_narrative.WRITES,
+    ),
+}
+
+
+# -----------------------------
+# Topology
+# -----------------------------
+
+def agent_dependencies(agents: Mapping[str, AgentNode]) -> Dict[str, Set[str]]:
+    """
+    node -> nodes whose outputs it reads.
+
+    Keys no agent writes (the deterministic analytics) are inputs and
+    add no dependency. Raises ValueError if two agents write the same
+    key or the dependencies form a cycle.
+    """
+    writer: Dict[str, str] = {}
+    for name, agent in agents.items():
+        for key in agent.writes:
+            if key in writer:
+                raise ValueError(f"State key {key!r} written by both {writer[key]} and {name}")
+            writer[key] = name
+
+    deps = {
+        name: {writer[key] for key in agent.reads if key in writer and writer[key] != name}
+        for name, agent in agents.items()
+    }
+
+    _topological_order(deps)
+    return deps
+
+
+def _topological_order(deps: Mapping[str, Set[str]]) -> List[str]:
+    remaining = {name: set(d) for name, d in deps.items()}
+    order = []
+    while remaining:
+        ready = sorted(name for name, d in remaining.items() if not d)
+        if not ready:
+            raise ValueError(f"Agent dependencies form a cycle among {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            del remaining[name]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return order
+
+
+def build_llm_graph(use_async: bool = False, agents: Mapping[str, AgentNode] | None = None):
     """
     Builds and compiles the LangGraph DAG for narrative generation.
 
-    Topology:
-    - Exec Summary runs first (acts as gate)
-    - Trend / Risk / Benchmark agents run in parallel
+    Topology is derived, not wired by hand: every agent declares the
+    state keys it reads and writes (see agent_dependencies), agents with
+    no dependencies start together and each other agent starts once all
+    the agents it reads from have finished. With the default agents:
+    - Exec Summary / Trend / Risk / Benchmark agents run in parallel
     - Final Narrative agent consolidates outputs
+
+    Pass agents to run a different set of nodes.
+
+    use_async=True wires in the async agents; run the graph with
+    ainvoke so the parallel agents await their LLM calls concurrently
+    on the event loop instead of blocking worker threads.
     """
 
+    agents = AGENTS if agents is None else agents
+    deps = agent_dependencies(agents)
+
     graph = StateGraph(AnalysisState)
 
     # -----------------------------
     # Agent nodes (wrapped for logging)
     # -----------------------------
-    graph.add_node(
-        "exec_summary",
-        log_node_execution("exec_summary", exec_summary_agent)
-    )
-
-    graph.add_node(
-        "trend_explanation",
-        log_node_execution("trend_explanation", trend_explanation_agent)
-    )
-
-    graph.add_node(
-        "risk_flags",
-        log_node_execution("risk_flags", risk_flags_agent)
-    )
-
-    graph.add_node(
-        "benchmark",
-        log_node_execution("benchmark", benchmark_agent)
-    )
-
-    graph.add_node(
-        "final_narrative",
-        log_node_execution("final_narrative", final_narrative_agent)
-    )
+    for name, agent in agents.items():
+        graph.add_node(
+            name,
+            log_node_execution(name, agent.arun if use_async else agent.run)
+        )
 
     # -----------------------------
     # Graph structure
     # -----------------------------
-
-    # Entry point
-    graph.set_entry_point("exec_summary")
-
-    # Parallel fan-out
-    graph.add_edge("exec_summary", "trend_explanation")
-    graph.add_edge("exec_summary", "risk_flags")
-    graph.add_edge("exec_summary", "benchmark")
-
-    # Fan-in to consolidator
-    graph.add_edge("trend_explanation", "final_narrative")
-    graph.add_edge("risk_flags", "final_narrative")
-    graph.add_edge("benchmark", "final_narrative")
-
-    # Exit
-    graph.add_edge("final_narrative", END)
+    dependents = {d for node_deps in deps.values() for d in node_deps}
+
+    for name in _topological_order(deps):
+        if not deps[name]:
+            # Entry: starts with the run
+            graph.add_edge(START, name)
+        elif len(deps[name]) == 1:
+            graph.add_edge(next(iter(deps[name])), name)
+        else:
+            # Fan-in: waits for every upstream agent
+            graph.add_edge(sorted(deps[name]), name)
+
+        # Exit
+        if name not in dependents:
+            graph.add_edge(name, END)
 
     # -----------------------------
     # Compile graph
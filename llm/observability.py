@@ -1,4 +1,5 @@
 import time
+import inspect
 import logging
 from typing import Callable
 
@@ -16,12 +17,12 @@ def log_node_execution(node_name: str, fn: Callable):
     - Execution duration
     - Keys written to state
 
+    Coroutine functions get an async wrapper, so async nodes stay async.
+
     This is intentionally minimal for MVP.
     """
 
-    def wrapper(state: dict) -> dict:
-        start_time = time.time()
-        output = fn(state)
+    def log(start_time: float, output: dict) -> None:
         duration = round(time.time() - start_time, 3)
 
         logging.info(
@@ -30,6 +31,19 @@ def log_node_execution(node_name: str, fn: Callable):
             f"outputs={list(output.keys())}"
         )
 
+    if inspect.iscoroutinefunction(fn):
+        async def async_wrapper(state: dict) -> dict:
+            start_time = time.time()
+            output = await fn(state)
+            log(start_time, output)
+            return output
+
+        return async_wrapper
+
+    def wrapper(state: dict) -> dict:
+        start_time = time.time()
+        output = fn(state)
+        log(start_time, output)
         return output
 
     return wrapper
@@ -0,0 +1,175 @@
+import contextlib
+import contextvars
+import logging
+import math
+import threading
+from typing import Dict, Tuple
+
+from config.settings import LLM_PROMPT_TOKEN_BUDGET
+
+logger = logging.getLogger(__name__)
+
+
+# -----------------------------
+# Per-agent projections
+# -----------------------------
+# Agent -> state fields its prompt needs, most important first (fields
+# are dropped from the end when over budget)
+AGENT_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "exec_summary": (
+        "ticker",
+        "analysis_period",
+        "dominant_trend",
+        "trend_confidence",
+        "recent_trend",
+        "cagr",
+        "price_multiple",
+        "trend_distribution",
+    ),
+    "trend_explanation": (
+        "ticker",
+        "analysis_period",
+        "dominant_trend",
+        "trend_confidence",
+        "recent_trend",
+        "trend_distribution",
+        "cagr",
+        "price_multiple",
+        "best_year",
+        "worst_year",
+    ),
+    "risk_flags": (
+        "ticker",
+        "analysis_period",
+        "red_flags",
+        "volatility_summary",
+        "worst_year",
+        "dominant_trend",
+    ),
+    "benchmark": (
+        "ticker",
+        "analysis_period",
+        "benchmark_comparison",
+        "cagr",
+        "price_multiple",
+    ),
+}
+
+# Agent -> max estimated tokens for its DATA block
+AGENT_TOKEN_BUDGETS: Dict[str, int] = {agent: LLM_PROMPT_TOKEN_BUDGET for agent in AGENT_FIELDS}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count (~4 characters per token for English / numbers).
+    """
+    return math.ceil(len(text) / 4)
+
+
+def _format_value(value) -> str:
+    if isinstance(value, float):
+        return f"{value:.2f}".rstrip("0").rstrip(".")
+    if isinstance(value, dict):
+        return ", ".join(f"{k}={_format_value(v)}" for k, v in sorted(value.items()))
+    if isinstance(value, (list, tuple)):
+        return "; ".join(_format_value(v) for v in value) if value else "none"
+    return str(value)
+
+
+def serialize_fields(state: dict, fields: Tuple[str, ...]) -> str:
+    """
+    One "field: value" line per present, non-empty field, in the given
+    order (dict items sorted), so equal inputs give identical text.
+    """
+    lines = []
+    for name in fields:
+        value = state.get(name)
+        if value is None or value == {}:
+            continue
+        lines.append(f"{name}: {_format_value(value)}")
+    return "\n".join(lines)
+
+
+# -----------------------------
+# Per-run token report
+# -----------------------------
+
+class PromptStats:
+    """
+    Estimated prompt-data tokens per agent for one run: the compact
+    projection against the full state repr it replaces.
+    """
+
+    def __init__(self):
+        self.agents: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def record(self, agent: str, full_tokens: int, compact_tokens: int, dropped: Tuple[str, ...]):
+        with self._lock:
+            self.agents[agent] = {
+                "full_tokens": full_tokens,
+                "compact_tokens": compact_tokens,
+                "saved_tokens": full_tokens - compact_tokens,
+                "dropped_fields": list(dropped),
+            }
+
+    def report(self) -> dict:
+        with self._lock:
+            agents = {name: dict(row) for name, row in self.agents.items()}
+        full = sum(row["full_tokens"] for row in agents.values())
+        saved = sum(row["saved_tokens"] for row in agents.values())
+        return {
+            "agents": agents,
+            "full_tokens": full,
+            "saved_tokens": saved,
+            "saved_pct": round(saved / full * 100, 1) if full else 0.0,
+        }
+
+
+_stats: contextvars.ContextVar[PromptStats | None] = contextvars.ContextVar(
+    "prompt_stats", default=None
+)
+
+
+@contextlib.contextmanager
+def collect_prompt_stats():
+    """
+    Collect PromptStats for every agent prompt built within the block
+    (including graph worker threads and tasks).
+    """
+    stats = PromptStats()
+    token = _stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _stats.reset(token)
+
+
+# -----------------------------
+# Public API
+# -----------------------------
+
+def project_state(state: dict, agent: str) -> str:
+    """
+    Compact DATA block for one agent's prompt: only AGENT_FIELDS[agent],
+    trimmed from the least important field until it fits the agent's
+    token budget (the first field is always kept).
+    """
+    fields = AGENT_FIELDS[agent]
+    budget = AGENT_TOKEN_BUDGETS[agent]
+
+    kept = fields
+    text = serialize_fields(state, kept)
+    while estimate_tokens(text) > budget and len(kept) > 1:
+        kept = kept[:-1]
+        text = serialize_fields(state, kept)
+
+    dropped = fields[len(kept):]
+    if dropped:
+        logger.warning(f"[LLM] {agent} prompt over {budget} tokens; dropped {list(dropped)}")
+
+    stats = _stats.get()
+    if stats is not None:
+        stats.record(agent, estimate_tokens(str(state)), estimate_tokens(text), dropped)
+
+    return text
@@ -0,0 +1,204 @@
+import contextlib
+import contextvars
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Sequence
+
+from config.settings import LLM_CACHE_DIR, LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+def response_key(
+    provider: str,
+    model: str,
+    system_prompt: str,
+    user_prompt: str,
+    temperature: float,
+) -> str:
+    """
+    Content address of one completion request.
+    """
+    payload = json.dumps(
+        [provider, model, system_prompt, user_prompt, temperature],
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# Set by bypass_cache(): skip cache reads (fresh results are still stored)
+_bypass: contextvars.ContextVar[bool] = contextvars.ContextVar("llm_cache_bypass", default=False)
+
+
+@contextlib.contextmanager
+def bypass_cache(enabled: bool = True):
+    """
+    Within the block, every LLMClient call goes to the provider.
+
+    A context variable, so it reaches agents running in graph worker
+    threads without being threaded through the state (whose contents
+    are part of the prompts).
+    """
+    token = _bypass.set(enabled)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+
+def bypassed() -> bool:
+    return _bypass.get()
+
+
+class ResponseCache:
+    """
+    LRU + TTL cache of LLM completions, keyed by response_key.
+
+    The memory tier holds up to max_entries completions; the optional
+    disk tier (one JSON file per key) survives process restarts.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        disk_dir: Path | str | None = LLM_CACHE_DIR,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir is not None else None
+
+        # key -> (text, stored_at)
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    # -----------------------------
+    # Memory tier
+    # -----------------------------
+    def get(self, key: str) -> str | None:
+        found = self.get_first([key])
+        return found[1] if found is not None else None
+
+    def get_first(self, keys: Sequence[str]) -> tuple | None:
+        """
+        (key, text) of the first of keys that is cached, or None.
+
+        Counted as one lookup however many keys are probed, so a request
+        tried against several candidate models is one hit or one miss.
+        """
+        for key in keys:
+            text = self._memory_get(key)
+            if text is not None:
+                with self._lock:
+                    self.memory_hits += 1
+                return key, text
+
+            entry = self._disk_get(key)
+            if entry is not None:
+                text, stored_at = entry
+                self._remember(key, text, stored_at)
+                with self._lock:
+                    self.disk_hits += 1
+                return key, text
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _memory_get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            text, stored_at = entry
+            if time.time() - stored_at < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                return text
+            del self._entries[key]
+            return None
+
+    def put(self, key: str, text: str, **meta) -> None:
+        """
+        Store a completion; meta (provider, model, ...) is only written
+        to the disk record for inspection.
+        """
+        stored_at = time.time()
+        self._remember(key, text, stored_at)
+        self._disk_put(key, {"text": text, "stored_at": stored_at, **meta})
+
+    def _remember(self, key: str, text: str, stored_at: float) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (text, stored_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "entries": len(self),
+        }
+
+    # -----------------------------
+    # Disk tier
+    # -----------------------------
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _disk_get(self, key: str) -> tuple | None:
+        if self.disk_dir is None:
+            return None
+
+        path = self._disk_path(key)
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+            if time.time() - record["stored_at"] >= self.ttl_seconds:
+                path.unlink(missing_ok=True)
+                return None
+            return record["text"], record["stored_at"]
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _disk_put(self, key: str, record: dict) -> None:
+        if self.disk_dir is None:
+            return
+
+        path = self._disk_path(key)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError as e:
+            # A read-only or full cache dir must not fail the completion
+            logger.warning(f"[LLM] Could not write response cache entry: {e}")
+
+
+# Shared by every LLMClient unless one is passed in
+default_cache = ResponseCache()
@@ -0,0 +1,156 @@
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+from config.settings import (
+    LLM_BREAKER_BASE_COOLDOWN_SECONDS,
+    LLM_BREAKER_FAILURES,
+    LLM_BREAKER_MAX_COOLDOWN_SECONDS,
+    LLM_LATENCY_WINDOW,
+)
+
+# (provider, model)
+Route = Tuple[str, str]
+
+
+# -----------------------------
+# Per-model health
+# -----------------------------
+
+@dataclass
+class ModelHealth:
+    """
+    Circuit breaker and recent latencies of one (provider, model).
+
+    The breaker opens after `failures` consecutive errors (or at once on
+    a rate limit) for a cool-down that doubles every time it re-opens.
+    Once the cool-down passes the model is half-open: the next call is
+    a trial, and a success closes the breaker again.
+    """
+
+    latencies: deque = field(default_factory=lambda: deque(maxlen=LLM_LATENCY_WINDOW))
+    consecutive_failures: int = 0
+    trips: int = 0
+    open_until: float = 0.0
+
+    def state(self, now: float) -> str:
+        if self.trips == 0:
+            return "closed"
+        return "open" if now < self.open_until else "half_open"
+
+    def percentile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        return float(np.percentile(np.fromiter(self.latencies, float), q))
+
+
+class ModelRouter:
+    """
+    Process-wide health tracking and candidate ordering for LLMClient.
+    """
+
+    def __init__(
+        self,
+        failures: int = LLM_BREAKER_FAILURES,
+        base_cooldown: float = LLM_BREAKER_BASE_COOLDOWN_SECONDS,
+        max_cooldown: float = LLM_BREAKER_MAX_COOLDOWN_SECONDS,
+        prefer_fastest: bool = True,
+    ):
+        self.failures = failures
+        self.base_cooldown = base_cooldown
+        self.max_cooldown = max_cooldown
+        self.prefer_fastest = prefer_fastest
+
+        self._health: Dict[Route, ModelHealth] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, route: Route) -> ModelHealth:
+        if route not in self._health:
+            self._health[route] = ModelHealth()
+        return self._health[route]
+
+    # -----------------------------
+    # Recording
+    # -----------------------------
+    def record_success(self, route: Route, latency: float) -> None:
+        with self._lock:
+            health = self._get(route)
+            health.latencies.append(latency)
+            health.consecutive_failures = 0
+            health.trips = 0
+            health.open_until = 0.0
+
+    def record_failure(self, route: Route, trip: bool = False) -> None:
+        """
+        Count an error; trip=True (e.g. rate limited) opens the breaker
+        straight away.
+        """
+        with self._lock:
+            health = self._get(route)
+            health.consecutive_failures += 1
+
+            # Half-open trial failed, threshold reached, or forced
+            if health.trips or trip or health.consecutive_failures >= self.failures:
+                cooldown = min(self.base_cooldown * 2 ** health.trips, self.max_cooldown)
+                health.trips += 1
+                health.open_until = time.time() + cooldown
+
+    # -----------------------------
+    # Routing
+    # -----------------------------
+    def order(self, routes: Sequence[Route]) -> List[Route]:
+        """
+        Candidates to try, best first.
+
+        Open breakers are skipped. Healthy models with latency history
+        go first, fastest p50 first (when prefer_fastest), then untried
+        ones in their configured order. If every breaker is open, all
+        are returned, soonest to re-open first, rather than failing
+        without a call.
+        """
+        now = time.time()
+        with self._lock:
+            health = {route: self._get(route) for route in routes}
+
+            available = [r for r in routes if health[r].state(now) != "open"]
+            if not available:
+                return sorted(routes, key=lambda r: health[r].open_until)
+
+            if not self.prefer_fastest:
+                return available
+
+            def rank(indexed):
+                i, route = indexed
+                p50 = health[route].percentile(50)
+                return (p50 is None, p50 if p50 is not None else 0.0, i)
+
+            return [route for _, route in sorted(enumerate(available), key=rank)]
+
+    def stats(self) -> Dict[str, dict]:
+        """
+        "provider/model" -> breaker state, failures and p50 / p95 latency.
+        """
+        now = time.time()
+        with self._lock:
+            return {
+                f"{provider}/{model}": {
+                    "state": health.state(now),
+                    "consecutive_failures": health.consecutive_failures,
+                    "p50_seconds": health.percentile(50),
+                    "p95_seconds": health.percentile(95),
+                    "samples": len(health.latencies),
+                }
+                for (provider, model), health in self._health.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._health.clear()
+
+
+# Shared by every LLMClient unless one is passed in
+default_router = ModelRouter()
@@ -1,4 +1,4 @@
-from typing import TypedDict, Dict, List, Optional
+from typing import Any, TypedDict, Dict, List, Optional
 
 
 class AnalysisState(TypedDict):
@@ -19,7 +19,7 @@ class AnalysisState(TypedDict):
     # Deterministic analytics
     # -----------------------------
     dominant_trend: str
-    trend_confidence: float
+    trend_confidence: Optional[float]
     trend_distribution: Dict[str, float]
     recent_trend: str
 
@@ -31,7 +31,8 @@ class AnalysisState(TypedDict):
     volatility_summary: str
     red_flags: List[str]
 
-    benchmark_comparison: Dict[str, str]
+    # vs_index / vs_sector text plus the relative performance fields
+    benchmark_comparison: Dict[str, Any]
 
     # -----------------------------
     # LLM agent outputs
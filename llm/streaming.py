@@ -0,0 +1,39 @@
+from typing import Callable
+
+from langgraph.config import get_stream_writer
+
+from llm.client import LLMClient
+
+
+def node_writer(node: str) -> Callable[[str], None]:
+    """
+    Emits {"node", "delta"} on the graph's "custom" stream; a no-op
+    outside a graph run or when custom streaming was not requested.
+    """
+    try:
+        writer = get_stream_writer()
+    except RuntimeError:
+        return lambda delta: None
+    return lambda delta: writer({"node": node, "delta": delta})
+
+
+def stream_generate(llm: LLMClient, node: str, system_prompt: str, user_prompt: str) -> str:
+    """
+    LLMClient.generate for a graph node, forwarding text deltas to the
+    stream as they arrive.
+    """
+    write = node_writer(node)
+    parts = []
+    for delta in llm.stream(system_prompt, user_prompt):
+        parts.append(delta)
+        write(delta)
+    return "".join(parts).strip()
+
+
+async def astream_generate(llm: LLMClient, node: str, system_prompt: str, user_prompt: str) -> str:
+    write = node_writer(node)
+    parts = []
+    async for delta in llm.astream(system_prompt, user_prompt):
+        parts.append(delta)
+        write(delta)
+    return "".join(parts).strip()
@@ -0,0 +1,54 @@
+import argparse
+import logging
+from pathlib import Path
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from core.screening import screen_universe
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Run the trend analytics pipeline over a list of tickers."
+    )
+    parser.add_argument("tickers", nargs="*", help="Tickers to screen")
+    parser.add_argument("--file", type=Path, help="Text file with one ticker per line")
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-pending", type=int, default=None)
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=Path("screen.jsonl"),
+        help="Result sink (.jsonl or .parquet)",
+    )
+    args = parser.parse_args()
+
+    tickers = list(args.tickers)
+    if args.file:
+        tickers += [
+            line.strip().upper()
+            for line in args.file.read_text().splitlines()
+            if line.strip() and not line.startswith("#")
+        ]
+
+    if not tickers:
+        parser.error("No tickers given")
+
+    logging.basicConfig(level=logging.INFO)
+
+    rows = screen_universe(
+        tickers,
+        years=args.years,
+        output=args.output,
+        max_workers=args.workers,
+        max_pending=args.max_pending,
+    )
+
+    failed = sum(row["status"] == "error" for row in rows)
+    print(f"Screened {len(rows)} tickers ({failed} failed) -> {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import streamlit as st
 
-from core.analytics_pipeline import run_trend_analysis
+from config.settings import CHART_MAX_POINTS
+from core.snapshot_cache import cached_trend_analysis
 from llm.narrative import generate_narrative
 
 
@@ -16,11 +17,16 @@ with st.sidebar:
     st.header("Analysis Settings")
     ticker = st.text_input("Stock Ticker", value="AAPL")
     years = st.slider("Lookback Period (Years)", 5, 15, 10)
+    full_resolution = st.checkbox("Full-resolution charts", value=False)
     run_button = st.button("Run Analysis")
 
 if run_button:
     try:
-        snapshot = run_trend_analysis(ticker.strip().upper(), years)
+        snapshot = cached_trend_analysis(
+            ticker.strip().upper(),
+            years,
+            chart_points=None if full_resolution else CHART_MAX_POINTS,
+        )
 
         # -------------------------------------------------
         # Executive Snapshot
@@ -45,6 +51,9 @@ if run_button:
         st.subheader("🔄 Rolling 12-Month Returns")
         st.line_chart(snapshot["charts"]["rolling_12m"].set_index("date"))
 
+        st.subheader("🌊 Rolling 1-Year Volatility")
+        st.line_chart(snapshot["charts"]["rolling_volatility"].set_index("date"))
+
         # -------------------------------------------------
         # Benchmark Comparison
         # -------------------------------------------------
@@ -66,6 +75,19 @@ if run_button:
             f"{snapshot['risk']['max_drawdown']}% vs {bench['max_drawdown']}%",
         )
 
+        relative = snapshot["relative"]
+
+        r1, r2, r3, r4 = st.columns(4)
+        r1.metric("Beta", relative["beta"])
+        r2.metric("Correlation", relative["correlation"])
+        r3.metric("Tracking Error", f"{relative['tracking_error']}%")
+        r4.metric(
+            "Up / Down Capture",
+            f"{relative['up_capture']}% / {relative['down_capture']}%",
+        )
+
+        st.line_chart(snapshot["charts"]["rolling_beta"].set_index("date"))
+
         if snapshot["summary_flags"]["outperformed_benchmark"]:
             st.success("The stock outperformed the benchmark on a CAGR basis.")
         else:
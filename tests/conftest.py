@@ -0,0 +1,153 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data.data_loader as loader
+import llm.client as llm_client
+from data.cache import OHLCVCache
+from llm.response_cache import ResponseCache
+from llm.routing import ModelRouter
+
+
+class FakeProvider:
+    """
+    Stands in for yf.download over fixed business-day histories.
+    """
+
+    def __init__(self, first="2010-01-01", last=None):
+        self.first = first
+        self.last = last or pd.Timestamp.today().normalize()
+        self.histories = {}
+        self.calls = []
+
+    def history(self, ticker):
+        if ticker not in self.histories:
+            dates = pd.bdate_range(self.first, self.last)
+            close = np.linspace(10, 100, len(dates))
+            self.histories[ticker] = pd.DataFrame(
+                {
+                    "Open": close,
+                    "High": close * 1.01,
+                    "Low": close * 0.99,
+                    "Close": close,
+                    "Volume": 1_000.0,
+                },
+                index=dates,
+            )
+        return self.histories[ticker]
+
+    def __call__(self, tickers, start=None, end=None, period=None, **kwargs):
+        self.calls.append(
+            {"tickers": list(tickers), "start": start, "end": end, "period": period}
+        )
+        if period is not None:
+            start = loader._period_start(int(period.rstrip("y")))
+
+        frames = {}
+        for ticker in tickers:
+            df = self.history(ticker)
+            if start is not None:
+                df = df[df.index >= pd.Timestamp(start)]
+            if end is not None:
+                df = df[df.index < pd.Timestamp(end)]
+            frames[ticker] = df
+
+        # Same layout as yf.download(..., group_by="ticker")
+        return pd.concat(frames, axis=1, sort=True)
+
+
+@pytest.fixture
+def provider(tmp_path, monkeypatch):
+    fake = FakeProvider()
+    monkeypatch.setattr(loader.yf, "download", fake)
+    monkeypatch.setattr(loader, "_cache", OHLCVCache(tmp_path))
+    return fake
+
+
+class FakeCompletions:
+    """
+    Stands in for client.chat.completions.
+
+    reply(model, messages, n) gives the text of the n-th call (streamed
+    word by word when stream=True); models in `failing` raise instead,
+    and delays holds per-model latency in seconds (`delay` for the
+    rest). Every call's model is recorded in calls.
+    """
+
+    def __init__(self, reply=None, failing=(), delays=None, delay=0.0):
+        self.reply = reply or (lambda model, messages, n: f"reply number {n}")
+        self.failing = set(failing)
+        self.delays = delays or {}
+        self.delay = delay
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def _text(self, model, messages):
+        self.calls.append(model)
+        if model in self.failing:
+            raise RuntimeError(f"{model} down")
+        return self.reply(model, messages, len(self.calls))
+
+    @staticmethod
+    def _chunks(text):
+        # As the OpenAI SDK yields them
+        return [
+            SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=word + " "))])
+            for word in text.split(" ")
+        ]
+
+    @staticmethod
+    def _completion(text):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+
+    def create(self, model, messages, temperature, stream=False):
+        time.sleep(self.delays.get(model, self.delay))
+        text = self._text(model, messages)
+        return iter(self._chunks(text)) if stream else self._completion(text)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    """
+    FakeCompletions for AsyncOpenAI; also tracks the most calls in
+    flight at once.
+    """
+
+    async def create(self, model, messages, temperature, stream=False):
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(model, self.delay))
+            text = self._text(model, messages)
+        finally:
+            self.in_flight -= 1
+
+        if not stream:
+            return self._completion(text)
+
+        async def chunks():
+            for chunk in self._chunks(text):
+                yield chunk
+        return chunks()
+
+
+@pytest.fixture
+def install_completions(monkeypatch):
+    """
+    install(fake) serves every LLMClient from fake, as the one "fake"
+    provider, with a fresh memory-only response cache and router.
+    """
+
+    def install(fake):
+        client = SimpleNamespace(chat=SimpleNamespace(completions=fake))
+        monkeypatch.setattr(llm_client, "get_provider_clients", lambda: [("fake", client)])
+        monkeypatch.setattr(llm_client, "get_async_provider_clients", lambda: [("fake", client)])
+        monkeypatch.setattr(llm_client, "default_cache", ResponseCache(disk_dir=None))
+        monkeypatch.setattr(llm_client, "default_router", ModelRouter())
+        return fake
+
+    return install
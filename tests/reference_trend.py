@@ -0,0 +1,139 @@
+"""
+Per-window reference implementation of compute_trend_windows.
+
+This is the original loop (one regression and one set of rolling
+indicators per window), kept so the vectorized engine can be checked
+against it. The slope uses np.polyfit instead of scikit-learn.
+"""
+
+import numpy as np
+
+
+def _direction_score(prices):
+    slope = np.polyfit(np.arange(len(prices)), prices.values, 1)[0]
+
+    price_range = prices.max() - prices.min()
+    if price_range == 0:
+        return 20.0
+
+    normalized_slope = slope / price_range
+
+    if normalized_slope > 0.15:
+        return 40.0
+    elif normalized_slope > 0.05:
+        return 30.0
+    elif normalized_slope > -0.05:
+        return 20.0
+    elif normalized_slope > -0.15:
+        return 10.0
+    else:
+        return 0.0
+
+
+def _structure_score(prices):
+    score = 0.0
+
+    highs = prices.rolling(3).max()
+    lows = prices.rolling(3).min()
+
+    hh = (highs.diff() > 0).mean()
+    hl = (lows.diff() > 0).mean()
+    structure_ratio = np.nanmean([hh, hl])
+
+    if structure_ratio > 0.7:
+        score += 13
+    elif structure_ratio > 0.5:
+        score += 8
+    else:
+        score += 3
+
+    ma_50 = prices.rolling(50).mean()
+    ma_200 = prices.rolling(200).mean()
+
+    above_50 = (prices > ma_50).mean()
+    above_200 = (prices > ma_200).mean()
+
+    if above_50 > 0.7 and above_200 > 0.7:
+        score += 13
+    elif above_50 > 0.7:
+        score += 8
+    else:
+        score += 3
+
+    crossovers = ((ma_50 > ma_200).astype(int).diff().abs() == 1).sum()
+
+    if crossovers <= 1:
+        score += 13
+    elif crossovers <= 3:
+        score += 8
+    else:
+        score += 3
+
+    return float(score)
+
+
+def _volatility_score(prices):
+    returns = prices.pct_change().dropna()
+    vol = returns.std()
+
+    price_change = prices.iloc[-1] - prices.iloc[0]
+
+    if price_change > 0 and vol < returns.mean() * 2:
+        return 20.0
+    elif price_change > 0:
+        return 15.0
+    elif abs(price_change) < prices.std():
+        return 8.0
+    else:
+        return 0.0
+
+
+def _trend_label(score):
+    if score >= 70:
+        return "UPTREND"
+    elif score >= 40:
+        return "SIDEWAYS"
+    else:
+        return "DOWNTREND"
+
+
+def _confidence(score):
+    if score >= 70:
+        return min(100.0, 60 + (score - 70))
+    elif score >= 40:
+        return 50.0
+    else:
+        return max(20.0, score)
+
+
+def reference_trend_windows(
+    weekly_df, price_col="close", window_months=12, step_months=3
+):
+    results = []
+
+    window_size = window_months * 4
+    step_size = step_months * 4
+
+    prices = weekly_df[price_col].dropna()
+
+    for start in range(0, len(prices) - window_size, step_size):
+        window_prices = prices.iloc[start:start + window_size]
+
+        d_score = _direction_score(window_prices)
+        s_score = _structure_score(window_prices)
+        v_score = _volatility_score(window_prices)
+
+        total_score = d_score + s_score + v_score
+
+        results.append({
+            "start_date": window_prices.index[0],
+            "end_date": window_prices.index[-1],
+            "trend_score": round(total_score, 2),
+            "trend_label": _trend_label(total_score),
+            "confidence": round(_confidence(total_score), 2),
+            "direction_score": round(d_score, 2),
+            "structure_score": round(s_score, 2),
+            "volatility_score": round(v_score, 2),
+        })
+
+    return results
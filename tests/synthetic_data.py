@@ -18,3 +18,28 @@ def synthetic_sideways(n_weeks=260):
     dates = pd.date_range("2015-01-01", periods=n_weeks, freq="W")
     prices = np.random.normal(100, 2, n_weeks)
     return pd.DataFrame({"close": prices}, index=dates)
+
+
+def synthetic_random_walk(n_weeks=780, seed=7):
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range("2005-01-01", periods=n_weeks, freq="W")
+    prices = 100 * np.exp(np.cumsum(rng.normal(0.002, 0.04, n_weeks)))
+    return pd.DataFrame({"close": prices}, index=dates)
+
+
+def synthetic_level_shifts(n_weeks=800):
+    dates = pd.date_range("2005-01-01", periods=n_weeks, freq="W")
+    third = n_weeks // 3
+    prices = np.r_[
+        np.full(third, 3.3),
+        np.full(third, 100.3),
+        np.linspace(1, 50, n_weeks - 2 * third),
+    ]
+    return pd.DataFrame({"close": prices}, index=dates)
+
+
+def synthetic_daily_prices(n_days=2520, seed=11, start="2014-01-02"):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range(start, periods=n_days)
+    prices = 50 * np.exp(np.cumsum(rng.normal(0.0004, 0.018, n_days)))
+    return pd.Series(prices, index=dates, name="close")
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+from core.analytics_pipeline import build_snapshot
+from core.charts import lttb_indices, minmax_indices, prepare_charts
+from tests.synthetic_data import synthetic_daily_prices
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    y = np.sin(np.linspace(0, 20, 5000))
+    y[1234] = 10.0
+    x = np.arange(len(y), dtype=float)
+
+    keep = lttb_indices(x, y, 300)
+
+    assert len(keep) == 300
+    assert keep[0] == 0 and keep[-1] == len(y) - 1
+    assert (np.diff(keep) > 0).all()
+    assert 1234 in keep
+
+
+def test_minmax_preserves_every_bucket_extreme():
+    close = synthetic_daily_prices(n_days=3800)
+    drawdowns = (close / close.cummax() - 1.0).to_numpy() * 100
+
+    keep = minmax_indices(drawdowns, 400)
+
+    assert len(keep) <= 400
+    assert drawdowns[keep].min() == drawdowns.min()
+    assert drawdowns[keep].max() == drawdowns.max()
+
+
+def test_short_and_full_resolution_charts_untouched():
+    df = pd.DataFrame({"date": pd.bdate_range("2024-01-01", periods=50), "price": 1.0})
+
+    assert prepare_charts({"price": df}, None)["price"] is df
+    pd.testing.assert_frame_equal(prepare_charts({"price": df}, 500)["price"], df)
+
+
+def test_snapshot_charts_downsampled_by_default():
+    stock = synthetic_daily_prices(n_days=3800).to_frame("close")
+    stock["open"] = stock["high"] = stock["low"] = stock["close"]
+
+    compact = build_snapshot("AAPL", stock, stock, years=15, chart_points=500)
+    full = build_snapshot("AAPL", stock, stock, years=15, chart_points=None)
+
+    for name, chart in compact["charts"].items():
+        assert len(chart) <= 500
+        assert len(full["charts"][name]) == len(stock)
+        assert chart["date"].is_monotonic_increasing
+
+    assert compact["charts"]["drawdown"]["drawdown"].min() == full["charts"]["drawdown"]["drawdown"].min()
+    assert compact["charts"]["rolling_12m"]["rolling_12m"].notna().all()
+
+
+def test_charts_built_on_first_access_only(monkeypatch):
+    import core.charts as charts
+
+    stock = synthetic_daily_prices(n_days=800).to_frame("close")
+    stock["open"] = stock["high"] = stock["low"] = stock["close"]
+
+    built = []
+    prepare = charts.prepare_charts
+    monkeypatch.setattr(charts, "prepare_charts", lambda c, n: built.extend(c) or prepare(c, n))
+
+    snapshot = build_snapshot("AAPL", stock, stock, years=3)
+    assert built == []
+
+    assert snapshot["charts"]["drawdown"] is snapshot["charts"]["drawdown"]
+    assert built == ["drawdown"]
+    assert set(snapshot["charts"]) == {"price", "drawdown", "rolling_12m", "rolling_volatility", "rolling_beta"}
+
+    headless = build_snapshot("AAPL", stock, stock, years=3, include_charts=False)
+    assert "charts" not in headless
@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import data.data_loader as loader
+from core.analytics_pipeline import IncrementalSnapshot, refresh_snapshots
+
+
+def test_warm_ticker_only_tops_up(provider, monkeypatch):
+    cold = loader.load_daily_data("AAPL", 5)
+    assert len(provider.calls) == 1
+
+    # Within the refresh interval no network call is made
+    warm = loader.load_daily_data("AAPL", 5)
+    assert len(provider.calls) == 1
+    pd.testing.assert_frame_equal(cold, warm, check_freq=False)
+
+    monkeypatch.setattr(loader, "OHLCV_REFRESH_SECONDS", 0)
+    loader.load_daily_data("AAPL", 5)
+    # One completed bar of overlap, to check for adjustments
+    assert provider.calls[-1]["start"] == cold.index[-2]
+    assert provider.calls[-1]["period"] is None
+
+
+def test_longer_horizon_backfills_once(provider, monkeypatch):
+    loader.load_daily_data("AAPL", 5)
+    longer = loader.load_daily_data("AAPL", 10)
+
+    assert longer.index[0] <= loader._period_start(10) + pd.Timedelta(days=4)
+    assert longer.index.is_monotonic_increasing
+    assert not longer.index.duplicated().any()
+
+    n_calls = len(provider.calls)
+    loader.load_daily_data("AAPL", 10)
+    assert len(provider.calls) == n_calls
+
+
+def test_adjustment_change_triggers_refresh(provider, monkeypatch):
+    loader.load_daily_data("AAPL", 5)
+
+    # A split halves every historical adjusted price
+    provider.history("AAPL")[["Open", "High", "Low", "Close"]] /= 2
+    monkeypatch.setattr(loader, "OHLCV_REFRESH_SECONDS", 0)
+
+    df = loader.load_daily_data("AAPL", 5)
+    expected = provider.history("AAPL")["Close"]
+    assert np.allclose(df["close"], expected.loc[df.index])
+
+
+def test_partial_last_bar_does_not_trigger_refresh(provider, monkeypatch):
+    cold = loader.load_daily_data("AAPL", 5)
+
+    # Intraday: the last bar's close keeps moving until the session ends
+    provider.history("AAPL").loc[cold.index[-1], "Close"] *= 1.005
+    monkeypatch.setattr(loader, "OHLCV_REFRESH_SECONDS", 0)
+
+    df = loader.load_daily_data("AAPL", 5)
+    assert provider.calls[-1]["start"] == cold.index[-2]
+    assert len(provider.calls) == 2
+    assert df["close"].iloc[-1] == provider.history("AAPL")["Close"].iloc[-1]
+
+
+def test_batch_shares_benchmark_download(provider):
+    frames = loader.load_daily_data_batch(
+        ["AAPL", "MSFT", "INFY.NS"], 5, include_benchmarks=True
+    )
+
+    assert set(frames) == {"AAPL", "MSFT", "INFY.NS", "^GSPC", "^NSEI"}
+    assert len(provider.calls) == 1
+    assert sorted(provider.calls[0]["tickers"]) == sorted(frames)
+
+    calendars = [df.index for df in frames.values()]
+    assert all(idx.equals(calendars[0]) for idx in calendars)
+
+
+def test_batch_aligns_uneven_histories(provider):
+    provider.first = "2023-01-01"
+    provider.history("NEWCO")
+    provider.first = "2010-01-01"
+
+    frames = loader.load_daily_data_batch(["NEWCO", "AAPL"], 5)
+
+    assert frames["NEWCO"].index.equals(frames["AAPL"].index)
+    assert frames["NEWCO"]["close"].isna().any()
+    assert frames["AAPL"]["close"].notna().all()
+
+
+def _delist(provider, ticker):
+    provider.histories[ticker] = provider.history("AAPL").iloc[:0]
+
+
+def test_batch_skips_symbols_without_data(provider, monkeypatch):
+    _delist(provider, "DELISTED")
+
+    frames = loader.load_daily_data_batch(["AAPL", "DELISTED"], 5, include_benchmarks=True)
+    assert set(frames) == {"AAPL", "^GSPC"}
+
+    # The successful symbols were cached despite the failure
+    n_calls = len(provider.calls)
+    loader.load_daily_data("AAPL", 5)
+    assert len(provider.calls) == n_calls
+
+    with pytest.raises(ValueError, match="DELISTED"):
+        loader.load_daily_data("DELISTED", 5)
+
+    states = {t: IncrementalSnapshot(t, years=5) for t in ("AAPL", "MSFT", "DELISTED")}
+    snapshots = refresh_snapshots(states)
+    assert set(snapshots) == {"AAPL", "MSFT"}
+
+
+def test_refresh_loads_each_states_own_benchmark(provider):
+    states = {
+        "AAPL": IncrementalSnapshot("AAPL", years=5),
+        "MSFT": IncrementalSnapshot("MSFT", years=5, benchmark_ticker="^NDX"),
+    }
+
+    snapshots = refresh_snapshots(states)
+
+    assert set(snapshots) == {"AAPL", "MSFT"}
+    assert snapshots["MSFT"]["meta"]["benchmark"] == "^NDX"
+    assert "^NDX" in provider.calls[0]["tickers"]
@@ -0,0 +1,32 @@
+import core.snapshot_cache as snapshot_cache
+from core.full_pipeline import stream_full_analysis
+from core.snapshot_cache import SnapshotCache
+from core.trend_engine import TREND_LABELS
+from llm.graph import AGENTS
+from tests.conftest import FakeCompletions
+
+
+def test_stream_full_analysis_end_to_end(provider, install_completions, monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "_default_cache", SnapshotCache(disk_dir=None))
+    monkeypatch.setattr(snapshot_cache, "_validated", {})
+    completions = install_completions(FakeCompletions())
+
+    events = list(stream_full_analysis("AAPL", years=5))
+
+    tokens = [e for e in events if e["type"] == "token"]
+    nodes = [e["node"] for e in events if e["type"] == "node"]
+    assert [e["type"] for e in events][-1] == "done"
+    assert {e["node"] for e in tokens} == {"exec_summary", "final_narrative"}
+    assert set(nodes) == set(AGENTS) and nodes[-1] == "final_narrative"
+    assert len(completions.calls) == len(AGENTS)
+
+    state = events[-1]["state"]
+    assert state["ticker"] == "AAPL"
+    assert state["analysis_period"] == "Last 5 years"
+    assert state["dominant_trend"] in TREND_LABELS
+    assert state["recent_trend"] in TREND_LABELS
+    assert set(state["trend_distribution"]) <= set(TREND_LABELS)
+    assert state["benchmark_comparison"]["vs_index"].startswith(("Outperformed", "Underperformed"))
+    assert "beta" in state["benchmark_comparison"]
+    assert state["exec_summary"] and state["final_narrative"]
+    assert state["prompt_stats"]["agents"]
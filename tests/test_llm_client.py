@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+import llm.client as llm_client
+from llm.client import LLMClient, close_clients, get_provider_clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_registry(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+    close_clients()
+    yield
+    close_clients()
+
+
+def test_clients_are_shared_across_instances(monkeypatch):
+    monkeypatch.setenv("OPENROUTER_API_KEY", "or-key")
+    monkeypatch.setenv("OPENAI_API_KEY", "oa-key")
+
+    first, second = LLMClient(), LLMClient(models=["gpt-4o-mini"])
+
+    assert [p for p, _ in first.clients] == ["openai", "openrouter"]
+    assert all(a is b for (_, a), (_, b) in zip(first.clients, second.clients))
+    assert len(llm_client._clients) == 2
+
+    # A rotated key gets its own client
+    monkeypatch.setenv("OPENAI_API_KEY", "oa-key-2")
+    assert get_provider_clients()[0][1] is not first.clients[0][1]
+
+
+def test_no_provider_configured():
+    with pytest.raises(RuntimeError):
+        LLMClient()
+
+
+def test_sdk_does_not_retry_behind_the_router(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "oa-key")
+
+    async def async_clients():
+        return llm_client.get_async_provider_clients()
+
+    (_, client), = get_provider_clients()
+    (_, async_client), = asyncio.run(async_clients())
+
+    assert client.max_retries == 0
+    assert async_client.max_retries == 0
@@ -0,0 +1,103 @@
+import asyncio
+from dataclasses import replace
+
+import pytest
+
+import llm.client as llm_client
+from llm.graph import AGENTS, agent_dependencies, build_llm_graph
+from tests.conftest import FakeAsyncCompletions, FakeCompletions
+
+
+def _state(ticker):
+    return {
+        "ticker": ticker,
+        "analysis_period": "10y",
+        "dominant_trend": "Uptrend",
+        "trend_confidence": 0.8,
+        "trend_distribution": {"Uptrend": 0.7, "Sideways": 0.3},
+        "recent_trend": "Uptrend",
+        "cagr": 12.0,
+        "price_multiple": 3.1,
+        "best_year": None,
+        "worst_year": None,
+        "volatility_summary": "Annualized volatility of 25.0%.",
+        "red_flags": [],
+        "benchmark_comparison": {},
+        "exec_summary": None,
+        "trend_explanation": None,
+        "risk_analysis": None,
+        "benchmark_analysis": None,
+        "final_narrative": None,
+    }
+
+
+@pytest.fixture
+def completions(install_completions):
+    return install_completions(FakeAsyncCompletions(delay=0.01))
+
+
+def test_async_graph_runs_narratives_concurrently_within_limit(completions, monkeypatch):
+    monkeypatch.setattr(llm_client, "LLM_MAX_CONCURRENT_REQUESTS", 4)
+    graph = build_llm_graph(use_async=True)
+
+    async def run_all():
+        return await asyncio.gather(*(graph.ainvoke(_state(t)) for t in ("A", "B", "C")))
+
+    results = asyncio.run(run_all())
+
+    assert all(result["final_narrative"] for result in results)
+    assert [result["ticker"] for result in results] == ["A", "B", "C"]
+    assert len(completions.calls) == 15
+    assert completions.max_in_flight == 4
+
+
+def test_graph_streams_tokens_and_node_outputs(install_completions):
+    install_completions(FakeCompletions())
+    graph = build_llm_graph()
+
+    tokens, nodes, final = {}, [], None
+    for mode, data in graph.stream(_state("A"), stream_mode=["custom", "updates", "values"]):
+        if mode == "custom":
+            tokens.setdefault(data["node"], []).append(data["delta"])
+        elif mode == "updates":
+            nodes.extend(data)
+        else:
+            final = data
+
+    assert set(tokens) == {"exec_summary", "final_narrative"}
+    assert len(tokens["exec_summary"]) == 3
+    assert "".join(tokens["exec_summary"]).strip() == final["exec_summary"]
+    assert "".join(tokens["final_narrative"]).strip() == final["final_narrative"]
+    assert set(nodes) == set(AGENTS) and nodes[-1] == "final_narrative"
+
+
+def test_stream_falls_back_before_first_token_and_caches(install_completions):
+    fake = install_completions(FakeCompletions(failing={"down"}))
+    llm = llm_client.LLMClient(models=["down", "up"])
+
+    assert list(llm.stream("sys", "hi")) == ["reply ", "number ", "2 "]
+    assert list(llm.stream("sys", "hi")) == ["reply number 2"]
+    assert fake.calls == ["down", "up"]
+
+
+def test_topology_is_derived_from_declared_reads():
+    deps = agent_dependencies(AGENTS)
+
+    assert deps == {
+        "exec_summary": set(),
+        "trend_explanation": set(),
+        "risk_flags": set(),
+        "benchmark": set(),
+        "final_narrative": {"exec_summary", "trend_explanation", "risk_flags", "benchmark"},
+    }
+
+    cyclic = dict(AGENTS, exec_summary=replace(AGENTS["exec_summary"], reads=("final_narrative",)))
+    with pytest.raises(ValueError):
+        agent_dependencies(cyclic)
+
+
+def test_first_four_agents_run_concurrently(completions):
+    asyncio.run(build_llm_graph(use_async=True).ainvoke(_state("A")))
+
+    assert completions.max_in_flight == 4
+    assert len(completions.calls) == 5
@@ -0,0 +1,65 @@
+import llm.prompting as prompting
+from llm.agents import benchmark, exec_summary, risk_flags, trend_explanation
+from llm.prompting import collect_prompt_stats, estimate_tokens, project_state
+from tests.test_llm_graph import _state
+
+
+def _late_state():
+    state = _state("AAPL")
+    state["red_flags"] = ["Prolonged drawdown: 140 consecutive trading days", "2 gap-down(s)"]
+    state["exec_summary"] = "A long executive summary. " * 40
+    state["trend_explanation"] = "A long trend explanation. " * 40
+    return state
+
+
+def test_projection_is_compact_and_stable():
+    state = _late_state()
+
+    text = project_state(state, "risk_flags")
+
+    assert text.splitlines() == [
+        "ticker: AAPL",
+        "analysis_period: 10y",
+        "red_flags: Prolonged drawdown: 140 consecutive trading days; 2 gap-down(s)",
+        "volatility_summary: Annualized volatility of 25.0%.",
+        "dominant_trend: Uptrend",
+    ]
+    assert "executive summary" not in project_state(state, "trend_explanation")
+    assert project_state(dict(reversed(list(state.items()))), "exec_summary") == project_state(
+        state, "exec_summary"
+    )
+
+
+def test_budget_drops_least_important_fields(monkeypatch):
+    state = _late_state()
+    monkeypatch.setitem(prompting.AGENT_TOKEN_BUDGETS, "trend_explanation", 20)
+
+    text = project_state(state, "trend_explanation")
+
+    assert estimate_tokens(text) <= 20
+    assert text.startswith("ticker: AAPL")
+    assert "cagr" not in text
+
+
+def test_prompt_stats_report_tokens_saved():
+    state = _late_state()
+
+    with collect_prompt_stats() as stats:
+        for agent in (exec_summary, trend_explanation, risk_flags, benchmark):
+            agent._prompts(state)
+
+    report = stats.report()
+    assert set(report["agents"]) == {"exec_summary", "trend_explanation", "risk_flags", "benchmark"}
+    assert report["saved_tokens"] > 0.8 * report["full_tokens"]
+    assert report["agents"]["benchmark"]["dropped_fields"] == []
+
+
+def test_trend_explanation_states_each_value_once():
+    state = _late_state()
+    data = project_state(state, "trend_explanation")
+
+    _, user_prompt = trend_explanation._prompts(state)
+
+    # Every value is in the DATA block only, not repeated in the instructions
+    for value in ("Uptrend", "12", "3.1", "Sideways=0.3"):
+        assert user_prompt.count(value) == data.count(value) > 0
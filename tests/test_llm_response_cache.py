@@ -0,0 +1,71 @@
+import time
+
+import pytest
+
+import llm.response_cache as response_cache
+from llm.client import LLMClient
+from llm.response_cache import ResponseCache, bypass_cache
+from tests.conftest import FakeCompletions
+
+
+def _echo(model, messages, n):
+    return f"{model}: {messages[-1]['content']}"
+
+
+@pytest.fixture
+def completions(install_completions):
+    return install_completions(FakeCompletions(_echo, failing={"first"}))
+
+
+def test_identical_prompts_are_served_from_cache(completions, tmp_path):
+    cache = ResponseCache(disk_dir=tmp_path)
+    llm = LLMClient(models=["first", "second"], cache=cache)
+
+    assert llm.generate("sys", "hello") == "second: hello"
+    assert completions.calls == ["first", "second"]
+
+    # The fallback's cached answer is used without retrying the failing model
+    assert llm.generate("sys", "hello") == "second: hello"
+    assert completions.calls == ["first", "second"]
+    assert cache.stats()["memory_hits"] == 1
+
+    # Different temperature: a new request (routed straight to the model that answered)
+    LLMClient(models=["first", "second"], cache=cache, temperature=0.0).generate("sys", "hello")
+    assert completions.calls == ["first", "second", "second"]
+
+    # Disk tier survives a restart
+    restarted = ResponseCache(disk_dir=tmp_path)
+    assert LLMClient(models=["first", "second"], cache=restarted).generate("sys", "hello") == "second: hello"
+    assert restarted.disk_hits == 1
+    assert len(completions.calls) == 3
+
+
+def test_one_lookup_per_request_whatever_the_candidates(completions):
+    cache = ResponseCache(disk_dir=None)
+    llm = LLMClient(models=["first", "second", "third"], cache=cache)
+
+    llm.generate("sys", "hello")    # miss on all three keys, answered by "second"
+    llm.generate("sys", "hello")    # hit on "second"
+
+    stats = cache.stats()
+    assert (stats["misses"], stats["memory_hits"]) == (1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_force_refresh_and_ttl(completions, tmp_path, monkeypatch):
+    cache = ResponseCache(ttl_seconds=60, disk_dir=tmp_path)
+    llm = LLMClient(models=["second"], cache=cache)
+
+    llm.generate("sys", "hello")
+    llm.generate("sys", "hello", force_refresh=True)
+    with bypass_cache():
+        llm.generate("sys", "hello")
+    assert completions.calls == ["second"] * 3
+
+    llm.generate("sys", "hello")
+    assert len(completions.calls) == 3
+
+    later = time.time() + 120
+    monkeypatch.setattr(response_cache.time, "time", lambda: later)
+    llm.generate("sys", "hello")
+    assert len(completions.calls) == 4
@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+import pytest
+
+import llm.routing as routing
+from llm.client import LLMClient
+from llm.response_cache import ResponseCache
+from llm.routing import ModelRouter
+from tests.conftest import FakeAsyncCompletions, FakeCompletions
+
+
+def _model_name(model, messages, n):
+    return model
+
+
+@pytest.fixture
+def client(install_completions):
+    """
+    client(completions, **kwargs): an LLMClient over models "a" then
+    "b" served by completions.
+    """
+
+    def make(completions, **kwargs):
+        install_completions(completions)
+        kwargs.setdefault("router", ModelRouter())
+        return LLMClient(models=["a", "b"], cache=ResponseCache(disk_dir=None), **kwargs)
+
+    return make
+
+
+def test_breaker_opens_backs_off_and_recovers(client, monkeypatch):
+    completions = FakeCompletions(_model_name, failing={"a"})
+    router = ModelRouter(failures=2, base_cooldown=10, prefer_fastest=False)
+    llm = client(completions, router=router)
+
+    for i in range(4):
+        assert llm.generate("sys", f"prompt {i}") == "b"
+
+    # After two failures "a" is skipped
+    assert completions.calls == ["a", "b", "a", "b", "b", "b"]
+    assert router.stats()["fake/a"]["state"] == "open"
+
+    # Cool-down over: half-open trial fails and the cool-down doubles
+    now = time.time()
+    monkeypatch.setattr(routing.time, "time", lambda: now + 11)
+    llm.generate("sys", "prompt 5")
+    assert completions.calls[-2:] == ["a", "b"]
+    assert router._health[("fake", "a")].open_until == pytest.approx(now + 11 + 20, abs=1)
+
+    # Recovered: a success closes the breaker
+    completions.failing.clear()
+    monkeypatch.setattr(routing.time, "time", lambda: now + 40)
+    assert llm.generate("sys", "prompt 6") == "a"
+    assert router.stats()["fake/a"]["state"] == "closed"
+
+
+def test_prefers_fastest_and_tracks_percentiles(client):
+    completions = FakeCompletions(_model_name, delays={"a": 0.03})
+    router = ModelRouter()
+    router.record_success(("fake", "a"), 0.03)
+    router.record_success(("fake", "b"), 0.001)
+
+    llm = client(completions, router=router)
+
+    assert llm.generate("sys", "hello") == "b"
+    stats = router.stats()["fake/b"]
+    assert stats["samples"] == 2
+    assert stats["p50_seconds"] <= stats["p95_seconds"]
+
+
+def test_hedged_requests_take_the_first_answer(client):
+    completions = FakeCompletions(_model_name, delays={"a": 0.5})
+    llm = client(completions, hedge_after=0.05)
+
+    started = time.perf_counter()
+    assert llm.generate("sys", "hello") == "b"
+    assert time.perf_counter() - started < 0.4
+
+    async_completions = FakeAsyncCompletions(_model_name, delays={"a": 0.5})
+    llm = client(async_completions, hedge_after=0.05)
+
+    started = time.perf_counter()
+    assert asyncio.run(llm.agenerate("sys", "hello")) == "b"
+    assert time.perf_counter() - started < 0.4
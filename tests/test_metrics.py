@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from core.metrics import compute_price_metrics
+from tests.synthetic_data import synthetic_daily_prices
+
+
+def test_kernel_matches_pandas_definitions():
+    close = synthetic_daily_prices()
+
+    m = compute_price_metrics(close)
+
+    total_years = (close.index[-1] - close.index[0]).days / 365.25
+    assert m.cagr == (close.iloc[-1] / close.iloc[0]) ** (1 / total_years) - 1
+    assert m.annualized_volatility == close.pct_change().dropna().std() * np.sqrt(252) * 100
+
+    drawdowns = (close / close.cummax() - 1.0) * 100
+    pd.testing.assert_series_equal(m.drawdowns, drawdowns, check_names=False)
+    assert m.max_drawdown == drawdowns.min()
+
+    rolling = close.pct_change(252) * 100
+    pd.testing.assert_series_equal(m.rolling_12m, rolling, check_names=False)
+    assert m.worst_rolling_12m == rolling.min()
+
+    yearly = close.resample("YE").last().pct_change().dropna()
+    np.testing.assert_array_equal(m.yearly_returns.to_numpy(), yearly.to_numpy())
+    assert (m.yearly_returns.index == yearly.index).all()
+    assert m.positive_year_ratio == (yearly > 0).mean()
+
+
+def test_summary_rounds_headline_metrics():
+    summary = compute_price_metrics(synthetic_daily_prices()).summary()
+
+    assert set(summary) == {
+        "cagr",
+        "price_multiple",
+        "total_return_pct",
+        "annualized_volatility",
+        "max_drawdown",
+        "years",
+    }
+    assert all(round(v, 2) == v for v in summary.values())
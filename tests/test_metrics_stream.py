@@ -0,0 +1,170 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import core.metrics_stream as metrics_stream
+import core.red_flags as red_flags
+from core.analytics_pipeline import IncrementalSnapshot, build_snapshot
+from core.metrics import compute_price_metrics
+from core.metrics_stream import (
+    IncrementalPriceMetrics,
+    IncrementalRelativePerformance,
+    IncrementalRollingMetrics,
+)
+from core.performance_engine import compute_relative_performance
+from core.rolling_metrics import HORIZONS, compute_rolling_metrics
+from tests.synthetic_data import synthetic_daily_prices
+
+
+SCALARS = (
+    "cagr",
+    "price_multiple",
+    "total_return_pct",
+    "max_drawdown",
+    "years",
+    "positive_year_ratio",
+    "worst_rolling_12m",
+)
+SERIES = ("returns", "running_max", "drawdowns", "yearly_returns", "rolling_12m")
+
+
+def _assert_matches(state: IncrementalPriceMetrics, close: pd.Series):
+    got, expected = state.metrics(), compute_price_metrics(close)
+
+    for name in SCALARS:
+        np.testing.assert_equal(getattr(got, name), getattr(expected, name), err_msg=name)
+    for name in SERIES:
+        pd.testing.assert_series_equal(getattr(got, name), getattr(expected, name), check_freq=False)
+
+    assert got.annualized_volatility == pytest.approx(expected.annualized_volatility, rel=1e-12)
+
+
+def _peak_then_slump(n_days=1500):
+    # All-time high early on, never regained: trimming it rewrites drawdowns
+    close = synthetic_daily_prices(n_days=n_days, seed=3)
+    values = close.to_numpy().copy()
+    values[:200] *= np.linspace(1.0, 3.0, 200)
+    values[200:] *= 0.5
+    return pd.Series(values, index=close.index)
+
+
+@pytest.mark.parametrize("close", [synthetic_daily_prices(n_days=1500), _peak_then_slump()])
+def test_rolling_period_matches_full_recompute(close):
+    period = 600
+    state = IncrementalPriceMetrics()
+    state.seed(close.iloc[:period])
+
+    # Daily refresh: one bar in, the oldest bar out of the period
+    for end in range(period + 1, len(close) + 1, 7):
+        window = close.iloc[end - period:end]
+        state.update(window)
+        _assert_matches(state, window)
+
+
+def test_growing_history_and_checkpoint():
+    close = synthetic_daily_prices(n_days=900)
+
+    state = IncrementalPriceMetrics()
+    state.seed(close.iloc[:100])
+    for end in range(101, 701):
+        state.update(close.iloc[:end])
+
+    restored = IncrementalPriceMetrics.from_state(state.to_state())
+    restored.append(close.iloc[700:])
+    _assert_matches(restored, close)
+
+
+def test_adjusted_history_reseeds():
+    close = synthetic_daily_prices(n_days=700)
+
+    state = IncrementalPriceMetrics()
+    state.seed(close.iloc[:500])
+
+    # A dividend rescales every earlier bar
+    adjusted = close * 0.98
+    state.update(adjusted)
+    _assert_matches(state, adjusted)
+
+
+def test_incremental_snapshot_matches_build_snapshot():
+    stock = synthetic_daily_prices(n_days=1200, seed=5).to_frame("close")
+    bench = synthetic_daily_prices(n_days=1200, seed=6).to_frame("close")
+    for df in (stock, bench):
+        df["open"] = df["high"] = df["low"] = df["close"]
+
+    state = IncrementalSnapshot("AAPL", years=3)
+    state.update(stock.iloc[:1000], bench.iloc[:1000])
+    snapshot = state.update(stock.iloc[200:], bench.iloc[200:])
+
+    expected = build_snapshot("AAPL", stock.iloc[200:], bench.iloc[200:], years=3)
+
+    for name, chart in expected.pop("charts").items():
+        pd.testing.assert_frame_equal(snapshot["charts"][name], chart)
+    snapshot.pop("charts")
+    assert snapshot == expected
+
+
+def test_rolling_and_relative_match_full_recompute():
+    horizons = {"3m": 63, "1y": 252}
+    bench = synthetic_daily_prices(n_days=1400, seed=8)
+
+    # The stock skips some benchmark days, and its latest bar arrives a
+    # day after the benchmark's at every other refresh
+    stock = synthetic_daily_prices(n_days=1400, seed=9)
+    stock = stock.drop(stock.index[np.random.default_rng(1).choice(1400, 40, replace=False)])
+
+    rolling = IncrementalRollingMetrics(horizons)
+    relative = IncrementalRelativePerformance("S", "B", window=126)
+
+    period = 500
+    for i, end in enumerate(range(period, len(bench) + 1, 5)):
+        b = bench.iloc[end - period:end]
+        s = stock[(stock.index >= b.index[0] + pd.Timedelta(days=3)) & (stock.index <= b.index[-1 - i % 2])]
+
+        rolling.update(s)
+        relative.update(s, b)
+
+        got, expected = rolling.metrics(), compute_rolling_metrics(s, horizons)
+        for name in ("returns", "volatility", "max_drawdown"):
+            pd.testing.assert_frame_equal(getattr(got, name), getattr(expected, name), check_freq=False, rtol=1e-9)
+
+        got, expected = relative.metrics(), compute_relative_performance(s.rename("S"), b, window=126)
+        pd.testing.assert_frame_equal(got.full, expected.full, rtol=1e-9)
+        for name, frame in expected.rolling.items():
+            pd.testing.assert_frame_equal(got.rolling[name], frame, check_freq=False, rtol=1e-9, atol=1e-12)
+
+
+def test_incremental_snapshot_reads_only_recent_bars(monkeypatch):
+    # 15 years of bars, one new bar per refresh
+    stock = synthetic_daily_prices(n_days=3780, seed=5).to_frame("close")
+    bench = synthetic_daily_prices(n_days=3780, seed=6).to_frame("close")
+    for df in (stock, bench):
+        df["open"] = df["high"] = df["low"] = df["close"]
+
+    state = IncrementalSnapshot("AAPL", years=15)
+    state.update(stock.iloc[:-1], bench.iloc[:-1])
+
+    bars_read = []
+
+    def recording(fn, bars=len):
+        def wrapper(first, *args, **kwargs):
+            bars_read.append(bars(first))
+            return fn(first, *args, **kwargs)
+        return wrapper
+
+    monkeypatch.setattr(metrics_stream, "compute_rolling_metrics", recording(compute_rolling_metrics))
+    monkeypatch.setattr(metrics_stream, "_rolling_arrays", recording(metrics_stream._rolling_arrays))
+    monkeypatch.setattr(metrics_stream, "_align", recording(metrics_stream._align))
+    monkeypatch.setattr(metrics_stream, "_terms", recording(metrics_stream._terms))
+    monkeypatch.setattr(
+        metrics_stream,
+        "_rolling_fields",
+        recording(metrics_stream._rolling_fields, bars=lambda terms: len(terms["n"])),
+    )
+    monkeypatch.setattr(red_flags, "_evaluate", recording(red_flags._evaluate))
+
+    snapshot = state.update(stock, bench)
+
+    assert len(bars_read) == 4
+    assert max(bars_read) <= HORIZONS["5y"] + 1
+    assert snapshot["meta"]["ticker"] == "AAPL"
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from core.performance_engine import compute_relative_performance
+from tests.synthetic_data import synthetic_daily_prices
+
+
+def _universe():
+    bench = synthetic_daily_prices(n_days=900, seed=1)
+    noise = synthetic_daily_prices(n_days=900, seed=2)
+    stocks = pd.DataFrame({
+        "LEVERED": bench ** 1.5,
+        "MIXED": np.sqrt(bench * noise),
+        "LATE": noise.where(noise.index >= noise.index[300]),
+    })
+    return stocks, bench
+
+
+def test_full_period_matches_numpy():
+    stocks, bench = _universe()
+
+    perf = compute_relative_performance(stocks, bench, window=126)
+
+    for ticker in stocks:
+        pair = pd.concat([stocks[ticker].pct_change(fill_method=None), bench.pct_change()], axis=1).dropna()
+        x, y = pair.iloc[:, 0].to_numpy(), pair.iloc[:, 1].to_numpy()
+        row = perf.full.loc[ticker]
+
+        beta = np.cov(x, y)[0, 1] / np.var(y, ddof=1)
+        np.testing.assert_allclose(row["beta"], beta, rtol=1e-9)
+        np.testing.assert_allclose(row["correlation"], np.corrcoef(x, y)[0, 1], rtol=1e-9)
+        np.testing.assert_allclose(
+            row["alpha"], (x.mean() - beta * y.mean()) * 252 * 100, rtol=1e-6
+        )
+        np.testing.assert_allclose(
+            row["tracking_error"], np.std(x - y, ddof=1) * np.sqrt(252) * 100, rtol=1e-9
+        )
+        np.testing.assert_allclose(
+            row["up_capture"], x[y > 0].mean() / y[y > 0].mean() * 100, rtol=1e-9
+        )
+        np.testing.assert_allclose(
+            row["down_capture"], x[y < 0].mean() / y[y < 0].mean() * 100, rtol=1e-9
+        )
+
+    np.testing.assert_allclose(perf.full.loc["LEVERED", "beta"], 1.5, rtol=0.05)
+
+
+def test_rolling_matches_pandas_and_single_runs():
+    stocks, bench = _universe()
+    window = 126
+
+    perf = compute_relative_performance(stocks, bench, window=window)
+
+    for ticker in stocks:
+        x = stocks[ticker].pct_change(fill_method=None)
+        y = bench.pct_change()
+        expected_beta = x.rolling(window).cov(y) / y.rolling(window).var()
+        np.testing.assert_allclose(perf.rolling["beta"][ticker], expected_beta, rtol=1e-7)
+        np.testing.assert_allclose(
+            perf.rolling["correlation"][ticker], x.rolling(window).corr(y), rtol=1e-7
+        )
+
+        single = compute_relative_performance(stocks[ticker], bench, window=window)
+        pd.testing.assert_frame_equal(single.full, perf.full.loc[[ticker]])
+
+    summary = perf.summary("LATE")
+    assert summary["rolling_beta_latest"] == round(perf.rolling["beta"]["LATE"].iloc[-1], 2)
@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+
+from core.red_flags import (
+    DETECTORS,
+    RedFlagRules,
+    detect_recent_red_flags,
+    detect_red_flags,
+    detect_red_flags_panel,
+)
+
+
+def _calm(n_days=600, seed=1):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2020-01-01", periods=n_days)
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0005, 0.01, n_days)))
+    return pd.DataFrame(
+        {"open": close, "close": close, "volume": rng.uniform(0.9e6, 1.1e6, n_days)},
+        index=dates,
+    )
+
+
+def test_calm_series_raises_no_flags():
+    prices = _calm()
+    panel = detect_red_flags(prices, prices["close"] * 0.999, ticker="CALM")
+
+    assert panel.messages("CALM") == []
+    assert not any(panel.checks("CALM").values())
+
+
+def test_each_detector_fires():
+    prices = _calm()
+    bench = prices["close"].copy()
+
+    # Slump: 40% down for the last 200 bars
+    prices.iloc[-200:, prices.columns.get_loc("close")] *= 0.6
+    prices["open"] = prices["close"]
+    # One overnight gap
+    prices.iloc[-150, prices.columns.get_loc("open")] = prices["close"].iloc[-151] * 0.9
+    # Turbulent last month, thin volume
+    rng = np.random.default_rng(3)
+    prices.iloc[-21:, prices.columns.get_loc("close")] *= np.exp(rng.normal(0, 0.05, 21))
+    prices.iloc[-21:, prices.columns.get_loc("volume")] *= 0.1
+    # Benchmark steadily ahead
+    bench *= np.exp(np.linspace(0, 1.0, len(bench)))
+
+    panel = detect_red_flags(prices, bench, ticker="X")
+
+    assert panel.checks("X") == {name: True for name in DETECTORS}
+    assert len(panel.messages("X")) == len(DETECTORS)
+    assert panel.measures["worst_gap_pct"][0] <= -10 + 1e-9
+
+
+def test_panel_matches_single_ticker_runs():
+    frames = {"A": _calm(600, 1), "B": _calm(400, 2).iloc[50:], "C": _calm(700, 4)}
+    frames["C"].iloc[-300:, 1] *= 0.5
+
+    calendar = frames["A"].index.union(frames["B"].index).union(frames["C"].index)
+    wide = {
+        col: pd.DataFrame({t: df[col] for t, df in frames.items()}).reindex(calendar)
+        for col in ("open", "close", "volume")
+    }
+    bench = pd.DataFrame({t: frames["A"]["close"] for t in frames}).reindex(calendar)
+
+    panel = detect_red_flags_panel(
+        wide["close"], wide["open"], wide["volume"], bench
+    ).to_frame()
+
+    for ticker, prices in frames.items():
+        single = detect_red_flags(prices, frames["A"]["close"], ticker=ticker).to_frame()
+        pd.testing.assert_frame_equal(panel.loc[[ticker]], single)
+
+
+def test_old_episodes_do_not_flag():
+    prices = _calm(1000)
+
+    # A gap and a slump two to three years back, fully recovered since
+    prices.iloc[-900:-600, prices.columns.get_loc("close")] *= 0.6
+    prices.iloc[-700, prices.columns.get_loc("open")] = prices["close"].iloc[-701] * 0.9
+
+    panel = detect_red_flags(prices, ticker="OLD")
+    assert not panel.checks("OLD")["gap_down"]
+    assert not panel.checks("OLD")["prolonged_drawdown"]
+
+    wider = detect_red_flags(
+        prices, rules=RedFlagRules(gap_lookback_days=800, drawdown_lookback_days=1000), ticker="OLD"
+    )
+    assert wider.checks("OLD")["gap_down"]
+    assert wider.checks("OLD")["prolonged_drawdown"]
+
+
+def test_recent_bars_match_full_history():
+    prices = _calm(3000)
+    bench = prices["close"].copy()
+
+    # Benchmark pulls ahead for the last ~35 months, longer than the
+    # trailing slice the detectors read
+    bench.iloc[-740:] *= np.exp(np.linspace(0, 1.5, 740))
+
+    streak = detect_red_flags(prices, bench, ticker="X").measures["underperformance_months"][0]
+    assert streak > RedFlagRules().lookback() // 21
+
+    for benchmark in (bench, bench * 0.999, None):
+        full = detect_red_flags(prices, benchmark, ticker="X").to_frame()
+        recent = detect_recent_red_flags(prices, benchmark, ticker="X").to_frame()
+        pd.testing.assert_frame_equal(recent, full)
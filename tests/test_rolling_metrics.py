@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from core.rolling_metrics import compute_rolling_metrics
+from tests.synthetic_data import synthetic_daily_prices
+
+
+def _brute_force_drawdown(close: pd.Series, window: int) -> pd.Series:
+    return close.rolling(window).apply(
+        lambda w: (w / np.maximum.accumulate(w) - 1).min() * 100, raw=True
+    )
+
+
+def test_horizons_match_pandas_rolling():
+    close = synthetic_daily_prices(n_days=1600)
+    horizons = {"3m": 63, "1y": 252, "5y": 1260}
+
+    rolling = compute_rolling_metrics(close, horizons)
+
+    for name, h in horizons.items():
+        np.testing.assert_allclose(rolling.returns[name], close.pct_change(h) * 100, rtol=1e-9)
+        np.testing.assert_allclose(
+            rolling.volatility[name],
+            np.log(close).diff().rolling(h).std() * np.sqrt(252) * 100,
+            rtol=1e-9,
+        )
+        # Drawdowns are combined exactly, not approximated
+        np.testing.assert_array_equal(
+            rolling.max_drawdown[name].to_numpy(),
+            _brute_force_drawdown(close, h + 1).to_numpy(),
+        )
+
+
+def test_summary_skips_horizons_longer_than_history():
+    summary = compute_rolling_metrics(synthetic_daily_prices(n_days=600)).summary()
+
+    assert "return_1y_latest" in summary and "return_3y_latest" not in summary
+    assert all(np.isfinite(v) for v in summary.values())
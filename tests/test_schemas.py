@@ -0,0 +1,64 @@
+import msgpack
+import pandas as pd
+import pytest
+
+from core.analytics_pipeline import build_snapshot
+from core.metrics import compute_price_metrics
+from core.schemas import (
+    Snapshot,
+    decode_price_metrics,
+    decode_snapshot,
+    decode_trend_windows,
+    encode_price_metrics,
+    encode_snapshot,
+    encode_trend_windows,
+)
+from core.trend_engine import compute_trend_windows
+from tests.synthetic_data import synthetic_daily_prices, synthetic_random_walk
+
+
+def _prices(n_days=900, seed=11):
+    prices = synthetic_daily_prices(n_days=n_days, seed=seed).to_frame("close")
+    prices["open"] = prices["high"] = prices["low"] = prices["close"]
+    return prices
+
+
+@pytest.mark.parametrize("include_charts", [True, False])
+def test_snapshot_round_trip(include_charts):
+    snapshot = build_snapshot("X", _prices(), _prices(seed=3), years=3, include_charts=include_charts)
+
+    restored = decode_snapshot(encode_snapshot(snapshot))
+
+    scalars = {k: v for k, v in snapshot.items() if k != "charts"}
+    assert {k: v for k, v in restored.items() if k != "charts"} == scalars
+    assert ("charts" in restored) == include_charts
+    if include_charts:
+        for name in snapshot["charts"]:
+            pd.testing.assert_frame_equal(restored["charts"][name], snapshot["charts"][name])
+
+    typed = decode_snapshot(encode_snapshot(snapshot), as_dict=False)
+    assert isinstance(typed, Snapshot)
+    assert typed.meta.ticker == "X"
+
+
+def test_price_metrics_and_trend_windows_round_trip():
+    metrics = compute_price_metrics(synthetic_daily_prices(n_days=900))
+    restored = decode_price_metrics(encode_price_metrics(metrics))
+    assert restored.summary() == metrics.summary()
+    pd.testing.assert_series_equal(restored.drawdowns, metrics.drawdowns, check_freq=False)
+
+    windows = compute_trend_windows(synthetic_random_walk())
+    assert decode_trend_windows(encode_trend_windows(windows)).to_dicts() == windows.to_dicts()
+
+
+def test_rejects_other_versions_and_kinds():
+    prices = _prices(300)
+    data = encode_snapshot(build_snapshot("X", prices, prices, years=1, include_charts=False))
+
+    with pytest.raises(ValueError):
+        decode_price_metrics(data)
+
+    payload = msgpack.unpackb(data, raw=False)
+    payload["v"] += 1
+    with pytest.raises(ValueError):
+        decode_snapshot(msgpack.packb(payload, use_bin_type=True))
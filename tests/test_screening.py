@@ -0,0 +1,76 @@
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+import core.screening as screening
+
+
+def test_screen_one_isolates_failures(provider, monkeypatch):
+    monkeypatch.setattr(screening, "_worker_benchmarks", {})
+
+    ok = screening._screen_one("AAPL", 5)
+    assert ok["status"] == "ok"
+    assert ok["meta.benchmark"] == "^GSPC"
+    assert "growth.cagr" in ok
+    assert not any(key.startswith("charts") for key in ok)
+    assert set(ok) <= set(screening.result_columns())
+
+    def broken(ticker, years):
+        raise ValueError(f"No data returned for ticker {ticker}")
+
+    monkeypatch.setattr(screening, "load_daily_data", broken)
+    failed = screening._screen_one("NOPE", 5)
+    assert failed == {
+        "ticker": "NOPE",
+        "status": "error",
+        "error": "ValueError: No data returned for ticker NOPE",
+    }
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".parquet"])
+def test_sinks_keep_error_rows(tmp_path, suffix):
+    path = tmp_path / f"screen{suffix}"
+    rows = [
+        {"ticker": "BAD", "status": "error", "error": "boom"},
+        {"ticker": "AAPL", "status": "ok", "error": None, "growth.cagr": 12.5},
+    ]
+
+    sink = screening.open_sink(path)
+    for row in rows:
+        sink.write(row)
+    sink.close()
+
+    if suffix == ".jsonl":
+        written = [json.loads(line) for line in path.read_text().splitlines()]
+        assert written == rows
+    else:
+        frame = pd.read_parquet(path)
+        assert list(frame["ticker"]) == ["BAD", "AAPL"]
+        assert frame["growth.cagr"].isna().tolist() == [True, False]
+
+
+def test_parquet_schema_does_not_depend_on_first_batch(tmp_path):
+    path = tmp_path / "screen.parquet"
+    rows = [
+        {"ticker": "AAPL", "status": "ok", "error": None, "growth.cagr": 12.5},
+        {"ticker": "MSFT", "status": "ok", "error": None, "growth.cagr": 9.0},
+        {"ticker": "BAD", "status": "error", "error": "boom"},
+        {"ticker": "OLD", "status": "ok", "error": None, "rolling.return_5y_latest": 40.0},
+    ]
+
+    sink = screening.ParquetSink(path, batch_size=2)
+    for row in rows:
+        sink.write(row)
+    sink.close()
+
+    frame = pd.read_parquet(path)
+    assert list(frame["ticker"]) == ["AAPL", "MSFT", "BAD", "OLD"]
+    assert frame["error"].tolist()[2] == "boom"
+    assert frame["rolling.return_5y_latest"].tolist()[3] == 40.0
+
+    schema = pq.read_schema(path)
+    assert schema.field("error").type == pa.string()
+    assert schema.field("red_flag_checks.gap_down").type == pa.bool_()
@@ -0,0 +1,104 @@
+import time
+
+import pandas as pd
+
+import core.snapshot_cache as snapshot_cache
+from core.analytics_pipeline import build_snapshot
+from core.snapshot_cache import SnapshotCache, cached_trend_analysis
+from tests.synthetic_data import synthetic_daily_prices
+
+
+def _snapshot(n_rows=1000):
+    frame = pd.DataFrame({"date": pd.date_range("2020-01-01", periods=n_rows), "price": 1.0})
+    return {"meta": {"ticker": "X"}, "charts": {"price": frame}}
+
+
+def _built_snapshot():
+    prices = synthetic_daily_prices(n_days=600).to_frame("close")
+    prices["open"] = prices["high"] = prices["low"] = prices["close"]
+    return build_snapshot("X", prices, prices, years=2)
+
+
+def test_lru_respects_memory_budget():
+    one = snapshot_cache._estimate_bytes(_snapshot())
+    cache = SnapshotCache(max_bytes=int(one * 2.5), disk_dir=None)
+
+    cache.put(("A", 10, "^GSPC", "2024-01-02"), _snapshot())
+    cache.put(("B", 10, "^GSPC", "2024-01-02"), _snapshot())
+    cache.get(("A", 10, "^GSPC", "2024-01-02"))           # A is now most recent
+    cache.put(("C", 10, "^GSPC", "2024-01-02"), _snapshot())
+
+    assert cache.get(("B", 10, "^GSPC", "2024-01-02")) is None
+    assert cache.get(("A", 10, "^GSPC", "2024-01-02")) is not None
+    assert cache.nbytes <= cache.max_bytes
+
+
+def test_ttl_expiry_and_disk_tier(tmp_path, monkeypatch):
+    key = ("A", 10, "^GSPC", "2024-01-02")
+
+    cache = SnapshotCache(ttl_seconds=60, disk_dir=tmp_path)
+    cache.put(key, _built_snapshot())
+
+    # A fresh process (empty memory tier) reads it back from disk
+    restarted = SnapshotCache(ttl_seconds=60, disk_dir=tmp_path)
+    restored = restarted.get(key)
+    assert restored["meta"]["ticker"] == "X"
+    pd.testing.assert_frame_equal(restored["charts"]["price"], _built_snapshot()["charts"]["price"])
+    assert restarted.hits == 1
+
+    later = time.time() + 120
+    monkeypatch.setattr(snapshot_cache.time, "time", lambda: later)
+    assert cache.get(key) is None
+    assert SnapshotCache(ttl_seconds=60, disk_dir=tmp_path).get(key) is None
+
+
+def test_rebuilds_only_when_a_new_bar_lands(provider, monkeypatch):
+    builds = []
+    build = snapshot_cache.build_snapshot
+    monkeypatch.setattr(
+        snapshot_cache, "build_snapshot", lambda *a, **k: builds.append(a[0]) or build(*a, **k)
+    )
+    monkeypatch.setattr(snapshot_cache, "_validated", {})
+    cache = SnapshotCache(disk_dir=None)
+
+    first = cached_trend_analysis("AAPL", 5, cache=cache)
+    n_calls = len(provider.calls)
+
+    # Within the refresh interval: no data access, same object
+    assert cached_trend_analysis("AAPL", 5, cache=cache) is first
+    assert len(provider.calls) == n_calls
+
+    # Data layer re-checked, but no new bar: still a cache hit
+    monkeypatch.setattr(snapshot_cache, "OHLCV_REFRESH_SECONDS", 0)
+    monkeypatch.setattr("data.data_loader.OHLCV_REFRESH_SECONDS", 0)
+    assert cached_trend_analysis("AAPL", 5, cache=cache) is first
+    assert builds == ["AAPL"]
+
+    # A new bar lands
+    for ticker in ("AAPL", "^GSPC"):
+        history = provider.history(ticker)
+        next_day = history.index[-1] + pd.offsets.BDay()
+        provider.histories[ticker] = pd.concat([history, history.iloc[[-1]].set_axis([next_day])])
+
+    refreshed = cached_trend_analysis("AAPL", 5, cache=cache)
+    assert refreshed is not first
+    assert builds == ["AAPL", "AAPL"]
+
+
+def test_rebuilds_when_the_last_bar_changes_in_place(provider, monkeypatch):
+    monkeypatch.setattr(snapshot_cache, "_validated", {})
+    monkeypatch.setattr(snapshot_cache, "OHLCV_REFRESH_SECONDS", 0)
+    monkeypatch.setattr("data.data_loader.OHLCV_REFRESH_SECONDS", 0)
+    cache = SnapshotCache(disk_dir=None)
+
+    first = cached_trend_analysis("AAPL", 5, cache=cache)
+
+    # The partial bar is replaced during the session: same date, new close
+    for ticker in ("AAPL", "^GSPC"):
+        history = provider.history(ticker).copy()
+        history.iloc[-1] *= 0.5
+        provider.histories[ticker] = history
+
+    refreshed = cached_trend_analysis("AAPL", 5, cache=cache)
+    assert refreshed is not first
+    assert refreshed["growth"]["cagr"] < first["growth"]["cagr"]
@@ -1,8 +1,14 @@
-from core.trend_engine import compute_trend_windows
+import numpy as np
+import pytest
+
+from core.trend_engine import TrendWindows, compute_trend_windows, summarize_trend_windows
+from tests.reference_trend import reference_trend_windows
 from tests.synthetic_data import (
     synthetic_uptrend,
     synthetic_downtrend,
     synthetic_sideways,
+    synthetic_random_walk,
+    synthetic_level_shifts,
 )
 
 
@@ -29,3 +35,78 @@ def test_sideways_not_uptrend():
 
     assert windows
     assert all(w["trend_label"] != "UPTREND" for w in windows)
+
+
+def test_summary_of_windows():
+    windows = compute_trend_windows(synthetic_random_walk())
+    labels = [w["trend_label"] for w in windows]
+
+    summary = summarize_trend_windows(windows)
+
+    assert summary["dominant_trend"] == max(set(labels), key=labels.count)
+    assert summary["recent_trend"] == labels[-1]
+    assert summary["trend_distribution"] == {
+        label: round(labels.count(label) / len(labels), 2) for label in set(labels)
+    }
+    assert 0 < summary["trend_confidence"] <= 100
+    assert summarize_trend_windows(TrendWindows.empty()) == {}
+
+
+@pytest.mark.parametrize(
+    "make_df",
+    [
+        synthetic_uptrend,
+        synthetic_downtrend,
+        synthetic_sideways,
+        synthetic_random_walk,
+        synthetic_level_shifts,
+    ],
+)
+@pytest.mark.parametrize("window_months,step_months", [(12, 3), (3, 1), (60, 6)])
+def test_matches_per_window_reference(make_df, window_months, step_months):
+    df = make_df()
+
+    expected = reference_trend_windows(df, window_months=window_months, step_months=step_months)
+    actual = compute_trend_windows(df, window_months=window_months, step_months=step_months)
+
+    assert actual.to_dicts() == expected
+
+
+def test_short_history_has_no_windows():
+    assert len(compute_trend_windows(synthetic_uptrend(n_weeks=40))) == 0
+
+
+def test_full_history_mas_warm_up_before_window():
+    df = synthetic_uptrend()
+
+    windowed = compute_trend_windows(df)
+    full = compute_trend_windows(df, ma_mode="full_history")
+
+    assert [w["end_date"] for w in full] == [w["end_date"] for w in windowed]
+    # A 48-week window never warms up its own MA200
+    assert full[-1]["structure_score"] > windowed[-1]["structure_score"]
+    assert full[-1]["trend_label"] == "UPTREND"
+
+
+def test_unknown_ma_mode_rejected():
+    with pytest.raises(ValueError):
+        compute_trend_windows(synthetic_uptrend(), ma_mode="weekly")
+
+
+def test_columnar_results_export():
+    windows = compute_trend_windows(synthetic_random_walk())
+    records = windows.to_dicts()
+
+    assert list(windows) == records
+    assert windows[-1] == records[-1]
+    assert windows[2:5].to_dicts() == records[2:5]
+    assert list(windows["trend_label"]) == [r["trend_label"] for r in records]
+    assert windows.to_results()[0].trend_score == records[0]["trend_score"]
+
+    frame = windows.to_pandas()
+    assert frame.to_dict("records")[0]["trend_label"] == records[0]["trend_label"]
+    assert np.shares_memory(frame["trend_score"].to_numpy(), windows["trend_score"])
+
+    table = windows.to_arrow()
+    assert table.column("trend_label").to_pylist() == [r["trend_label"] for r in records]
+    assert table.column("confidence").to_pylist() == [r["confidence"] for r in records]
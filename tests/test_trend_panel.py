@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from core.trend_engine import compute_trend_windows
+from core.trend_panel import compute_trend_panel
+from tests.synthetic_data import synthetic_random_walk
+
+
+def _uneven_panel(n_tickers=12):
+    columns = {}
+    for i in range(n_tickers):
+        close = synthetic_random_walk(n_weeks=700, seed=i)["close"]
+        close.iloc[:i * 30] = np.nan         # later listings
+        if i % 4 == 0:
+            close.iloc[400:405] = np.nan     # data gaps
+        columns[f"T{i}"] = close
+    return pd.DataFrame(columns)
+
+
+@pytest.mark.parametrize("ma_mode", ["window", "full_history"])
+def test_panel_matches_per_ticker_engine(ma_mode):
+    closes = _uneven_panel()
+
+    panel = compute_trend_panel(closes, ma_mode=ma_mode, chunk_size=5)
+
+    assert panel.values.shape[:2] == panel.start_dates.shape
+    for ticker in closes.columns:
+        single = closes[[ticker]].rename(columns={ticker: "close"})
+        expected = compute_trend_windows(single, ma_mode=ma_mode)
+        assert panel.for_ticker(ticker).to_dicts() == expected.to_dicts()
+
+
+def test_panel_pads_short_histories():
+    closes = _uneven_panel()
+    panel = compute_trend_panel(closes)
+
+    counts = panel.window_counts
+    assert counts[0] > counts[-1]
+
+    scores = panel.field("trend_score")
+    assert np.isnan(scores[-1, counts[-1]:]).all()
+    assert np.isnat(panel.end_dates[-1, counts[-1]:]).all()
+    assert (panel.labels()[-1, counts[-1]:] == "").all()
@@ -0,0 +1,26 @@
+from core.trend_engine import compute_trend_windows
+from core.trend_sweep import sweep_frame, sweep_trend_windows
+from tests.synthetic_data import synthetic_random_walk
+
+
+def test_sweep_matches_individual_calls():
+    df = synthetic_random_walk()
+    windows, steps = (3, 12, 60), (1, 3, 5)
+
+    sweep = sweep_trend_windows(df, window_months=windows, step_months=steps)
+
+    assert set(sweep) == {(w, s) for w in windows for s in steps}
+    for (w, s), result in sweep.items():
+        expected = compute_trend_windows(df, window_months=w, step_months=s)
+        assert result.to_dicts() == expected.to_dicts()
+
+
+def test_sweep_frame_is_tidy():
+    df = synthetic_random_walk(n_weeks=300)
+    sweep = sweep_trend_windows(df, window_months=(6, 100), step_months=(3,))
+
+    frame = sweep_frame(sweep)
+
+    assert len(frame) == sum(len(r) for r in sweep.values())
+    assert set(frame["window_months"]) == {6}
+    assert list(frame.columns[:2]) == ["window_months", "step_months"]